@@ -1,39 +1,23 @@
-from collections import defaultdict, deque
+from collections import defaultdict
+import numpy as np
 from pyvis.network import Network
 
+from distribution import Distribucion
+from graph_arrays import TIPO_ITEM
+from graph_index import grafo_compacto, indice_grafo, indice_proveedores
+
+MST_OUTPUT_FILE = "static/mst_red_proveedores.html"
+
 # FUERZA BRUTA (Detección de Monopolios)
 
 def detectar_monopolios(G, umbral_monto=10000):
     print("Detección de monopolios")
 
-    item_proveedores = {}
-    item_montos = {}
-    item_ordenes = {}
-
-    # FUERZA BRUTA 1:
-    # Recorremos TODOS los nodos del grafo y filtramos los de tipo 'orden'.
-    for orden in G.nodes():
-        if G.nodes[orden]['type'] == 'orden':
-
-            proveedor = G.nodes[orden].get('proveedor') or G.nodes[orden].get('ORDEN_PROVEEDOR')
-            if not proveedor:
-                continue
-
-            # FUERZA BRUTA 2:
-            # Se recorren TODOS los vecinos del nodo 'orden' para
-            items = [n for n in G.neighbors(orden) if G.nodes[n]['type'] == 'item']
-
-            for item in items:
-                if item not in item_proveedores:
-                    item_proveedores[item] = set()
-                    item_montos[item] = 0
-                    item_ordenes[item] = []
-
-                item_proveedores[item].add(proveedor)
-
-                monto = G[orden][item]['weight']
-                item_montos[item] += monto
-                item_ordenes[item].append((orden, proveedor, monto))
+    # Proveedores, montos y órdenes por ítem salen del índice de proveedores
+    # (con el grafo tripartito incluye a todos los proveedores de cada orden)
+    indice = indice_proveedores(G)
+    item_proveedores = indice.proveedores_item
+    item_montos = indice.monto_item
 
     print(f"Analizando {len(item_proveedores)} ítems con información de proveedor...")
     print(f"Umbral de riesgo: S/ {umbral_monto:,.2f}\n")
@@ -80,7 +64,7 @@ def detectar_monopolios(G, umbral_monto=10000):
 
         if tipo:
             nombre_item = G.nodes[item].get('label_original', G.nodes[item]['label'])
-            num_ordenes = len(item_ordenes[item])
+            num_ordenes = indice.ordenes_item[item]
 
             caso = {
                 'tipo': tipo,
@@ -118,33 +102,32 @@ def detectar_monopolios(G, umbral_monto=10000):
 
 #DIVIDE Y VENCERÁS (Análisis por Rangos de Monto)
 
+# Rangos de monto total por ítem: [borde, siguiente borde)
+NOMBRES_RANGOS_MONTO = ['MICRO', 'PEQUEÑAS', 'MEDIANAS', 'GRANDES', 'MEGA']
+BORDES_RANGOS_MONTO = [float('-inf'), 1000, 10000, 50000, 200000, float('inf')]
+
+
 def analizar_montos_divide_conquista(G, profundidad=0, items_list=None, nivel_nombre="RAÍZ"):
 
     if profundidad == 0:
         print("Analisis de rangos de montos (Divide y Vencerás Recursivo) ")
         print()
 
-        # Calcular montos por ítem
+        # Montos por ítem (precalculados en el índice)
+        indice = indice_grafo(G)
         items_list = []
-        for item in G.nodes():
-            if G.nodes[item]['type'] != 'item':
+        for item in indice.items:
+            if indice.grado[item] == 0:
                 continue
 
-            ordenes = list(G.neighbors(item))
-            if not ordenes:
-                continue
-
-            monto_total = sum(G[item][orden]['weight'] for orden in ordenes)
-            monto_promedio = monto_total / len(ordenes)
-
             items_list.append({
                 'node': item,
                 'nombre': G.nodes[item].get('label_original', '')[:60],
-                'num_ordenes': len(ordenes),
-                'monto_total': monto_total,
-                'monto_promedio': monto_promedio,
-                'monto_max': max(G[item][orden]['weight'] for orden in ordenes),
-                'monto_min': min(G[item][orden]['weight'] for orden in ordenes)
+                'num_ordenes': indice.grado[item],
+                'monto_total': indice.monto_total[item],
+                'monto_promedio': indice.monto_promedio[item],
+                'monto_max': indice.monto_max[item],
+                'monto_min': indice.monto_min[item]
             })
 
         items_list.sort(key=lambda x: x['monto_total'])
@@ -159,34 +142,27 @@ def analizar_montos_divide_conquista(G, profundidad=0, items_list=None, nivel_no
             'profundidad': profundidad
         }
 
-    # Definir rangos significativos
+    # Reparto en rangos significativos (una pasada con searchsorted/bincount)
     montos = [item['monto_total'] for item in items_list]
-
-    # Encontrar puntos de corte significativos
-    rangos = {
-        'MICRO': [item for item in items_list if item['monto_total'] < 1000],
-        'PEQUEÑAS': [item for item in items_list if 1000 <= item['monto_total'] < 10000],
-        'MEDIANAS': [item for item in items_list if 10000 <= item['monto_total'] < 50000],
-        'GRANDES': [item for item in items_list if 50000 <= item['monto_total'] < 200000],
-        'MEGA': [item for item in items_list if item['monto_total'] >= 200000]
-    }
+    distribucion = Distribucion(montos, BORDES_RANGOS_MONTO)
+    rangos = dict(zip(NOMBRES_RANGOS_MONTO, distribucion.grupos(items_list)))
 
     if profundidad == 0:
         print(f"\n Rangos de monto:")
         print(f"Total e productos: {n}\n")
 
-        for nombre_rango, items_rango in rangos.items():
+        for i, (nombre_rango, items_rango) in enumerate(rangos.items()):
             if not items_rango:
                 continue
 
-            montos_rango = [item['monto_total'] for item in items_rango]
-            ordenes_rango = [item['num_ordenes'] for item in items_rango]
+            cantidad = int(distribucion.cuentas[i])
+            monto_rango = float(distribucion.sumas[i])
 
             print(f"   {nombre_rango}:")
-            print(f"     Cantidad: {len(items_rango)} ítems ({len(items_rango)/n*100:.1f}%)")
-            print(f"     Monto total: S/ {sum(montos_rango):,.2f}")
-            print(f"     Rango: S/ {min(montos_rango):,.2f} - S/ {max(montos_rango):,.2f}")
-            print(f"     Promedio: S/ {sum(montos_rango)/len(items_rango):,.2f}")
+            print(f"     Cantidad: {cantidad} ítems ({cantidad/n*100:.1f}%)")
+            print(f"     Monto total: S/ {monto_rango:,.2f}")
+            print(f"     Rango: S/ {distribucion.minimos[i]:,.2f} - S/ {distribucion.maximos[i]:,.2f}")
+            print(f"     Promedio: S/ {monto_rango/cantidad:,.2f}")
 
             # Top 3 de cada rango
             top_items = sorted(items_rango, key=lambda x: x['monto_total'], reverse=True)[:3]
@@ -215,32 +191,22 @@ def analizar_fragmentacion_red(G):
     print("Fragmentación de red (BFS/DFS) ")
     print()
 
-    item_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'item']
-
-    # BFS para componentes conexas
-    visitados = set()
-    componentes = []
-
-    def bfs_componente(inicio):
-        componente = set()
-        queue = deque([inicio])
-        visitados.add(inicio)
-        componente.add(inicio)
-
-        while queue:
-            nodo = queue.popleft()
-            for orden in G.neighbors(nodo):
-                for vecino in G.neighbors(orden):
-                    if G.nodes[vecino]['type'] == 'item' and vecino not in visitados:
-                        visitados.add(vecino)
-                        componente.add(vecino)
-                        queue.append(vecino)
-        return componente
-
-    for item in item_nodes:
-        if item not in visitados:
-            comp = bfs_componente(item)
-            componentes.append(comp)
+    # Recorridos sobre la adyacencia CSR en lugar de los dicts de networkx
+    C = grafo_compacto(G)
+    items = C.nodos_de_tipo(TIPO_ITEM)
+    item_nodes = list(C.nombres[items])
+    grados = C.grados()
+
+    # Componentes conexas (equivale al BFS ítem -> orden -> ítem), numeradas en el
+    # orden en que las encontraba el BFS: por su primer ítem
+    etiquetas = C.componentes()[items]
+    _, primera, inversa = np.unique(etiquetas, return_index=True, return_inverse=True)
+    posicion = np.empty(len(primera), dtype=np.int64)
+    posicion[np.argsort(primera, kind="stable")] = np.arange(len(primera))
+
+    componentes = [set() for _ in range(len(primera))]
+    for nombre, comp in zip(item_nodes, posicion[inversa]):
+        componentes[comp].add(nombre)
 
     componentes.sort(key=len, reverse=True)
 
@@ -267,7 +233,7 @@ def analizar_fragmentacion_red(G):
     # Causas de fragmentación
     print(f"Causa de fragmentación:")
 
-    items_con_1_orden = sum(1 for item in item_nodes if G.degree(item) == 1)
+    items_con_1_orden = int(np.count_nonzero(grados[items] == 1))
     porcentaje_1_orden = items_con_1_orden / len(item_nodes) * 100
 
     print(f"{items_con_1_orden} ítems ({porcentaje_1_orden:.1f}%) tienen solo 1 orden")
@@ -284,21 +250,17 @@ def analizar_fragmentacion_red(G):
     items_criticos = []
 
     # Los ítems con más órdenes son naturalmente puentes
-    items_frecuentes = [(item, G.degree(item)) for item in item_nodes]
-    items_frecuentes.sort(key=lambda x: x[1], reverse=True)
+    items_frecuentes = items[np.argsort(-grados[items], kind="stable")]
 
     # Analizar top 15 ítems más frecuentes
-    for item, num_ordenes in items_frecuentes[:15]:
+    for idx in items_frecuentes[:15]:
+        num_ordenes = int(grados[idx])
         if num_ordenes >= 5:  # Solo ítems con 5+ órdenes
             # Contar cuántos ítems únicos conecta a través de órdenes compartidas
-            items_conectados = set()
-            for orden in G.neighbors(item):
-                for vecino in G.neighbors(orden):
-                    if G.nodes[vecino]['type'] == 'item' and vecino != item:
-                        items_conectados.add(vecino)
+            num_conectados = len(C.items_a_dos_saltos(idx))
 
-            if len(items_conectados) >= 5:  # Solo si conecta 5+ ítems distintos
-                items_criticos.append((item, len(items_conectados), num_ordenes))
+            if num_conectados >= 5:  # Solo si conecta 5+ ítems distintos
+                items_criticos.append((C.nombres[idx], num_conectados, num_ordenes))
 
     if items_criticos:
         items_criticos.sort(key=lambda x: x[1], reverse=True)
@@ -329,20 +291,19 @@ def optimizar_compras_presupuesto_corregido(G, presupuesto_total, necesidades_cr
         necesidades_criticas = ['agua', 'alimento', 'medicina', 'salud', 'educacion',
                                 'seguridad', 'emergencia', 'hospital', 'obra', 'social']
 
-    item_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'item']
+    indice = indice_grafo(G)
 
     # 1. Preparación de datos
     items_info = []
-    for item in item_nodes:
-        ordenes = list(G.neighbors(item))
-        if not ordenes:
+    for item in indice.items:
+        if indice.grado[item] == 0:
             continue
 
         # Calculamos el costo promedio real
-        costo_real = sum(G[item][orden]['weight'] for orden in ordenes) / len(ordenes)
+        costo_real = indice.monto_promedio[item]
 
         # El valor es la frecuencia de uso (demanda social)
-        valor = len(ordenes)
+        valor = indice.grado[item]
 
         # Identifica si la descripción del ítem contiene palabras clave de necesidades críticas.
         nombre = G.nodes[item].get('label_original', G.nodes[item]['label']).lower()
@@ -480,23 +441,11 @@ class UnionFind:
 
 
 def encontrar_red_proveedores_esencial(G_bipartito):
-    # 1. RECOLECCIÓN DE DATOS
-    proveedor_items_montos = defaultdict(lambda: defaultdict(float))
-    proveedor_montos_totales = defaultdict(float)
-    proveedores_existentes = set()
-    
-    for orden in G_bipartito.nodes():
-        if G_bipartito.nodes[orden]['type'] == 'orden':
-            proveedor = G_bipartito.nodes[orden].get('proveedor') or G_bipartito.nodes[orden].get('ORDEN_PROVEEDOR')
-            if not proveedor: continue
-            
-            proveedores_existentes.add(proveedor)
-            items = [n for n in G_bipartito.neighbors(orden) if G_bipartito.nodes[n]['type'] == 'item']
-            
-            for item in items:
-                monto = G_bipartito[orden][item]['weight']
-                proveedor_items_montos[proveedor][item] += monto
-                proveedor_montos_totales[proveedor] += monto
+    # 1. RECOLECCIÓN DE DATOS (índice de proveedores: proveedor -> {ítem: monto})
+    indice = indice_proveedores(G_bipartito)
+    proveedor_items_montos = indice.items_proveedor
+    proveedor_montos_totales = indice.monto_proveedor
+    proveedores_existentes = indice.proveedores
                 
     proveedores_list = list(proveedores_existentes)
     n_proveedores = len(proveedores_list)
@@ -504,24 +453,29 @@ def encontrar_red_proveedores_esencial(G_bipartito):
     if n_proveedores < 2:
         return [], [], {'num_proveedores': n_proveedores, 'esenciales': 0, 'peso_total': 0}
 
+    # Solo los pares que comparten algún ítem, tomados de ítem -> proveedores
+    # en lugar de probar todos los pares (p1 antes que p2 en proveedores_list)
+    posicion = {p: i for i, p in enumerate(proveedores_list)}
+    pares = set()
+    for proveedores_item in indice.proveedores_item.values():
+        if len(proveedores_item) < 2:
+            continue
+        ordenados = sorted(proveedores_item, key=posicion.__getitem__)
+        for i in range(len(ordenados)):
+            for j in range(i + 1, len(ordenados)):
+                pares.add((ordenados[i], ordenados[j]))
+
     proveedor_edges = [] 
 
-    for i in range(n_proveedores):
-        p1 = proveedores_list[i]
-        for j in range(i + 1, n_proveedores):
-            p2 = proveedores_list[j]
-            
-            items_comunes = set(proveedor_items_montos[p1].keys()) & set(proveedor_items_montos[p2].keys())
-            
-            if items_comunes:
+    for p1, p2 in pares:
+        items_comunes = set(proveedor_items_montos[p1].keys()) & set(proveedor_items_montos[p2].keys())
 
-                peso_conexion = sum(
-                    proveedor_items_montos[p1][item] + proveedor_items_montos[p2][item]
-                    for item in items_comunes
-                )
-                
+        peso_conexion = sum(
+            proveedor_items_montos[p1][item] + proveedor_items_montos[p2][item]
+            for item in items_comunes
+        )
 
-                proveedor_edges.append((-peso_conexion, p1, p2, len(items_comunes))) 
+        proveedor_edges.append((-peso_conexion, p1, p2, len(items_comunes))) 
 
     # CÁLCULO DEL MST (KRUSKAL)
     proveedor_edges.sort() 
@@ -641,8 +595,7 @@ def _generar_visualizacion_mst(top_edges, proveedores_centrales, stats_mst, prov
         )
 
     net.show_buttons(filter_=['physics'])
-    output_path = "static/mst_red_proveedores.html"
-    net.save_graph(output_path)
+    net.save_graph(MST_OUTPUT_FILE)
 
 def ejecutar_mst_analisis(G):
     """Ejecuta el MST, genera la visualización y reporta a la consola."""
@@ -1,28 +1,21 @@
-def quicksort(lista):
+from distribution import distribucion_grafo
+from item_stats import tabla_items
+from cooccurrence import coocurrencia_items
+from ranking import Ranking, ranking_items, top_items
+from search_index import APROXIMADA, buscar_items
 
-    if len(lista) <= 1:
-        return lista
-    else:
-        pivote = lista[len(lista) // 2]
-        menores = [x for x in lista if x[1] > pivote[1]]
-        iguales = [x for x in lista if x[1] == pivote[1]]
-        mayores = [x for x in lista if x[1] < pivote[1]]
-        return quicksort(menores) + iguales + quicksort(mayores)
+# Rangos de órdenes por ítem: 1, 2-5, 6-10, 11-20, más de 20
+RANGOS_ORDENES = [1, 2, 6, 11, 21, float('inf')]
 
 
 def get_top_items_by_orders(G, nodo_tipo):
 
-    item_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'item']
-
-    # Cuenta cuántas órdenes tiene cada ítem (degree = número de conexiones)
-    item_degrees = [(n, G.degree(n)) for n in item_nodes]
-
-    # Ordena de mayor a menor usando QuickSort
-    top_items = quicksort(item_degrees)
+    # Ítems ordenados por número de órdenes (degree); el orden completo se calcula al recorrerlo
+    top_items = ranking_items(G, "grado")
 
     # Imprime los top 10
     print(f"\nTop 10 {nodo_tipo}s con más órdenes:")
-    for i, (node, degree) in enumerate(top_items[:10], 1):
+    for i, (node, degree) in enumerate(top_items.top(10), 1):
         item_name = G.nodes[node].get('label_original', G.nodes[node]['label'])
         print(f"  {i}. {item_name[:70]}: {degree} órdenes")
 
@@ -31,16 +24,8 @@ def get_top_items_by_orders(G, nodo_tipo):
 
 def get_top_items_by_monto(G, nodo_tipo):
 
-    item_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'item']
-    item_montos = {}
-
-    # Suma el monto total de cada ítem
-    for n in item_nodes:
-        total_monto = sum(G[n][neighbor]['weight'] for neighbor in G.neighbors(n))
-        item_montos[n] = total_monto
-
-    # Ordena por monto total
-    top_montos = quicksort(list(item_montos.items()))[:10]
+    # Top 10 por monto total (precalculado en el índice), sin ordenar todos los ítems
+    top_montos = top_items(G, "monto_total", 10)
 
     # Imprime los top 10
     print(f"\nTop 10 {nodo_tipo}s por monto total de compras:")
@@ -56,15 +41,15 @@ def get_orders_per_item_distribution(G):
     """
     Analiza la distribución de órdenes por ítem
     """
-    item_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'item']
-    orders_count = [G.degree(n) for n in item_nodes]
+    distribucion = distribucion_grafo(G, "grado_items", RANGOS_ORDENES)
+    cuentas = distribucion.cuentas.tolist()
 
     print("\nDistribución de órdenes por ítem:")
-    print(f"  - Ítems con 1 orden: {sum(1 for c in orders_count if c == 1)}")
-    print(f"  - Ítems con 2-5 órdenes: {sum(1 for c in orders_count if 2 <= c <= 5)}")
-    print(f"  - Ítems con 6-10 órdenes: {sum(1 for c in orders_count if 6 <= c <= 10)}")
-    print(f"  - Ítems con 11-20 órdenes: {sum(1 for c in orders_count if 11 <= c <= 20)}")
-    print(f"  - Ítems con más de 20 órdenes: {sum(1 for c in orders_count if c > 20)}")
+    print(f"  - Ítems con 1 orden: {cuentas[0]}")
+    print(f"  - Ítems con 2-5 órdenes: {cuentas[1]}")
+    print(f"  - Ítems con 6-10 órdenes: {cuentas[2]}")
+    print(f"  - Ítems con 11-20 órdenes: {cuentas[3]}")
+    print(f"  - Ítems con más de 20 órdenes: {cuentas[4]}")
     print()
 
 
@@ -73,38 +58,20 @@ def analizar_interconexiones(G, nodo_tipo):
     print("Análisis de interconexiones entre ítems:")
     print()
 
-    item_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'item']
-    orden_nodes = [n for n in G.nodes() if G.nodes[n]['type'] == 'orden']
+    # Co-ocurrencia de ítems (BᵀB sobre la matriz orden x ítem), en caché por versión del grafo
+    coocurrencia = coocurrencia_items(G)
+    total_ordenes = len(coocurrencia.ordenes)
 
-    # Analizar órdenes compartidas
-    ordenes_con_multiples_items = []
-    for orden in orden_nodes:
-        items_en_orden = [n for n in G.neighbors(orden) if G.nodes[n]['type'] == 'item']
-        if len(items_en_orden) >= 2:
-            ordenes_con_multiples_items.append((orden, len(items_en_orden)))
+    # Órdenes con 2 o más ítems
+    ordenes_con_multiples_items = coocurrencia.ordenes_multiples()
 
-    # Ordenar por número de ítems
-    ordenes_con_multiples_items.sort(key=lambda x: x[1], reverse=True)
+    print(f"Total de órdenes: {total_ordenes}")
+    print(f"Órdenes con múltiples ítems: {ordenes_con_multiples_items}")
+    print(f"Porcentaje de interconexión: {ordenes_con_multiples_items / total_ordenes * 100:.1f}%")
 
-    print(f"Total de órdenes: {len(orden_nodes)}")
-    print(f"Órdenes con múltiples ítems: {len(ordenes_con_multiples_items)}")
-    print(f"Porcentaje de interconexión: {len(ordenes_con_multiples_items) / len(orden_nodes) * 100:.1f}%")
 
-
-    # Calcular interconexión por ítem
-    item_interconexiones = {}
-    for item in item_nodes:
-        ordenes_item = set(G.neighbors(item))
-        items_conectados = set()
-        for orden in ordenes_item:
-            items_en_orden = [n for n in G.neighbors(orden)
-                              if G.nodes[n]['type'] == 'item' and n != item]
-            items_conectados.update(items_en_orden)
-        item_interconexiones[item] = len(items_conectados)
-
-    # Top ítems más interconectados
-    top_interconectados = sorted(item_interconexiones.items(),
-                                 key=lambda x: x[1], reverse=True)[:10]
+    # Top ítems más interconectados (con cuántos otros ítems comparten órdenes)
+    top_interconectados = Ranking(coocurrencia.items, coocurrencia.interconexiones.tolist()).top(10)
 
     print(f"\nTop 10 {nodo_tipo}s más interconectados (comparten órdenes con más ítems):")
     for i, (node, num_conexiones) in enumerate(top_interconectados, 1):
@@ -118,66 +85,50 @@ def buscar_item_y_estadisticas(G, nombre_item):
     """
     Busca un ítem en el grafo por nombre normalizado o parcial 
     y calcula sus estadísticas clave.
+    'tipo_coincidencia' indica cómo se encontró (exacta o texto). Si solo hay
+    coincidencias aproximadas no se elige ninguna: se devuelven como
+    'sugerencias' [(nombre, similitud)], sin estadísticas.
     """
     
-    # Normalizar el nombre de búsqueda
-    from data_loader import normalize_products 
-    nombre_normalizado = normalize_products(nombre_item)
-    
-    item_encontrado = None
-    item_node_id = None
-    
-    #  Búsqueda por descripción original y normalizada
-    for node in G.nodes():
-        if G.nodes[node]['type'] == 'item':
-            # Buscar por nombre original 
-            if nombre_item.lower() in G.nodes[node].get('label_original', '').lower():
-                item_node_id = node
-                item_encontrado = G.nodes[node]
-                break
-            # Buscar por nombre normalizado 
-            elif nombre_normalizado == G.nodes[node]['label']:
-                item_node_id = node
-                item_encontrado = G.nodes[node]
-                break
-
-    if not item_encontrado:
+    # Coincidencias ordenadas desde el índice de búsqueda (exacta por nombre
+    # normalizado, luego texto dentro de la descripción original, luego aproximadas)
+    coincidencias = buscar_items(G, nombre_item, limite=6)
+    if not coincidencias:
         return None
 
-    # Calcular estadísticas
+    item_node_id, tipo, _ = coincidencias[0]
+    if tipo == APROXIMADA:
+        print(f" Sin coincidencias exactas para '{nombre_item}': {len(coincidencias)} ítems parecidos")
+        return {
+            'consulta': nombre_item,
+            'tipo_coincidencia': tipo,
+            'sugerencias': [(G.nodes[n].get('label_original', G.nodes[n]['label']), similitud)
+                            for n, _, similitud in coincidencias],
+        }
+
+    # Estadísticas precalculadas del ítem (tabla por versión del grafo)
+    estadisticas = tabla_items(G).fila(item_node_id)
     ordenes = list(G.neighbors(item_node_id))
-    num_ordenes = len(ordenes)
-    
-    montos = [G[item_node_id][orden]['weight'] for orden in ordenes]
-    monto_total = sum(montos)
-    monto_promedio = monto_total / num_ordenes if num_ordenes > 0 else 0
-    
-    # Proveedores únicos
-    proveedores = set()
-    for orden in ordenes:
-        proveedor = G.nodes[orden].get('proveedor') or G.nodes[orden].get('ORDEN_PROVEEDOR')
-        if proveedor and 'MÚLTIPLE' not in proveedor:
-            proveedores.add(proveedor)
-            
-    num_proveedores = len(proveedores)
-    
-    # Análisis de monopolio 
-    if num_proveedores == 1 and monto_total > 5000: 
-         analisis_proveedor = "Riesgo de Monopolio (1 proveedor)"
-    elif num_proveedores == 2 and monto_total > 10000:
-         analisis_proveedor = "Riesgo de Duopolio (2 proveedores)"
-    else:
-         analisis_proveedor = f"Diversificación BAJA ({num_proveedores} proveedores)"
 
     return {
-        'nombre_original': item_encontrado.get('label_original'),
-        'num_ordenes': num_ordenes,
-        'monto_total': monto_total,
-        'monto_promedio': monto_promedio,
-        'num_proveedores': num_proveedores,
-        'proveedores': list(proveedores),
-        'analisis_proveedor': analisis_proveedor,
-        'ordenes_ejemplo': [G.nodes[o].get('label') for o in ordenes[:5]]
+        'consulta': nombre_item,
+        'tipo_coincidencia': tipo,
+        'nombre_original': estadisticas['nombre_original'],
+        'num_ordenes': estadisticas['num_ordenes'],
+        'monto_total': estadisticas['monto_total'],
+        'monto_promedio': estadisticas['monto_promedio'],
+        'monto_mediana': estadisticas['monto_mediana'],
+        'monto_min': estadisticas['monto_min'],
+        'monto_max': estadisticas['monto_max'],
+        'num_proveedores': estadisticas['num_proveedores'],
+        'proveedores': [p for p, _ in estadisticas['proveedores']],
+        'participacion_proveedores': estadisticas['proveedores'],
+        'primera_fecha': estadisticas['primera_fecha'],
+        'ultima_fecha': estadisticas['ultima_fecha'],
+        'analisis_proveedor': estadisticas['riesgo'],
+        'ordenes_ejemplo': [G.nodes[o].get('label') for o in ordenes[:5]],
+        'otras_coincidencias': [G.nodes[n].get('label_original', G.nodes[n]['label'])
+                                for n, _, _ in coincidencias[1:]]
     }
 
 def formatear_resultado_busqueda(resultado):
@@ -186,24 +137,47 @@ def formatear_resultado_busqueda(resultado):
         return ""
         
     output_lines = []
+
+    if resultado.get('tipo_coincidencia') == APROXIMADA:
+        output_lines.append(f" Ningún ítem coincide con '{resultado['consulta']}'. Ítems parecidos:")
+        for nombre, similitud in resultado['sugerencias']:
+            output_lines.append(f"    - {nombre} (similitud {similitud:.0%})")
+        return "\n".join(output_lines)
     
     output_lines.append("=" * 80)
     output_lines.append(f" ANÁLISIS DETALLADO DEL ÍTEM: {resultado['nombre_original']}".center(80))
     output_lines.append("=" * 80)
+    if resultado.get('tipo_coincidencia'):
+        output_lines.append(f" [Búsqueda] Coincidencia {resultado['tipo_coincidencia']} para '{resultado['consulta']}'")
     
     # Usando iconos de texto para claridad sin emojis
     output_lines.append(f" [Órdenes] Número de órdenes: {resultado['num_ordenes']:,}")
     output_lines.append(f" [Monto] Monto Total de Compra: S/ {resultado['monto_total']:,.2f}")
     output_lines.append(f" [Promedio] Monto Promedio por Orden: S/ {resultado['monto_promedio']:,.2f}")
+    if 'monto_mediana' in resultado:
+        output_lines.append(f" [Mediana] Monto Mediano por Orden: S/ {resultado['monto_mediana']:,.2f}"
+                            f" (mín. S/ {resultado['monto_min']:,.2f} - máx. S/ {resultado['monto_max']:,.2f})")
+    if resultado.get('primera_fecha'):
+        output_lines.append(f" [Fechas] Primera orden: {resultado['primera_fecha']} | "
+                            f"Última orden: {resultado['ultima_fecha']}")
     output_lines.append(f" [Proveedores] Proveedores Únicos: {resultado['num_proveedores']}")
     output_lines.append(f" [Riesgo] Evaluación: {resultado['analisis_proveedor']}")
     
     output_lines.append("\n Top 5 Proveedores:")
+    participacion = dict(resultado.get('participacion_proveedores', []))
     for i, prov in enumerate(resultado['proveedores'][:5], 1):
-        output_lines.append(f"    {i}. {prov}")
+        if prov in participacion:
+            output_lines.append(f"    {i}. {prov} ({participacion[prov]:.1%} del monto)")
+        else:
+            output_lines.append(f"    {i}. {prov}")
         
     output_lines.append("\n Órdenes de Ejemplo (Números):")
     for orden in resultado['ordenes_ejemplo']:
         output_lines.append(f"    • {orden}")
 
+    if resultado.get('otras_coincidencias'):
+        output_lines.append("\n Otras coincidencias:")
+        for nombre in resultado['otras_coincidencias']:
+            output_lines.append(f"    - {nombre}")
+
     return "\n".join(output_lines)
\ No newline at end of file
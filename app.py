@@ -1,6 +1,6 @@
 from flask import Flask, render_template, redirect, url_for, request
 import sys
-from main import ejecutar_flujo_completo
+from main import cargar_datos_y_grafo, clave_visualizacion, generar_visualizacion, OUTPUT_FILE
 from analyzer import (
     get_top_items_by_orders,
     get_top_items_by_monto,
@@ -8,7 +8,10 @@ from analyzer import (
     analizar_interconexiones
 )
 from filter_graph import filter_subgraph
+from ranking import ranking_items
 from graphic import create_network, add_nodes, add_edges, generate_legend_html, save_html
+from graph_snapshot import registrar_visualizacion, visualizacion_vigente
+from analisis_avanzado import MST_OUTPUT_FILE
 
 app = Flask(__name__)
 
@@ -24,22 +27,25 @@ class OutputCapture:
 df_global = None
 G_global = None
 top_items_global = None
+clave_datos_global = None
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
 def ensure_data_loaded():
-    global df_global, G_global, top_items_global
-    if G_global is None or df_global is None:
+    """Carga datos y grafo una vez, y de nuevo si el CSV cambió desde entonces (clave_visualizacion)."""
+    global df_global, G_global, top_items_global, clave_datos_global
+    clave = clave_visualizacion()
+    if G_global is None or df_global is None or clave != clave_datos_global:
+        clave_datos_global = clave
         capture = OutputCapture()
         sys.stdout = capture
-        df_global, G_global = ejecutar_flujo_completo()
+        # Solo datos y grafo (snapshot si está vigente); sin análisis ni exportación PyVis
+        df_global, G_global = cargar_datos_y_grafo()
         sys.stdout = sys.__stdout__
-        # Calcular top items para filtrar subgrafo si es necesario
-        item_nodes = [n for n in G_global.nodes() if G_global.nodes[n]['type'] == 'item']
-        top_items_global = [(n, G_global.degree(n)) for n in item_nodes]
-        top_items_global.sort(key=lambda x: x[1], reverse=True)
+        # Ranking de ítems por órdenes para filtrar subgrafo si es necesario
+        top_items_global = ranking_items(G_global, "grado")
 
 @app.route("/estadisticas")
 def estadisticas():
@@ -47,10 +53,13 @@ def estadisticas():
     capture = OutputCapture()
     sys.stdout = capture
     from data_loader import print_statistics
+    from summary_stats import obtener_resumen, imprimir_desgloses
     print("="*80)
     print(" ESTADÍSTICAS BÁSICAS".center(80))
     print("="*80)
-    print_statistics(df_global, "Producto/Servicio")
+    resumen = obtener_resumen(df_global)
+    print_statistics(df_global, "Producto/Servicio", resumen)
+    imprimir_desgloses(resumen)
     from analyzer import get_orders_per_item_distribution
     get_orders_per_item_distribution(G_global)
     sys.stdout = sys.__stdout__
@@ -145,7 +154,8 @@ def mst():
     sys.stdout = capture
     try:
         from analisis_avanzado import ejecutar_mst_analisis
-        ejecutar_mst_analisis(G_global)
+        if ejecutar_mst_analisis(G_global) is not None:
+            registrar_visualizacion(MST_OUTPUT_FILE, clave_datos_global)
     except Exception as e:
         print(f"Error ejecutando MST: {e}")
     sys.stdout = sys.__stdout__
@@ -153,12 +163,27 @@ def mst():
 
 @app.route("/visualizar-mst")
 def visualizar_mst():
-    """Abre el grafo MST generado en otra pestaña"""
+    """Abre el grafo MST generado en otra pestaña; lo regenera si los datos cambiaron"""
+    if not visualizacion_vigente(MST_OUTPUT_FILE, clave_visualizacion()):
+        ensure_data_loaded()
+        capture = OutputCapture()
+        sys.stdout = capture
+        from analisis_avanzado import ejecutar_mst_analisis
+        if ejecutar_mst_analisis(G_global) is not None:
+            registrar_visualizacion(MST_OUTPUT_FILE, clave_datos_global)
+        sys.stdout = sys.__stdout__
+
     return redirect(url_for('static', filename='mst_red_proveedores.html'), code=302)
 
 @app.route("/generar-grafo")
 def generar_grafo():
-    """Abre grafo generado en otra pestaña"""
+    """Abre grafo generado en otra pestaña; lo regenera si los datos cambiaron"""
+    if not visualizacion_vigente(OUTPUT_FILE, clave_visualizacion()):
+        ensure_data_loaded()
+        capture = OutputCapture()
+        sys.stdout = capture
+        generar_visualizacion(G_global, top_items_global, clave=clave_datos_global)
+        sys.stdout = sys.__stdout__
 
     return redirect("/static/graphs/grafo_compras_interactivo.html", code=302)
 
@@ -1,21 +1,27 @@
 import networkx as nx
+import numpy as np
+import pandas as pd
 
+from node_store import compactar_atributos
+from graph_arrays import GrafoCompacto, TIPO_ITEM, TIPO_ORDEN, TIPO_PROVEEDOR
 
-def build_graph(df, nodo_tipo):
+# Subir este número si cambia la forma de construir el grafo (invalida los snapshots)
+VERSION_GRAFO = 3
 
-    # Construye un grafo vacío
-    G = nx.Graph()
 
+def agrupar_ordenes(df):
     # Agrupar preservando ORDEN_PROVEEDOR
-    df_grouped = df.groupby(
+    return df.groupby(
         ["ORDEN_NUMERO", "ORDEN_PROVEEDOR", "ORDEN_DESCRIPCION_NORM", "ORDEN_DESCRIPCION"],
-        as_index=False
+        as_index=False,
+        observed=True  # con columnas categóricas, solo combinaciones existentes
     ).agg({
         "ORDEN_MONTO": "sum"
     })
 
-    orden_proveedores = {}  # orden_numero -> set de proveedores
 
+def agregar_filas(G, df_grouped):
+    """Incorpora al grafo las filas agrupadas (nodos nuevos o acumulando en los existentes)."""
     for _, row in df_grouped.iterrows():
         orden_num = row['ORDEN_NUMERO']
         orden = f"Orden_{orden_num}"
@@ -24,10 +30,6 @@ def build_graph(df, nodo_tipo):
         item = f"Item_{row['ORDEN_DESCRIPCION_NORM']}"
         item_label = row['ORDEN_DESCRIPCION'][:80]
 
-        if orden_num not in orden_proveedores:
-            orden_proveedores[orden_num] = set()
-        orden_proveedores[orden_num].add(proveedor)
-
         if not G.has_node(orden):
             G.add_node(
                 orden,
@@ -38,7 +40,8 @@ def build_graph(df, nodo_tipo):
                 proveedores_set=set([proveedor])
             )
         else:
-            G.nodes[orden]['proveedores_set'].add(proveedor)
+            # Se reasigna en lugar de mutar: con el almacén columnar el set es una copia
+            G.nodes[orden]['proveedores_set'] = G.nodes[orden]['proveedores_set'] | {proveedor}
 
             if len(G.nodes[orden]['proveedores_set']) > 1:
                 # Mantener lista de todos los proveedores
@@ -61,6 +64,163 @@ def build_graph(df, nodo_tipo):
         else:
             G.add_edge(orden, item, weight=row["ORDEN_MONTO"])
 
+        if G.graph.get("con_proveedores"):
+            nodo_proveedor = f"Proveedor_{proveedor}"
+            if not G.has_node(nodo_proveedor):
+                G.add_node(nodo_proveedor, label=proveedor, type="proveedor")
+
+            montos = G[orden][item].setdefault('montos_proveedor', {})
+            montos[proveedor] = montos.get(proveedor, 0) + row["ORDEN_MONTO"]
+
+            if G.has_edge(orden, nodo_proveedor):
+                G[orden][nodo_proveedor]['weight'] += row["ORDEN_MONTO"]
+            else:
+                G.add_edge(orden, nodo_proveedor, weight=row["ORDEN_MONTO"])
+
+
+def asignar_proveedores(G, df):
+    """Proveedor de cada orden = el de su última fila en df."""
+    for _, row in df.iterrows():
+        key = f"Orden_{row['ORDEN_NUMERO']}"
+        if G.has_node(key):
+            proveedor = row.get("ORDEN_PROVEEDOR", "DESCONOCIDO")
+            G.nodes[key]["proveedor"] = proveedor
+            G.nodes[key]["ORDEN_PROVEEDOR"] = proveedor
+
+
+def fechas_orden(df):
+    """Fecha de cada orden ("AAAA-MM-DD", la más antigua de sus filas). Vacío si df no trae ORDEN_FECHA."""
+    if "ORDEN_FECHA" not in df.columns:
+        return {}
+    fechas = pd.to_datetime(df["ORDEN_FECHA"].astype(str), format="%d/%m/%Y", errors="coerce")
+    ordenes = ("Orden_" + df["ORDEN_NUMERO"].astype(str)).to_numpy(dtype=object)
+    primeras = fechas.groupby(ordenes, sort=False).min().dropna()
+    return dict(zip(primeras.index, primeras.dt.strftime("%Y-%m-%d")))
+
+
+def asignar_fechas(G, df):
+    """Fecha de cada orden de df; si la orden ya tenía una, se conserva la más antigua."""
+    for orden, fecha in fechas_orden(df).items():
+        if G.has_node(orden):
+            anterior = G.nodes[orden].get("fecha")
+            G.nodes[orden]["fecha"] = fecha if anterior is None else min(anterior, fecha)
+
+
+def actualizar_grafo(G, df_delta):
+    """
+    Agrega al grafo existente solo las filas nuevas (p. ej. las órdenes de un mes).
+    El costo es proporcional al tamaño de df_delta, no al historial completo.
+    Los ítems ya existentes conservan su etiqueta original.
+    """
+    nodos_antes = G.number_of_nodes()
+    aristas_antes = G.number_of_edges()
+
+    from graph_updates import agregar_orden
+    agregar_orden(G, df_delta)
+
+    print(f"Grafo actualizado: +{G.number_of_nodes() - nodos_antes:,} nodos, "
+          f"+{G.number_of_edges() - aristas_antes:,} aristas")
+    return G
+
+
+def _nodos_y_aristas(df, df_grouped, con_proveedores=False):
+    """
+    Atributos de nodos y aristas calculados por columnas sobre las filas agrupadas.
+    Conserva el orden de inserción del recorrido fila a fila (orden, ítem, orden, ítem...)
+    """
+    ordenes = ("Orden_" + df_grouped["ORDEN_NUMERO"].astype(str)).to_numpy(dtype=object)
+    items = ("Item_" + df_grouped["ORDEN_DESCRIPCION_NORM"].astype(str)).to_numpy(dtype=object)
+
+    intercalados = np.empty(2 * len(df_grouped), dtype=object)
+    intercalados[0::2] = ordenes
+    intercalados[1::2] = items
+    orden_nodos = pd.unique(intercalados)
+
+    # Órdenes: proveedores en el orden en que aparecen y proveedor de la última fila de df
+    por_orden = pd.DataFrame({
+        "nodo": ordenes,
+        "numero": df_grouped["ORDEN_NUMERO"].to_numpy(dtype=object),
+        "proveedor": df_grouped["ORDEN_PROVEEDOR"].to_numpy(dtype=object),
+    })
+    proveedores = por_orden.drop_duplicates(["nodo", "proveedor"]).groupby("nodo", sort=False)["proveedor"].agg(list)
+    numero_orden = por_orden.drop_duplicates("nodo").set_index("nodo")["numero"]
+
+    ultimas = df.drop_duplicates("ORDEN_NUMERO", keep="last")
+    ultimo_proveedor = dict(zip("Orden_" + ultimas["ORDEN_NUMERO"].astype(str),
+                                ultimas["ORDEN_PROVEEDOR"].to_numpy(dtype=object)))
+
+    fechas = fechas_orden(df)
+
+    atributos = {}
+    for nodo, lista in proveedores.items():
+        proveedor = ultimo_proveedor.get(nodo, lista[0])
+        datos = {
+            "label": numero_orden[nodo],
+            "type": "orden",
+            "proveedor": proveedor,
+            "ORDEN_PROVEEDOR": proveedor,
+            "proveedores_set": set(lista),
+        }
+        if len(lista) > 1:
+            datos["proveedores_lista"] = list(datos["proveedores_set"])
+            datos["es_multiple"] = True
+        if nodo in fechas:
+            datos["fecha"] = fechas[nodo]
+        atributos[nodo] = datos
+
+    # Ítems: la etiqueta original es la de su primera fila
+    primeras = df_grouped.drop_duplicates("ORDEN_DESCRIPCION_NORM")
+    for norm, descripcion in zip(primeras["ORDEN_DESCRIPCION_NORM"].to_numpy(dtype=object),
+                                 primeras["ORDEN_DESCRIPCION"].to_numpy(dtype=object)):
+        atributos[f"Item_{norm}"] = {"label": norm, "label_original": descripcion[:80], "type": "item"}
+
+    # Aristas: monto acumulado por par (orden, ítem) en el orden de aparición
+    montos = pd.Series(df_grouped["ORDEN_MONTO"].to_numpy(dtype=float))
+    pesos = montos.groupby([ordenes, items], sort=False).sum()
+
+    nodos = [(nodo, atributos[nodo]) for nodo in orden_nodos]
+    aristas = [(orden, item, {"weight": peso}) for (orden, item), peso in pesos.items()]
+
+    if con_proveedores:
+        proveedores_fila = por_orden["proveedor"].to_numpy(dtype=object)
+
+        # Cuánto de cada arista orden-ítem corresponde a cada proveedor
+        por_proveedor = {}
+        for (orden, item, proveedor), monto in montos.groupby([ordenes, items, proveedores_fila], sort=False).sum().items():
+            por_proveedor.setdefault((orden, item), {})[proveedor] = monto
+        for orden, item, datos in aristas:
+            datos["montos_proveedor"] = por_proveedor[(orden, item)]
+
+        nodos += [(f"Proveedor_{p}", {"label": p, "type": "proveedor"}) for p in pd.unique(proveedores_fila)]
+        aristas += [
+            (orden, f"Proveedor_{proveedor}", {"weight": monto})
+            for (orden, proveedor), monto in montos.groupby([ordenes, proveedores_fila], sort=False).sum().items()
+        ]
+
+    return nodos, aristas
+
+
+def build_graph(df, nodo_tipo, con_proveedores=False, atributos_columnares=False):
+    """
+    Construye el grafo bipartito orden-ítem. El proveedor de cada orden es el de
+    su última fila en df (antes lo fijaba una segunda pasada en main).
+
+    con_proveedores=True agrega nodos 'proveedor' (Proveedor_<nombre>) unidos a
+    sus órdenes, con el monto de cada proveedor en la orden como peso, y en cada
+    arista orden-ítem el reparto 'montos_proveedor' {proveedor: monto}. Así las
+    órdenes con varios proveedores se atribuyen bien a cada uno.
+
+    atributos_columnares=True guarda los atributos de los nodos en un
+    AlmacenNodos (node_store) en lugar de un dict por nodo: menos memoria a
+    cambio de lecturas más lentas (ver AlmacenNodos).
+    """
+    G = nx.Graph(con_proveedores=con_proveedores)
+    nodos, aristas = _nodos_y_aristas(df, agrupar_ordenes(df), con_proveedores)
+    G.add_nodes_from(nodos)
+    G.add_edges_from(aristas)
+    if atributos_columnares:
+        compactar_atributos(G)
+
     ordenes_con_multiples_proveedores = sum(
         1 for n in G.nodes()
         if G.nodes[n]['type'] == 'orden' and len(G.nodes[n].get('proveedores_set', set())) > 1
@@ -71,6 +231,8 @@ def build_graph(df, nodo_tipo):
     print(f"Órdenes: {sum(1 for n in G.nodes() if G.nodes[n]['type'] == 'orden'):,}")
     print(f"Ítems ({nodo_tipo}): {sum(1 for n in G.nodes() if G.nodes[n]['type'] == 'item'):,}")
     print(f"Aristas: {G.number_of_edges():,}")
+    if con_proveedores:
+        print(f"Proveedores: {sum(1 for n in G.nodes() if G.nodes[n]['type'] == 'proveedor'):,}")
 
     if ordenes_con_multiples_proveedores > 0:
         print(f"Órdenes con múltiples proveedores: {ordenes_con_multiples_proveedores}")
@@ -92,28 +254,110 @@ def build_graph(df, nodo_tipo):
     return G
 
 
-def validate_graph_integrity(G):
+def validar_grafo(G, df=None, tolerancia=1e-6, max_ejemplos=5):
+    """
+    Valida el grafo en O(V+E) sobre arreglos (GrafoCompacto) y devuelve un reporte:
 
-    issues = []
+        {"ok": bool, "nodos": n, "aristas": m,
+         "conteos": {chequeo: cantidad}, "ejemplos": {chequeo: [...]}}
 
-    for node in G.nodes():
-        node_data = G.nodes[node]
+    Chequeos: tipos de nodo, aristas solo orden-ítem (u orden-proveedor en el
+    grafo tripartito), pesos finitos y positivos, nodos huérfanos, coherencia de
+    proveedores por orden y, si se pasa df, que las aristas de cada orden y de
+    cada ítem sumen lo mismo que ORDEN_MONTO en df.
+    """
+    C = GrafoCompacto.desde_networkx(G)
+    problemas = {}
 
-        if node_data['type'] == 'orden':
-            if 'proveedor' not in node_data and 'ORDEN_PROVEEDOR' not in node_data:
-                issues.append(f"Orden {node} sin información de proveedor")
+    def registrar(chequeo, nodos):
+        problemas[chequeo] = (len(nodos), list(nodos[:max_ejemplos]))
 
-            if 'proveedores_set' in node_data:
-                if len(node_data['proveedores_set']) > 1 and not node_data.get('es_multiple', False):
-                    issues.append(f"Orden {node} con múltiples proveedores no marcada correctamente")
+    tipos_validos = {"orden", "item", "proveedor"} if G.graph.get("con_proveedores") else {"orden", "item"}
+    registrar("tipo_invalido", [n for n, t in G.nodes(data="type") if t not in tipos_validos])
 
-    if issues:
-        print(" Problemas de integridad detectados:")
-        for issue in issues[:5]:  # Mostrar máximo 5 problemas
-            print(f"   - {issue}")
-        if len(issues) > 5:
-            print(f"   ... y {len(issues) - 5} más")
-    else:
+    # Aristas: orden con ítem (o con proveedor); nunca dos nodos del mismo lado
+    tipo_u = C.tipo[C.origen]
+    tipo_v = C.tipo[C.destino]
+    es_orden_item = ((tipo_u == TIPO_ORDEN) & (tipo_v == TIPO_ITEM)) | ((tipo_u == TIPO_ITEM) & (tipo_v == TIPO_ORDEN))
+    es_orden_proveedor = (((tipo_u == TIPO_ORDEN) & (tipo_v == TIPO_PROVEEDOR))
+                          | ((tipo_u == TIPO_PROVEEDOR) & (tipo_v == TIPO_ORDEN)))
+    invalidas = np.flatnonzero(~(es_orden_item | es_orden_proveedor))
+    registrar("arista_no_bipartita", [(C.nombres[C.origen[k]], C.nombres[C.destino[k]]) for k in invalidas])
+
+    pesos = C.peso_arista
+    malas = np.flatnonzero(~np.isfinite(pesos) | (pesos <= 0))
+    registrar("peso_invalido", [(C.nombres[C.origen[k]], C.nombres[C.destino[k]], float(pesos[k])) for k in malas])
+
+    registrar("nodo_huerfano", list(C.nombres[C.grados() == 0]))
+
+    # Proveedores: toda orden tiene uno y las de varios proveedores están marcadas
+    sin_proveedor = []
+    mal_marcadas = []
+    for nodo, datos in G.nodes(data=True):
+        if datos.get("type") != "orden":
+            continue
+        if 'proveedor' not in datos and 'ORDEN_PROVEEDOR' not in datos:
+            sin_proveedor.append(nodo)
+        conjunto = datos.get('proveedores_set')
+        if conjunto is not None and len(conjunto) > 1 and not datos.get('es_multiple', False):
+            mal_marcadas.append(nodo)
+    registrar("orden_sin_proveedor", sin_proveedor)
+    registrar("multiple_sin_marcar", mal_marcadas)
+
+    if G.graph.get("con_proveedores"):
+        # Los nodos proveedor de cada orden coinciden con su proveedores_set
+        distintos = []
+        for orden in np.flatnonzero(C.tipo == TIPO_ORDEN):
+            vecinos = C.vecinos_de(orden)
+            en_grafo = {C.etiquetas["label"][v] for v in vecinos[C.tipo[vecinos] == TIPO_PROVEEDOR]}
+            conjunto = G.nodes[C.nombres[orden]].get('proveedores_set')
+            if conjunto is not None and en_grafo != conjunto:
+                distintos.append(C.nombres[orden])
+        registrar("proveedores_distintos", distintos)
+
+    if df is not None:
+        # Suma de aristas orden-ítem por nodo frente a los totales de df
+        n = len(C)
+        suma = (np.bincount(C.origen[es_orden_item], weights=pesos[es_orden_item], minlength=n)
+                + np.bincount(C.destino[es_orden_item], weights=pesos[es_orden_item], minlength=n))
+
+        validas = df.dropna(subset=["ORDEN_NUMERO", "ORDEN_PROVEEDOR", "ORDEN_DESCRIPCION_NORM", "ORDEN_DESCRIPCION"])
+        for chequeo, columna, prefijo, tipo in [("monto_orden", "ORDEN_NUMERO", "Orden_", TIPO_ORDEN),
+                                                ("monto_item", "ORDEN_DESCRIPCION_NORM", "Item_", TIPO_ITEM)]:
+            esperado = validas.groupby(validas[columna].astype(str), observed=True)["ORDEN_MONTO"].sum()
+            esperado.index = prefijo + esperado.index
+            nodos = np.flatnonzero(C.tipo == tipo)
+            en_df = esperado.reindex(C.nombres[nodos]).to_numpy(dtype=float)
+            diferencia = np.abs(np.nan_to_num(en_df, nan=np.inf) - suma[nodos])
+            distintos = nodos[diferencia > tolerancia * np.maximum(1.0, np.abs(suma[nodos]))]
+            faltantes = esperado.index.difference(C.nombres[nodos])
+            registrar(chequeo, list(C.nombres[distintos]) + list(faltantes))
+
+    conteos = {chequeo: cantidad for chequeo, (cantidad, _) in problemas.items()}
+    return {
+        "ok": not any(conteos.values()),
+        "nodos": len(C),
+        "aristas": C.numero_aristas(),
+        "conteos": conteos,
+        "ejemplos": {chequeo: ejemplos for chequeo, (cantidad, ejemplos) in problemas.items() if cantidad},
+    }
+
+
+def imprimir_validacion(reporte):
+    if reporte["ok"]:
         print(" Integridad del grafo verificada correctamente")
+        return
+
+    print(" Problemas de integridad detectados:")
+    for chequeo, cantidad in reporte["conteos"].items():
+        if cantidad:
+            print(f"   - {chequeo}: {cantidad:,}")
+            for ejemplo in reporte["ejemplos"][chequeo]:
+                print(f"       {ejemplo}")
+
 
-    return len(issues) == 0
\ No newline at end of file
+def validate_graph_integrity(G, df=None):
+    """Valida el grafo (ver validar_grafo), imprime el resultado y devuelve True si no hay problemas."""
+    reporte = validar_grafo(G, df)
+    imprimir_validacion(reporte)
+    return reporte["ok"]
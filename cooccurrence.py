@@ -0,0 +1,100 @@
+import numpy as np
+
+# Producto BᵀB con scipy si está disponible; si no, vecinos a dos saltos con NumPy
+try:
+    from scipy.sparse import csr_matrix
+except ImportError:
+    csr_matrix = None
+
+from graph_arrays import TIPO_ITEM, TIPO_ORDEN
+from graph_index import cache_grafo, grafo_compacto
+
+
+class Coocurrencia:
+    """
+    Co-ocurrencia de ítems en órdenes, a partir de la matriz de incidencia
+    B (orden x ítem) del grafo:
+
+    - items / ordenes: nodos de cada tipo, en el orden de G
+    - items_por_orden[o]: ítems distintos de la orden o (filas de B)
+    - matriz = BᵀB: órdenes compartidas por cada par de ítems (la diagonal es
+      el número de órdenes del ítem); None si no hay scipy
+    - interconexiones[i]: otros ítems con los que i comparte al menos una orden
+    """
+
+    def __init__(self, G):
+        C = grafo_compacto(G)
+        self._compacto = C
+        pos_ordenes = C.nodos_de_tipo(TIPO_ORDEN)
+        pos_items = C.nodos_de_tipo(TIPO_ITEM)
+        self.ordenes = C.nombres[pos_ordenes].tolist()
+        self.items = C.nombres[pos_items].tolist()
+        self.indice_item = {item: i for i, item in enumerate(self.items)}
+
+        # Fila/columna de cada nodo del GrafoCompacto dentro de B
+        fila = np.full(len(C), -1, dtype=np.int64)
+        fila[pos_ordenes] = np.arange(len(pos_ordenes))
+        fila[pos_items] = np.arange(len(pos_items))
+        self._fila = fila
+        self._pos_items = pos_items
+
+        es_orden = C.tipo[C.origen] == TIPO_ORDEN
+        orden = np.where(es_orden, C.origen, C.destino)
+        item = np.where(es_orden, C.destino, C.origen)
+        validas = (C.tipo[orden] == TIPO_ORDEN) & (C.tipo[item] == TIPO_ITEM)
+        filas, columnas = fila[orden[validas]], fila[item[validas]]
+
+        self.items_por_orden = np.bincount(filas, minlength=len(self.ordenes))
+
+        if csr_matrix is not None:
+            B = csr_matrix((np.ones(len(filas), dtype=np.int32), (filas, columnas)),
+                           shape=(len(self.ordenes), len(self.items)))
+            self.matriz = (B.T @ B).tocsr()
+            con_ordenes = self.matriz.diagonal() > 0
+            self.interconexiones = np.diff(self.matriz.indptr) - con_ordenes
+        else:
+            self.matriz = None
+            self.interconexiones = np.fromiter(
+                (len(C.items_a_dos_saltos(p)) for p in pos_items), dtype=np.int64, count=len(pos_items)
+            )
+
+    def ordenes_multiples(self, minimo=2):
+        """Número de órdenes con al menos `minimo` ítems."""
+        return int(np.count_nonzero(self.items_por_orden >= minimo))
+
+    def histograma_items_por_orden(self):
+        """histograma[k] = número de órdenes con k ítems."""
+        return np.bincount(self.items_por_orden, minlength=1)
+
+    def interconexiones_de(self, items):
+        """{ítem: número de otros ítems con los que comparte órdenes}"""
+        return {item: int(self.interconexiones[self.indice_item[item]]) for item in items}
+
+    def compartidas(self, item_a, item_b):
+        """Órdenes en las que aparecen juntos item_a e item_b."""
+        i, j = self.indice_item[item_a], self.indice_item[item_b]
+        if self.matriz is not None:
+            return int(self.matriz[i, j])
+        C = self._compacto
+        return len(np.intersect1d(C.vecinos_de(self._pos_items[i]), C.vecinos_de(self._pos_items[j])))
+
+    def conectados(self, item):
+        """{otro ítem: órdenes compartidas} para los ítems que comparten órdenes con `item`."""
+        i = self.indice_item[item]
+        if self.matriz is not None:
+            inicio, fin = self.matriz.indptr[i], self.matriz.indptr[i + 1]
+            columnas = self.matriz.indices[inicio:fin]
+            cuentas = self.matriz.data[inicio:fin]
+        else:
+            C = self._compacto
+            segmentos = [C.vecinos_de(o) for o in C.vecinos_de(self._pos_items[i])]
+            vecinos = np.concatenate(segmentos) if segmentos else np.zeros(0, dtype=np.int64)
+            vecinos = vecinos[C.tipo[vecinos] == TIPO_ITEM]
+            nodos, cuentas = np.unique(vecinos, return_counts=True)
+            columnas = self._fila[nodos]
+        return {self.items[c]: int(n) for c, n in zip(columnas, cuentas) if c != i}
+
+
+def coocurrencia_items(G):
+    """Coocurrencia de G, reconstruida solo si el grafo cambió."""
+    return cache_grafo(G, "coocurrencia", Coocurrencia)
@@ -1,10 +1,37 @@
+import os
 import pandas as pd
+import numpy as np
 import warnings
+import glob
+import hashlib
+import json
 import re
+import sys
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from pattern_matcher import AutomataFrases
+from summary_stats import obtener_resumen
 
 warnings.filterwarnings('ignore')
 
+# Filas por bloque en la lectura por streaming
+TAMANO_BLOQUE = 50000
+
+# Columnas de texto repetitivas que en modo compacto pasan a categóricas
+COLUMNAS_CATEGORICAS = [
+    "ORDEN_NUMERO", "ORDEN_PROVEEDOR", "ORDEN_DESCRIPCION", "ORDEN_DESCRIPCION_NORM",
+    "ORDEN_PERIODO", "ORDEN_FECHA",
+]
+COLUMNAS_ENTERAS = ["ORDEN_TIPO", "ORDEN_ANNO", "ORDEN_MES", "ORDEN_NUMERO_SIAF"]
+
+# Identifican una orden entre exportaciones distintas; el mismo ORDEN_ANNO/ORDEN_NUMERO
+# se repite en órdenes de compra (tipo 1) y de servicio (tipo 2)
+CLAVES_ORDEN = ["ORDEN_TIPO", "ORDEN_ANNO", "ORDEN_NUMERO", "ORDEN_NUMERO_SIAF"]
+
+# Claves de agregación que consume build_graph
+CLAVES_AGREGADO = ["ORDEN_NUMERO", "ORDEN_PROVEEDOR", "ORDEN_DESCRIPCION_NORM"]
+
 # 1. CONSTANTES DE LIMPIEZA
 # Palabras que indican que lo que sigue es irrelevante para identificar el producto
 PALABRAS_CORTE = [
@@ -44,6 +71,49 @@ SINONIMOS = {
 }
 
 
+# Reglas categóricas: cada regla es (grupos, categoría). Se aplica la categoría
+# si el texto contiene al menos una palabra de CADA grupo. El orden es la prioridad.
+REGLAS_CATEGORICAS = [
+    ((("utiles",), ("escritorio", "oficina")), "utiles de escritorio"),
+    ((("limpieza",), ("material", "insumo", "utiles", "aseo")), "materiales de limpieza"),
+    ((("proteccion",), ("personal", "epp", "seguridad")), "equipos de proteccion personal epp"),
+    ((("vestuario", "indumentaria", "uniforme", "camisa", "polo"),), "vestuario institucional"),
+    ((("alquiler",), ("camioneta", "vehiculo", "minivan")), "alquiler de camioneta"),
+    ((("energia electrica", "suministro de energia"),), "servicio de energia electrica"),
+    ((("seguridad",), ("temporal", "vigilancia")), "servicio de seguridad y vigilancia"),
+    ((("consultoria",),), "servicio de consultoria"),
+]
+
+# Palabras que anulan la agrupación por sinónimos ("camioneta diesel" no es "diesel")
+EXCEPCIONES_SINONIMOS = ("camioneta", "alquiler")
+
+# Patrones precompilados (se usan en la ruta por fila y en la vectorizada)
+PATRON_PREFIJOS = re.compile(r"^(adqui\w+|adq\.|adq|contrat\w+|compra|suministro)\s*(de)?\s*")
+PATRON_SERVICIO = re.compile(r"^(servicio)\s*(de)?\s*")
+PATRON_CANTIDAD = re.compile(r"\bx\s*\d+.*")
+PATRON_UNIDADES = re.compile(r"\b\d+(\.\d+)?\s*(gr|g|kg|ml|l|gal|hp|mm|cm|in|watts|w)\b")
+PATRON_TAMANO = re.compile(r"\btamaño\s*a\d")
+PATRON_ESPECIALES = re.compile(r"[^\w\s]")
+PATRON_ESPACIOS = re.compile(r"\s+")
+
+# Autómatas multipatrón (una sola pasada por texto para cortes y sinónimos).
+# El id de cada frase es su posición: respeta el orden de las tablas.
+AUTOMATA_CORTES = AutomataFrases(PALABRAS_CORTE)
+AUTOMATA_SINONIMOS = AutomataFrases(SINONIMOS.keys())
+VALORES_SINONIMOS = list(SINONIMOS.values())
+
+# Subir este número si cambia la lógica de normalize_products (no solo sus tablas)
+VERSION_NORMALIZADOR = 1
+
+_tabla_marcas = None
+
+
+def version_reglas_normalizacion():
+    """Huella de las reglas de normalización; cambia si cambian las tablas o el normalizador."""
+    reglas = [VERSION_NORMALIZADOR, PALABRAS_CORTE, SINONIMOS, REGLAS_CATEGORICAS, EXCEPCIONES_SINONIMOS]
+    return hashlib.sha1(json.dumps(reglas, ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+
+
 def quitar_tildes(text):
     return ''.join(
         c for c in unicodedata.normalize('NFD', text)
@@ -51,6 +121,38 @@ def quitar_tildes(text):
     )
 
 
+def tabla_marcas():
+    """Tabla para str.translate que elimina los caracteres Mn (equivale a quitar_tildes tras NFD)."""
+    global _tabla_marcas
+    if _tabla_marcas is None:
+        _tabla_marcas = {
+            c: None for c in range(sys.maxunicode + 1)
+            if unicodedata.category(chr(c)) == 'Mn'
+        }
+    return _tabla_marcas
+
+
+def aplicar_regla_categorica(text):
+    for grupos, categoria in REGLAS_CATEGORICAS:
+        if all(any(palabra in text for palabra in grupo) for grupo in grupos):
+            return categoria
+    return None
+
+
+def cortar_contexto(text):
+    """Paso C de normalize_products: corta en cada palabra de PALABRAS_CORTE, en orden."""
+    return AUTOMATA_CORTES.cortar_en_orden(text)
+
+
+def buscar_sinonimo(text):
+    """Paso F: valor estándar de la primera clave de SINONIMOS presente como palabra completa."""
+    # Excepción: No convertir "camioneta diesel" en solo "diesel"
+    if any(palabra in text for palabra in EXCEPCIONES_SINONIMOS):
+        return None
+    pid = AUTOMATA_SINONIMOS.primera_palabra_completa(text)
+    return VALORES_SINONIMOS[pid] if pid is not None else None
+
+
 def normalize_products(text):
     """
     Normaliza descripciones complejas de compras estatales a categorías estándar.
@@ -65,59 +167,114 @@ def normalize_products(text):
 
     # B. ELIMINAR PREFIJOS ADMINISTRATIVOS
     # Borra: "adquisicion de", "servicio de", "compra de", "suministro de"
-    text = re.sub(r"^(adqui\w+|adq\.|adq|contrat\w+|compra|suministro)\s*(de)?\s*", "", text)
+    text = PATRON_PREFIJOS.sub("", text)
 
     # Mantener "servicio" si es explícito, pero limpiarlo
     if text.startswith("servicio"):
-        text = re.sub(r"^(servicio)\s*(de)?\s*", "servicio ", text)
+        text = PATRON_SERVICIO.sub("servicio ", text)
 
         # C. CORTE AGRESIVO DE CONTEXTO
     # Si encuentra " para la obra...", borra todo lo que sigue.
-    for corte in PALABRAS_CORTE:
-        if corte in text:
-            text = text.split(corte)[0]
+    text = cortar_contexto(text)
 
     # D. LIMPIEZA DE ESPECIFICACIONES TÉCNICAS (Ruido numérico)
-    text = re.sub(r"\bx\s*\d+.*", "", text)  # Borra "x 20 litros", "x 400g"
+    text = PATRON_CANTIDAD.sub("", text)  # Borra "x 20 litros", "x 400g"
     # Borra unidades técnicas: 80g, 42.5kg, 20l, 500ml, etc.
-    text = re.sub(r"\b\d+(\.\d+)?\s*(gr|g|kg|ml|l|gal|hp|mm|cm|in|watts|w)\b", "", text)
-    text = re.sub(r"\btamaño\s*a\d", "", text)  # Borra "tamaño a4", "a3"
-    text = re.sub(r"[^\w\s]", "", text)  # Borra caracteres especiales sobrantes
+    text = PATRON_UNIDADES.sub("", text)
+    text = PATRON_TAMANO.sub("", text)  # Borra "tamaño a4", "a3"
+    text = PATRON_ESPECIALES.sub("", text)  # Borra caracteres especiales sobrantes
 
     # E. REGLAS CATEGÓRICAS (Agrupación forzada)
     # Si contiene estas palabras clave, forzamos el nombre de la categoría
-    if "utiles" in text and ("escritorio" in text or "oficina" in text):
-        return "utiles de escritorio"
-    if "limpieza" in text and ("material" in text or "insumo" in text or "utiles" in text or "aseo" in text):
-        return "materiales de limpieza"
-    if "proteccion" in text and ("personal" in text or "epp" in text or "seguridad" in text):
-        return "equipos de proteccion personal epp"
-    if "vestuario" in text or "indumentaria" in text or "uniforme" in text or "camisa" in text or "polo" in text:
-        return "vestuario institucional"
-    if "alquiler" in text and ("camioneta" in text or "vehiculo" in text or "minivan" in text):
-        return "alquiler de camioneta"
-    if "energia electrica" in text or "suministro de energia" in text:
-        return "servicio de energia electrica"
-    if "seguridad" in text and ("temporal" in text or "vigilancia" in text):
-        return "servicio de seguridad y vigilancia"
-    if "consultoria" in text:
-        return "servicio de consultoria"
+    categoria = aplicar_regla_categorica(text)
+    if categoria is not None:
+        return categoria
 
     # F. AGRUPACIÓN SEMÁNTICA (Sinónimos)
-    for clave, valor_estandar in SINONIMOS.items():
-        # Busca la palabra clave como palabra completa
-        if re.search(r"\b" + re.escape(clave) + r"\b", text):
-            # Excepción: No convertir "camioneta diesel" en solo "diesel"
-            if "camioneta" not in text and "alquiler" not in text:
-                return valor_estandar
+    # Busca las palabras clave como palabras completas
+    valor_estandar = buscar_sinonimo(text)
+    if valor_estandar is not None:
+        return valor_estandar
 
     # G. Limpieza final de espacios dobles
-    text = re.sub(r"\s+", " ", text).strip()
+    text = PATRON_ESPACIOS.sub(" ", text).strip()
 
     return text
 
 
-def load_data(file_path):
+def normalize_products_batch(serie, vectorizado=True):
+    """
+    Normaliza una Serie completa de descripciones con patrones precompilados y
+    operaciones .str. Da exactamente el mismo resultado que normalize_products;
+    con vectorizado=False se usa la ruta antigua fila por fila (para comparar).
+    """
+    if not vectorizado:
+        return serie.apply(normalize_products)
+
+    resultado = pd.Series("desconocido", index=serie.index, dtype=object)
+    es_texto = serie.map(lambda x: isinstance(x, str)).to_numpy(dtype=bool)
+    if not es_texto.any():
+        return resultado
+
+    # Se trabaja con índice posicional para no depender del índice del DataFrame
+    text = pd.Series(serie.to_numpy(dtype=object)[es_texto])
+
+    # A. Limpieza básica
+    text = text.str.lower().str.strip()
+    text = text.str.normalize('NFD').str.translate(tabla_marcas())
+
+    # B. Prefijos administrativos y "servicio"
+    text = text.str.replace(PATRON_PREFIJOS, "", regex=True)
+    text = text.str.replace(PATRON_SERVICIO, "servicio ", regex=True)
+
+    # C. Corte de contexto
+    text = text.map(cortar_contexto)
+
+    # D. Especificaciones técnicas
+    text = text.str.replace(PATRON_CANTIDAD, "", regex=True)
+    text = text.str.replace(PATRON_UNIDADES, "", regex=True)
+    text = text.str.replace(PATRON_TAMANO, "", regex=True)
+    text = text.str.replace(PATRON_ESPECIALES, "", regex=True)
+
+    # E. Reglas categóricas: gana la primera regla que se cumple.
+    # Cada pasada solo recorre las filas que aún no tienen categoría.
+    final = pd.Series(None, index=text.index, dtype=object)
+    pendiente = text
+    for grupos, categoria in REGLAS_CATEGORICAS:
+        candidatas = pendiente
+        for grupo in grupos:
+            hay_palabra = pd.Series(False, index=candidatas.index)
+            for palabra in grupo:
+                hay_palabra |= candidatas.str.contains(palabra, regex=False)
+            candidatas = candidatas[hay_palabra]
+        final[candidatas.index] = categoria
+        pendiente = pendiente.drop(candidatas.index)
+
+    # F. Sinónimos: gana la primera clave (orden del diccionario), en una pasada
+    sinonimos = pendiente.map(buscar_sinonimo)
+    final[sinonimos.index] = sinonimos
+
+    # G. Espacios dobles para los que no cayeron en ninguna categoría
+    sin_categoria = final.isna()
+    final[sin_categoria] = text[sin_categoria].str.replace(PATRON_ESPACIOS, " ", regex=True).str.strip()
+
+    resultado[es_texto] = final.to_numpy()
+    return resultado
+
+
+def listar_archivos(ruta):
+    """Archivos CSV de una ruta: un archivo, un directorio (todos sus *.csv) o un patrón glob."""
+    if os.path.isdir(ruta):
+        return sorted(glob.glob(os.path.join(ruta, "*.csv")))
+    if glob.has_magic(ruta):
+        return sorted(glob.glob(ruta))
+    return [ruta]
+
+
+def load_data(file_path, n_procesos=None):
+    if os.path.isdir(file_path) or glob.has_magic(file_path):
+        return load_data_multiple(file_path, n_procesos=n_procesos)
+
     try:
         df = pd.read_csv(file_path, encoding='utf-8', sep=';')
         print("Archivo CSV cargado exitosamente con delimitador ';'")
@@ -127,18 +284,87 @@ def load_data(file_path):
         return None
 
 
-def clean_data(df, filtro_tipo=None):
+def _leer_csv(ruta):
+    df = pd.read_csv(ruta, encoding='utf-8', sep=';')
+    # Alinear nombres de columnas entre exportaciones (espacios, BOM, mayúsculas)
+    df.columns = [str(c).replace("\ufeff", "").strip().upper() for c in df.columns]
+    return df
+
+
+def load_data_multiple(ruta, n_procesos=None):
+    """
+    Carga varias exportaciones (directorio o patrón glob) en paralelo, alinea sus
+    columnas y las concatena en orden de nombre de archivo. Las órdenes que
+    aparecen en más de una exportación se conservan solo del primer archivo.
+    """
+    archivos = listar_archivos(ruta)
+    if not archivos:
+        print(f" No se encontraron archivos CSV en: {ruta}")
+        return None
+
+    try:
+        with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+            frames = list(pool.map(_leer_csv, archivos))
+    except Exception as e:
+        print(f" Lectura de archivos falló: {e}")
+        return None
+
+    # Esquema común: columnas en orden de primera aparición
+    columnas = []
+    for frame in frames:
+        columnas.extend(c for c in frame.columns if c not in columnas)
+
+    df = pd.concat(
+        [frame.reindex(columns=columnas).assign(_ARCHIVO=i) for i, frame in enumerate(frames)],
+        ignore_index=True
+    )
+    antes = len(df)
+    df = deduplicar_ordenes(df)
+
+    print(f"{len(archivos)} archivos CSV cargados ({antes:,} registros)")
+    print(f"✓ Registros de órdenes repetidas entre exportaciones eliminados: {antes - len(df):,}")
+    return df.drop(columns="_ARCHIVO").reset_index(drop=True)
+
+
+def deduplicar_ordenes(df):
+    """Conserva cada orden (ORDEN_TIPO + ORDEN_ANNO + ORDEN_NUMERO/ORDEN_NUMERO_SIAF) solo del primer archivo donde aparece."""
+    claves = [c for c in CLAVES_ORDEN if c in df.columns]
+    if "_ARCHIVO" not in df.columns or not claves:
+        return df
+
+    primer_archivo = df.groupby(llave_orden(df, claves))["_ARCHIVO"].transform("min")
+    return df[df["_ARCHIVO"] == primer_archivo]
+
+
+def llave_orden(df, claves):
+    """Clave de texto "v1|v2|..." por fila; una exportación puede traer las columnas como número."""
+    llave = None
+    for col in claves:
+        valores = df[col].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+        llave = valores if llave is None else llave + "|" + valores
+    return llave
+
+
+def clean_data(df, filtro_tipo=None, vectorizado=True, usar_cache=True, cache=None, verbose=True,
+               compacto=False, n_procesos=None):
     if df is None:
         return None
 
+    if n_procesos is not None and n_procesos > 1 and len(df) >= 2 * n_procesos:
+        return clean_data_paralelo(df, filtro_tipo, vectorizado, usar_cache, cache, verbose,
+                                   compacto, n_procesos)
+
+    # En modo silencioso (p. ej. limpieza por bloques) no se imprime nada
+    log = print if verbose else (lambda *args, **kwargs: None)
+
     original_len = len(df)
 
-    print(f"Columnas encontradas: {list(df.columns)}")
-    print()
+    log(f"Columnas encontradas: {list(df.columns)}")
+    log()
 
     # Eliminar filas vacías clave
     df = df.dropna(subset=["ORDEN_NUMERO", "ORDEN_DESCRIPCION"])
-    print(f"Registros eliminados (sin ORDEN_NUMERO o ORDEN_DESCRIPCION): {original_len - len(df)}")
+    log(f"Registros eliminados (sin ORDEN_NUMERO o ORDEN_DESCRIPCION): {original_len - len(df)}")
 
     # Filtro opcional por tipo (Producto/Servicio)
     if filtro_tipo is not None:
@@ -150,18 +376,30 @@ def clean_data(df, filtro_tipo=None):
             df = df[df['ORDEN_TIPO'] == filtro_tipo]
             tipo_str = f"tipo {filtro_tipo} ({'Productos' if filtro_tipo == 1 else 'Servicios'})"
 
-        print(f"✓ Filtrado por {tipo_str}: {len(df)} registros (excluidos: {antes_filtro - len(df)})")
+        log(f"✓ Filtrado por {tipo_str}: {len(df)} registros (excluidos: {antes_filtro - len(df)})")
 
     # Limpieza de textos básicos
     df["ORDEN_NUMERO"] = df["ORDEN_NUMERO"].astype(str).str.strip()
     df["ORDEN_DESCRIPCION"] = df["ORDEN_DESCRIPCION"].astype(str).str.strip()
 
     # ID Único temporal (aunque puede haber duplicados si la orden tiene varios ítems)
-    df["ITEM_ID"] = df["ORDEN_NUMERO"] + "_" + df["ORDEN_DESCRIPCION"]
+    # En modo compacto no se materializa: ver item_ids()
+    if not compacto:
+        df["ITEM_ID"] = item_ids(df)
 
     # --- NORMALIZACIÓN AVANZADA ---
-    print("Aplicando normalización avanzada de productos...")
-    df["ORDEN_DESCRIPCION_NORM"] = df["ORDEN_DESCRIPCION"].apply(normalize_products)
+    log("Aplicando normalización avanzada de productos...")
+    if usar_cache:
+        from normalization_cache import CacheNormalizacion
+        cache_propia = cache is None
+        if cache_propia:
+            cache = CacheNormalizacion()
+        df["ORDEN_DESCRIPCION_NORM"] = cache.normalizar(df["ORDEN_DESCRIPCION"], vectorizado=vectorizado,
+                                                        verbose=verbose)
+        if cache_propia:
+            cache.guardar()
+    else:
+        df["ORDEN_DESCRIPCION_NORM"] = normalize_products_batch(df["ORDEN_DESCRIPCION"], vectorizado=vectorizado)
 
     # Limpiar columna ORDEN_MONTO (manejo robusto de S/, comas y espacios)
     if df["ORDEN_MONTO"].dtype == 'object':
@@ -176,29 +414,200 @@ def clean_data(df, filtro_tipo=None):
 
     # Filtrar órdenes con monto positivo (eliminar errores o anulaciones)
     df = df[df["ORDEN_MONTO"] > 0]
-    print(f"✓ Registros válidos para análisis: {len(df):,}")
+
+    if compacto:
+        df = compactar(df)
+        log(f"✓ Modo compacto: {df.memory_usage(deep=True).sum() / 1024 ** 2:,.2f} MB en memoria")
+    log(f"✓ Registros válidos para análisis: {len(df):,}")
 
     # Mostrar distribución por tipo si existe la columna
+    if verbose:
+        imprimir_distribucion_tipos(df)
+    log()
+
+    return df
+
+
+def imprimir_distribucion_tipos(df):
     if 'ORDEN_TIPO' in df.columns:
         print("\nDistribución por tipo:")
-        for tipo in sorted(df['ORDEN_TIPO'].unique()):
-            count = len(df[df['ORDEN_TIPO'] == tipo])
+        for tipo, count in df['ORDEN_TIPO'].value_counts(sort=False).sort_index().items():
+            if count == 0:
+                continue
             tipo_nombre = "Productos" if tipo == 1 else f"Tipo {tipo}"
             print(f"  - {tipo_nombre}: {count:,} registros")
-    print()
 
+
+def _limpiar_particion(args):
+    # Se ejecuta en un proceso hijo: limpieza silenciosa con la parte de la caché
+    # persistente que corresponde a su partición (en memoria, sin archivo)
+    particion, filtro_tipo, vectorizado, conocidas = args
+    if conocidas is None:
+        return clean_data(particion, filtro_tipo=filtro_tipo, vectorizado=vectorizado,
+                          usar_cache=False, verbose=False)
+
+    from normalization_cache import CacheNormalizacion
+    return clean_data(particion, filtro_tipo=filtro_tipo, vectorizado=vectorizado,
+                      cache=CacheNormalizacion(entradas=conocidas), verbose=False)
+
+
+def _descripciones_unicas(df):
+    # Las mismas claves que usa clean_data para normalizar
+    return df["ORDEN_DESCRIPCION"].dropna().astype(str).str.strip().unique()
+
+
+def clean_data_paralelo(df, filtro_tipo=None, vectorizado=True, usar_cache=True, cache=None,
+                        verbose=True, compacto=False, n_procesos=None):
+    """
+    Divide df en particiones contiguas de filas y ejecuta clean_data en un pool
+    de procesos. Las particiones se concatenan en su orden original, así que el
+    resultado es idéntico al de la limpieza en un solo proceso.
+    Cada proceso recibe las entradas de la caché de normalización que necesita, y
+    lo que normalizan se registra después en la caché.
+    """
+    n_procesos = n_procesos or os.cpu_count() or 1
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    log(f"Columnas encontradas: {list(df.columns)}")
+    log()
+
+    cache_propia = False
+    if usar_cache:
+        from normalization_cache import CacheNormalizacion
+        cache_propia = cache is None
+        if cache_propia:
+            cache = CacheNormalizacion()
+
+    limites = np.linspace(0, len(df), n_procesos + 1).astype(int)
+    particiones = [df.iloc[inicio:fin] for inicio, fin in zip(limites[:-1], limites[1:])]
+    conocidas = [cache.conocidas(_descripciones_unicas(p)) if usar_cache else None for p in particiones]
+    log(f"Limpieza en paralelo: {len(particiones)} particiones en {n_procesos} procesos")
+
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        partes = list(pool.map(_limpiar_particion,
+                               [(particion, filtro_tipo, vectorizado, c) for particion, c in zip(particiones, conocidas)]))
+    resultado = pd.concat(partes)
+
+    if usar_cache:
+        nuevas = cache.registrar(resultado["ORDEN_DESCRIPCION"], resultado["ORDEN_DESCRIPCION_NORM"])
+        log(f"  Descripciones tomadas de la caché: {sum(len(c) for c in conocidas):,} | nuevas: {nuevas:,}")
+        if cache_propia:
+            cache.guardar()
+
+    if compacto:
+        resultado = compactar(resultado)
+
+    log(f"✓ Registros válidos para análisis: {len(resultado):,}")
+    if verbose:
+        imprimir_distribucion_tipos(resultado)
+    log()
+
+    return resultado
+
+
+def item_ids(df):
+    """ITEM_ID (orden + descripción) calculado bajo demanda."""
+    return df["ORDEN_NUMERO"].astype(str) + "_" + df["ORDEN_DESCRIPCION"].astype(str)
+
+
+def compactar(df):
+    """
+    Representación compacta: textos repetidos como categóricas (códigos enteros
+    con diccionario), enteros con el menor tipo posible y montos en float64.
+    """
+    df = df.drop(columns=["ITEM_ID"], errors="ignore")  # derivable con item_ids()
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in COLUMNAS_ENTERAS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    df["ORDEN_MONTO"] = df["ORDEN_MONTO"].astype("float64")
     return df
 
 
-def print_statistics(df, nodo_tipo):
+def agregar_bloque(df):
+    """
+    Suma ORDEN_MONTO por (ORDEN_NUMERO, ORDEN_PROVEEDOR, ORDEN_DESCRIPCION_NORM).
+    Conserva la ORDEN_DESCRIPCION mínima (la que build_graph usaría como etiqueta)
+    y la última fila de origen (_FILA) para respetar el orden del archivo.
+    """
+    return df.groupby(CLAVES_AGREGADO, as_index=False, sort=False, observed=True).agg(
+        ORDEN_DESCRIPCION=("ORDEN_DESCRIPCION", "min"),
+        ORDEN_MONTO=("ORDEN_MONTO", "sum"),
+        _FILA=("_FILA", "max"),
+    )
+
+
+def combinar_agregados(parciales):
+    if len(parciales) == 1:
+        return parciales[0]
+    return agregar_bloque(pd.concat(parciales, ignore_index=True))
+
+
+def load_and_clean_streaming(file_path, filtro_tipo=None, tamano_bloque=TAMANO_BLOQUE,
+                             vectorizado=True, usar_cache=True):
+    """
+    Lee el CSV por bloques de tamano_bloque filas, limpia y normaliza cada bloque
+    y acumula solo las sumas por (orden, proveedor, ítem). La memoria queda acotada
+    por el tamaño del bloque y por el número de combinaciones distintas, no por el
+    tamaño del archivo. El resultado se puede pasar directamente a build_graph.
+    """
+    cache = None
+    if usar_cache:
+        from normalization_cache import CacheNormalizacion
+        cache = CacheNormalizacion()
+
+    parciales = []
+    leidos = 0
+    validos = 0
+
+    try:
+        lector = pd.read_csv(file_path, encoding='utf-8', sep=';', chunksize=tamano_bloque)
+        for bloque in lector:
+            leidos += len(bloque)
+            limpio = clean_data(bloque, filtro_tipo=filtro_tipo, vectorizado=vectorizado,
+                                usar_cache=usar_cache, cache=cache, verbose=False)
+            validos += len(limpio)
+
+            # El índice del lector es la posición de la fila en el archivo
+            limpio = limpio.assign(_FILA=limpio.index)
+            parciales.append(agregar_bloque(limpio))
+
+            # Compactar de vez en cuando para no acumular bloques
+            if len(parciales) >= 8:
+                parciales = [combinar_agregados(parciales)]
+    except Exception as e:
+        print(f" Lectura por bloques falló: {e}")
+        return None
+
+    if cache is not None:
+        cache.guardar()
+
+    if not parciales:
+        return None
+
+    agregado = combinar_agregados(parciales)
+    agregado = agregado.sort_values("_FILA").drop(columns="_FILA").reset_index(drop=True)
+
+    print(f"Archivo CSV leído por bloques de {tamano_bloque:,} filas")
+    print(f"✓ Registros leídos: {leidos:,} | válidos: {validos:,} | combinaciones agregadas: {len(agregado):,}")
+    print()
+
+    return agregado
+
+
+def print_statistics(df, nodo_tipo, resumen=None):
     if df is None: return
 
     print("Datos de ordenes e items de compra:")
     print()
-    print(f"Número de órdenes únicas: {df['ORDEN_NUMERO'].nunique():,}")
-    print(f"Número de ítems únicos: {df['ORDEN_DESCRIPCION_NORM'].nunique():,}")
-    print(f"Monto total: S/ {df['ORDEN_MONTO'].sum():,.2f}")
-    print(f"Monto promedio por ítem: S/ {df['ORDEN_MONTO'].mean():,.2f}")
-    print(f"Monto mínimo: S/ {df['ORDEN_MONTO'].min():,.2f}")
-    print(f"Monto máximo: S/ {df['ORDEN_MONTO'].max():,.2f}")
+    resumen = resumen or obtener_resumen(df)
+    monto = resumen["monto"]
+    print(f"Número de órdenes únicas: {resumen['ordenes']:,}")
+    print(f"Número de ítems únicos: {resumen['items']:,}")
+    print(f"Monto total: S/ {monto['total']:,.2f}")
+    print(f"Monto promedio por ítem: S/ {monto['promedio']:,.2f}")
+    print(f"Monto mínimo: S/ {monto['minimo']:,.2f}")
+    print(f"Monto máximo: S/ {monto['maximo']:,.2f}")
     print()
\ No newline at end of file
@@ -0,0 +1,309 @@
+import glob
+import hashlib
+import io
+import os
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    CLAVES_ORDEN, load_data, clean_data, compactar, listar_archivos, llave_orden, version_reglas_normalizacion
+)
+from summary_stats import obtener_resumen, vincular_resumen
+
+CACHE_DIR = ".cache"
+
+# Subir este número si cambia la lógica de clean_data
+VERSION_LIMPIEZA = 1
+
+# Ingesta incremental: bytes anteriores a la marca de agua que se comparan para
+# detectar un archivo reescrito, y partes guardadas antes de consolidarlas en una
+BYTES_HUELLA = 1 << 16
+MAX_PARTES = 32
+
+# Formato columnar si hay pyarrow; si no, pickle de pandas (bloques NumPy)
+try:
+    import pyarrow  # noqa: F401
+    FORMATO = "parquet"
+except ImportError:
+    FORMATO = "pkl"
+
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    """SHA-1 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def clave_dataset(file_path, filtro_tipo=None, compacto=False):
+    """Clave de caché: contenido de los CSV + versión de limpieza y de normalización + opciones."""
+    partes = [hash_archivo(ruta) for ruta in listar_archivos(file_path)]
+    partes += [str(VERSION_LIMPIEZA), version_reglas_normalizacion(), repr(filtro_tipo), repr(compacto)]
+    return hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:16]
+
+
+def _nombre_fuente(file_path):
+    # Un archivo, un directorio o un patrón glob -> nombre seguro para el archivo de caché
+    nombre = os.path.splitext(os.path.normpath(file_path))[0]
+    return re.sub(r"\W+", "_", nombre).strip("_")[-60:] or "dataset"
+
+
+def variante(*opciones):
+    """Código corto de las opciones de una caché (filtro_tipo, compacto...)."""
+    return hashlib.sha1("|".join(repr(o) for o in opciones).encode("utf-8")).hexdigest()[:8]
+
+
+def _ruta_cache(file_path, clave, filtro_tipo=None, compacto=False):
+    nombre = f"dataset_{_nombre_fuente(file_path)}_{variante(filtro_tipo, compacto)}_{clave}.{FORMATO}"
+    return os.path.join(CACHE_DIR, nombre)
+
+
+def _leer(ruta):
+    if FORMATO == "parquet":
+        return pd.read_parquet(ruta)
+    return pd.read_pickle(ruta)
+
+
+def _escribir(df, ruta):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporal = ruta + ".tmp"
+    if FORMATO == "parquet":
+        df.to_parquet(temporal)
+    else:
+        df.to_pickle(temporal)
+    os.replace(temporal, ruta)
+
+
+def eliminar_obsoletos(ruta_vigente):
+    """
+    Borra las versiones anteriores de la misma caché: mismo origen y misma
+    variante, con otra clave. No toca otras variantes ni orígenes cuyo nombre
+    empiece igual (el nombre del archivo debe calzar completo).
+    """
+    carpeta, nombre = os.path.split(ruta_vigente)
+    prefijo, extension = re.fullmatch(r"(.+_)[0-9a-f]{16}(\.\w+)", nombre).groups()
+    patron = re.compile(re.escape(prefijo) + r"[0-9a-f]{16}" + re.escape(extension))
+    for ruta in glob.glob(os.path.join(carpeta, glob.escape(prefijo) + "*")):
+        if patron.fullmatch(os.path.basename(ruta)) and ruta != ruta_vigente:
+            os.remove(ruta)
+
+
+def load_clean_data_cached(file_path, filtro_tipo=None, compacto=False, n_procesos=None):
+    """
+    Devuelve el DataFrame limpio de file_path. Si ya existe una caché con la misma
+    clave se carga directamente; si el CSV o las reglas cambiaron se vuelve a
+    limpiar y se reemplaza la caché.
+    """
+    clave = clave_dataset(file_path, filtro_tipo, compacto)
+    ruta = _ruta_cache(file_path, clave, filtro_tipo, compacto)
+
+    if os.path.exists(ruta):
+        try:
+            df = _leer(ruta)
+            vincular_resumen(df)
+            print(f"✓ Datos limpios cargados desde caché: {ruta} ({len(df):,} registros)")
+            print()
+            return df
+        except Exception as e:
+            print(f" No se pudo leer la caché de datos: {e}")
+
+    df = clean_data(load_data(file_path, n_procesos=n_procesos), filtro_tipo=filtro_tipo, compacto=compacto,
+                    n_procesos=n_procesos)
+    if df is None:
+        return None
+
+    # El resumen viaja en df.attrs dentro de la misma caché
+    obtener_resumen(df)
+    try:
+        _escribir(df, ruta)
+        eliminar_obsoletos(ruta)
+    except Exception as e:
+        print(f" No se pudo guardar la caché de datos: {e}")
+
+    return df
+
+
+def _ruta_incremental(file_path, filtro_tipo, compacto, parte=None):
+    # Sin hash del contenido: el estado sobrevive a que el archivo crezca.
+    # parte=None -> estado (marcas de agua); parte=n -> n-ésima parte del dataset limpio
+    partes = [str(VERSION_LIMPIEZA), version_reglas_normalizacion(), repr(filtro_tipo), repr(compacto)]
+    clave = hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(CACHE_DIR, f"incremental_{_nombre_fuente(file_path)}_{clave}")
+    return f"{base}.pkl" if parte is None else f"{base}_{parte:04d}.{FORMATO}"
+
+
+def _huella(ruta, fin):
+    """SHA-1 de los BYTES_HUELLA bytes anteriores a `fin` (detecta un archivo reescrito)."""
+    inicio = max(0, fin - BYTES_HUELLA)
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        return hashlib.sha1(f.read(fin - inicio)).hexdigest()
+
+
+def _fin_registros(datos):
+    """Bytes de `datos` hasta el último fin de registro: un salto de línea fuera de comillas."""
+    b = np.frombuffer(datos, dtype=np.uint8)
+    fuera_de_comillas = np.cumsum(b == ord('"')) % 2 == 0
+    saltos = np.flatnonzero((b == ord("\n")) & fuera_de_comillas)
+    return int(saltos[-1]) + 1 if len(saltos) else 0
+
+
+def _leer_cola(ruta, desde):
+    """
+    Registros completos del CSV a partir del byte `desde`, con la cabecera del archivo.
+    Devuelve (df o None, cabecera, fin): fin es el byte donde termina el último
+    registro completo; uno a medio escribir queda para la próxima lectura.
+    """
+    with open(ruta, "rb") as f:
+        cabecera = f.readline()
+        inicio = max(desde, len(cabecera))
+        f.seek(inicio)
+        cola = f.read()
+
+    completas = _fin_registros(cola)
+    if completas == 0:
+        return None, cabecera, inicio
+
+    df = pd.read_csv(io.BytesIO(cabecera + cola[:completas]), encoding="utf-8", sep=";")
+    df.columns = [str(c).replace("\ufeff", "").strip().upper() for c in df.columns]
+    return df, cabecera, inicio + completas
+
+
+def _marcas_vigentes(marcas, archivos):
+    """True si cada archivo ya ingerido sigue existiendo y solo creció desde su marca."""
+    for ruta, marca in marcas.items():
+        if ruta not in archivos or not os.path.exists(ruta) or os.path.getsize(ruta) < marca["fin"]:
+            return False
+        with open(ruta, "rb") as f:
+            if f.readline() != marca["cabecera"]:
+                return False
+        if _huella(ruta, marca["fin"]) != marca["huella"]:
+            return False
+    return True
+
+
+def _descartar_repetidas(df, archivo, ingeridas):
+    """Filas de df sin las órdenes que ya se ingirieron desde otro archivo; registra las nuevas."""
+    claves = [c for c in CLAVES_ORDEN if c in df.columns]
+    if not claves:
+        return df
+    llaves = llave_orden(df, claves)
+    for llave in llaves.unique():
+        ingeridas.setdefault(llave, archivo)
+    return df[llaves.map(ingeridas) == archivo]
+
+
+def _leer_partes(file_path, filtro_tipo, compacto, n_partes):
+    partes = [_leer(_ruta_incremental(file_path, filtro_tipo, compacto, i)) for i in range(n_partes)]
+    df = pd.concat(partes) if len(partes) > 1 else partes[0]
+    # Las categorías de cada parte difieren: se vuelven a unificar
+    return compactar(df) if compacto and len(partes) > 1 else df
+
+
+def _eliminar_partes(file_path, filtro_tipo, compacto):
+    base = _ruta_incremental(file_path, filtro_tipo, compacto)[:-len(".pkl")]
+    patron = re.compile(re.escape(os.path.basename(base)) + r"_\d{4}\." + re.escape(FORMATO))
+    for ruta in glob.glob(glob.escape(base) + "_*"):
+        if patron.fullmatch(os.path.basename(ruta)):
+            os.remove(ruta)
+
+
+def _guardar_estado(ruta, estado):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta)
+
+
+def load_clean_data_incremental(file_path, filtro_tipo=None, compacto=False, n_procesos=None):
+    """
+    Ingesta incremental por marca de agua en bytes. El estado guarda, por archivo,
+    hasta qué byte se leyó (y una huella de los bytes anteriores); en cada llamada
+    solo se leen y limpian las líneas agregadas desde entonces, que se guardan como
+    una parte nueva de la caché sin reescribir las anteriores. Las partes se
+    consolidan en una cuando pasan de MAX_PARTES. Si un archivo se reescribió,
+    se acortó o desapareció, se vuelve a ingerir todo.
+    Con varias exportaciones, una orden se conserva solo del primer archivo desde
+    el que se ingirió.
+    Devuelve (df_total, df_nuevo).
+    """
+    ruta = _ruta_incremental(file_path, filtro_tipo, compacto)
+    archivos = listar_archivos(file_path)
+    estado = None
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, "rb") as f:
+                estado = pickle.load(f)
+        except Exception as e:
+            print(f" No se pudo leer el estado incremental: {e}")
+
+    if estado is not None and not _marcas_vigentes(estado["marcas"], archivos):
+        print(" Los archivos cambiaron desde la última ingesta: se vuelven a ingerir completos")
+        estado = None
+    if estado is None:
+        _eliminar_partes(file_path, filtro_tipo, compacto)
+        estado = {"marcas": {}, "partes": 0, "filas": 0, "ingeridas": {}}
+
+    colas = []
+    marcas = dict(estado["marcas"])
+    filas = estado["filas"]
+    for archivo in archivos:
+        marca = marcas.get(archivo)
+        try:
+            cola, cabecera, fin = _leer_cola(archivo, marca["fin"] if marca else 0)
+        except Exception as e:
+            print(f" No se pudo leer {archivo}: {e}")
+            return None, None
+        marcas[archivo] = {"fin": fin, "cabecera": cabecera, "huella": _huella(archivo, fin)}
+        if cola is None or cola.empty:
+            continue
+        # Índice continuo entre lecturas (con un solo archivo, la fila del CSV)
+        cola.index = pd.RangeIndex(filas, filas + len(cola))
+        filas += len(cola)
+        if len(archivos) > 1:
+            cola = _descartar_repetidas(cola, archivo, estado["ingeridas"])
+        colas.append(cola)
+
+    nuevos = sum(len(cola) for cola in colas)
+    print(f"Registros ya leídos: {estado['filas']:,} | registros nuevos: {nuevos:,}")
+
+    if nuevos == 0:
+        if estado["partes"] == 0:
+            print(" No hay registros para ingerir")
+            return None, None
+        df_total = _leer_partes(file_path, filtro_tipo, compacto, estado["partes"])
+        return df_total, df_total.iloc[:0]
+
+    df_crudo = pd.concat(colas) if len(colas) > 1 else colas[0]
+    df_nuevo = clean_data(df_crudo, filtro_tipo=filtro_tipo, compacto=compacto, n_procesos=n_procesos)
+    if df_nuevo is None:
+        return None, None
+
+    if estado["partes"] == 0:
+        df_total = df_nuevo
+    else:
+        df_total = pd.concat([_leer_partes(file_path, filtro_tipo, compacto, estado["partes"]), df_nuevo])
+        if compacto:
+            df_total = compactar(df_total)
+
+    try:
+        if estado["partes"] + 1 > MAX_PARTES:
+            _escribir(df_total, _ruta_incremental(file_path, filtro_tipo, compacto, 0))
+            for i in range(1, estado["partes"]):
+                os.remove(_ruta_incremental(file_path, filtro_tipo, compacto, i))
+            n_partes = 1
+        else:
+            _escribir(df_nuevo, _ruta_incremental(file_path, filtro_tipo, compacto, estado["partes"]))
+            n_partes = estado["partes"] + 1
+        _guardar_estado(ruta, {"marcas": marcas, "partes": n_partes, "filas": filas,
+                               "ingeridas": estado["ingeridas"]})
+    except Exception as e:
+        print(f" No se pudo guardar el estado incremental: {e}")
+
+    return df_total, df_nuevo
@@ -0,0 +1,105 @@
+import numpy as np
+
+from graph_index import cache_grafo, indice_grafo
+
+
+class Distribucion:
+    """
+    Reparto de una métrica en intervalos definidos por `bordes` (b0 < b1 < ... < bk):
+
+    - cerrado="izquierda": intervalo i = [b_i, b_i+1)   (searchsorted side="right")
+    - cerrado="derecha":   intervalo i = (b_i, b_i+1]   (searchsorted side="left")
+    - asignacion[j]: intervalo del valor j (-1 si queda fuera de los bordes)
+    - cuentas / sumas / minimos / maximos por intervalo (sumas en el mismo orden
+      en que vienen los valores, igual que sum() de Python)
+    - participacion: parte de la suma total en cada intervalo
+    - acumulada: fracción acumulada de valores hasta cada intervalo
+    """
+
+    def __init__(self, valores, bordes, cerrado="izquierda"):
+        valores = np.asarray(valores, dtype=float)
+        self.bordes = np.asarray(bordes, dtype=float)
+        self.cerrado = cerrado
+        k = len(self.bordes) - 1
+
+        lado = "right" if cerrado == "izquierda" else "left"
+        asignacion = np.searchsorted(self.bordes, valores, side=lado) - 1
+        asignacion[(asignacion < 0) | (asignacion >= k)] = -1
+        self.asignacion = asignacion
+
+        dentro = asignacion >= 0
+        self.cuentas = np.bincount(asignacion[dentro], minlength=k)
+        self.sumas = np.bincount(asignacion[dentro], weights=valores[dentro], minlength=k)
+        self.minimos = np.full(k, np.inf)
+        self.maximos = np.full(k, -np.inf)
+        np.minimum.at(self.minimos, asignacion[dentro], valores[dentro])
+        np.maximum.at(self.maximos, asignacion[dentro], valores[dentro])
+
+        total = self.sumas.sum()
+        self.participacion = self.sumas / total if total else np.zeros(k)
+        self.acumulada = np.cumsum(self.cuentas) / len(valores) if len(valores) else np.zeros(k)
+
+    def __len__(self):
+        return len(self.cuentas)
+
+    def grupos(self, elementos):
+        """Los elementos (en el mismo orden que los valores) separados por intervalo."""
+        grupos = [[] for _ in range(len(self))]
+        for elemento, i in zip(elementos, self.asignacion.tolist()):
+            if i >= 0:
+                grupos[i].append(elemento)
+        return grupos
+
+
+def bordes_cuantiles(valores, cuantiles=(0, 0.25, 0.5, 0.75, 1)):
+    """Bordes en los cuantiles de los valores (sin repetidos); el último se abre a +inf."""
+    valores = np.asarray(valores, dtype=float)
+    if len(valores) == 0:
+        return np.array([0.0, np.inf])
+    bordes = np.unique(np.quantile(valores, cuantiles))
+    if len(bordes) == 1:
+        # Todos los valores iguales: un solo intervalo [v, +inf)
+        return np.array([bordes[0], np.inf])
+    return np.append(bordes[:-1], np.inf)
+
+
+def bordes_logaritmicos(valores, n_intervalos=10):
+    """n_intervalos de ancho constante en escala logarítmica entre el menor y el mayor valor positivo."""
+    positivos = np.asarray(valores, dtype=float)
+    positivos = positivos[positivos > 0]
+    if len(positivos) == 0:
+        return np.array([0.0, np.inf])
+    bordes = np.geomspace(positivos.min(), positivos.max(), n_intervalos + 1)
+    bordes[-1] = np.inf
+    return bordes
+
+
+def _grado_items(G):
+    indice = indice_grafo(G)
+    return np.array([indice.grado[item] for item in indice.items], dtype=float)
+
+
+def _monto_items(G):
+    indice = indice_grafo(G)
+    return np.array([indice.monto_total[item] for item in indice.items], dtype=float)
+
+
+def _peso_aristas(G):
+    return np.fromiter((w for _, _, w in G.edges(data="weight", default=0.0)), dtype=float,
+                       count=G.number_of_edges())
+
+
+# Métricas por nodo/arista; los valores siguen el orden de indice.items o de G.edges()
+METRICAS = {
+    "grado_items": _grado_items,
+    "monto_items": _monto_items,
+    "peso_aristas": _peso_aristas,
+}
+
+
+def distribucion_grafo(G, metrica, bordes, cerrado="izquierda"):
+    """Distribucion de una métrica de G (ver METRICAS), en caché por versión del grafo y bordes."""
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconocida: {metrica} (opciones: {', '.join(METRICAS)})")
+    nombre = f"distribucion_{metrica}_{cerrado}_{tuple(float(b) for b in bordes)}"
+    return cache_grafo(G, nombre, lambda G: Distribucion(METRICAS[metrica](G), bordes, cerrado))
@@ -1,35 +1,51 @@
-def calcular_interconexiones(G, item_nodes):
-
-    interconexiones = {}
-
-    for item in item_nodes:
-        # Obtener las órdenes de este ítem
-        ordenes_item = set(G.neighbors(item))
+import heapq
+from collections import OrderedDict
 
-        # Contar cuántos otros ítems comparten al menos una orden
-        items_conectados = set()
-        for orden in ordenes_item:
-            # Obtener todos los ítems de esta orden
-            items_en_orden = [n for n in G.neighbors(orden) if G.nodes[n]['type'] == 'item']
-            items_conectados.update(items_en_orden)
+from cooccurrence import coocurrencia_items
+from graph_index import cache_grafo
+from ranking import Ranking, ranking_items
 
-        # Excluir el ítem mismo
-        items_conectados.discard(item)
-        interconexiones[item] = len(items_conectados)
+# Selecciones de subgrafo guardadas por grafo (LRU); se descartan al cambiar la versión de G
+TAMANO_CACHE_SUBGRAFOS = 16
 
-    return interconexiones
 
-
-def filter_subgraph_interconectado(G, top_items, min_ordenes, max_ordenes_por_item, max_items):
-
-    # Filtrar ítems por frecuencia mínima
-    candidatos = [(node, degree) for node, degree in top_items if degree >= min_ordenes]
-
-    if not candidatos:
-        print("⚠ No hay ítems que cumplan el criterio mínimo")
-        return G.subgraph([]).copy()
-
-    print(f"Ítems candidatos (mínimo {min_ordenes} órdenes): {len(candidatos)}")
+def calcular_interconexiones(G, item_nodes):
+    """Para cada ítem, cuántos otros ítems comparten al menos una orden con él."""
+    return coocurrencia_items(G).interconexiones_de(item_nodes)
+
+
+def _firma_items(G, top_items):
+    """
+    Identidad de top_items dentro de la clave de la caché. El Ranking en caché de G
+    se identifica por su métrica (la caché de subgrafos se descarta con cada
+    versión de G, igual que el ranking); cualquier otra secuencia se guarda
+    completa como tupla y se compara por igualdad, sin depender de un hash.
+    """
+    if isinstance(top_items, Ranking) and top_items.metrica is not None \
+            and ranking_items(G, top_items.metrica) is top_items:
+        return ("ranking", top_items.metrica)
+    return ("items", tuple(top_items))
+
+
+def _seleccion_en_cache(G, clave, calcular):
+    """
+    Nodos del subgrafo para `clave`, calculados una vez por versión de G. Se
+    guardan los nodos y no la vista, para que la caché no mantenga vivo a G.
+    """
+    cache = cache_grafo(G, "subgrafos", lambda G: OrderedDict())
+    if clave in cache:
+        cache.move_to_end(clave)
+        return cache[clave]
+
+    nodos = calcular()
+    cache[clave] = nodos
+    if len(cache) > TAMANO_CACHE_SUBGRAFOS:
+        cache.popitem(last=False)
+    return nodos
+
+
+def _seleccion_interconectada(G, candidatos, max_ordenes_por_item, max_items):
+    """Nodos (ítems y órdenes) del subgrafo interconectado a partir de los candidatos ya filtrados."""
 
     # Calcular interconexiones para todos los candidatos
     candidatos_nodes = [node for node, _ in candidatos]
@@ -42,50 +58,70 @@ def filter_subgraph_interconectado(G, top_items, min_ordenes, max_ordenes_por_it
         reverse=True
     )
 
-    # Seleccionar ítems usando expansión por conexión
+    # Seleccionar ítems usando expansión por conexión (greedy con cola de prioridad).
+    # score = órdenes compartidas con las ya incluidas * 10 + interconexiones; solo
+    # sube cuando se incluyen órdenes nuevas, así que en vez de recalcularlo para
+    # todos los candidatos en cada paso se actualiza en los vecinos de esas órdenes
+    # y se vuelve a encolar. Las entradas viejas del heap se descartan al sacarlas.
+    # Clave (-score, posición): mismo desempate que recorrer candidatos_ordenados.
     items_seleccionados = set()
     ordenes_incluidas = set()
 
-    # Comenzar con el ítem más interconectado
-    if candidatos_ordenados:
-        semilla = candidatos_ordenados[0]
-        items_seleccionados.add(semilla)
-        ordenes_semilla = list(G.neighbors(semilla))[:max_ordenes_por_item]
-        ordenes_incluidas.update(ordenes_semilla)
+    posicion = {candidato: i for i, candidato in enumerate(candidatos_ordenados)}
+    compartidas = dict.fromkeys(candidatos_ordenados, 0)
+    heap = [(-interconexiones.get(candidato, 0), i) for i, candidato in enumerate(candidatos_ordenados)]
+    heapq.heapify(heap)
 
-    while len(items_seleccionados) < max_items and len(items_seleccionados) < len(candidatos_ordenados):
-        mejor_candidato = None
-        mejor_score = -1
+    def score(candidato):
+        return compartidas[candidato] * 10 + interconexiones.get(candidato, 0)
 
-        for candidato in candidatos_ordenados:
-            if candidato in items_seleccionados:
+    def incluir(item):
+        items_seleccionados.add(item)
+        for orden in list(G.neighbors(item))[:max_ordenes_por_item]:
+            if orden in ordenes_incluidas:
                 continue
+            ordenes_incluidas.add(orden)
+            for vecino in G.neighbors(orden):
+                if vecino in compartidas and vecino not in items_seleccionados:
+                    compartidas[vecino] += 1
+                    heapq.heappush(heap, (-score(vecino), posicion[vecino]))
 
-            ordenes_candidato = set(G.neighbors(candidato))
-            ordenes_compartidas = len(ordenes_candidato & ordenes_incluidas)
+    # Comenzar con el ítem más interconectado
+    if candidatos_ordenados:
+        incluir(candidatos_ordenados[0])
 
-            score = ordenes_compartidas * 10 + interconexiones.get(candidato, 0)
+    while len(items_seleccionados) < max_items and len(items_seleccionados) < len(candidatos_ordenados):
+        menos_score, i = heapq.heappop(heap)
+        candidato = candidatos_ordenados[i]
+        if candidato in items_seleccionados or -menos_score != score(candidato):
+            continue
+        incluir(candidato)
+
+    return set(items_seleccionados) | ordenes_incluidas
+
+
+def filter_subgraph_interconectado(G, top_items, min_ordenes, max_ordenes_por_item, max_items, copiar=False):
+    """
+    Subgrafo de ítems que comparten órdenes entre sí. Devuelve una vista de solo
+    lectura sobre G (copiar=True para un grafo independiente); la selección se
+    reutiliza si se pide otra vez con los mismos parámetros y la misma versión de G.
+    """
+    # Filtrar ítems por frecuencia mínima (fuera de la caché: los avisos salen en cada llamada)
+    candidatos = [(node, degree) for node, degree in top_items if degree >= min_ordenes]
 
-            if score > mejor_score:
-                mejor_score = score
-                mejor_candidato = candidato
+    if not candidatos:
+        print("⚠ No hay ítems que cumplan el criterio mínimo")
+        return G.subgraph([]).copy() if copiar else G.subgraph([])
 
-        if mejor_candidato is None:
-            for candidato in candidatos_ordenados:
-                if candidato not in items_seleccionados:
-                    items_seleccionados.add(candidato)
-                    ordenes_nuevas = list(G.neighbors(candidato))[:max_ordenes_por_item]
-                    ordenes_incluidas.update(ordenes_nuevas)
-                    break
-        else:
-            items_seleccionados.add(mejor_candidato)
-            ordenes_nuevas = list(G.neighbors(mejor_candidato))[:max_ordenes_por_item]
-            ordenes_incluidas.update(ordenes_nuevas)
+    print(f"Ítems candidatos (mínimo {min_ordenes} órdenes): {len(candidatos)}")
 
-    subgraph_nodes = set(items_seleccionados) | ordenes_incluidas
+    clave = ("interconectado", min_ordenes, max_ordenes_por_item, max_items, _firma_items(G, top_items))
+    subgraph_nodes = _seleccion_en_cache(
+        G, clave, lambda: _seleccion_interconectada(G, candidatos, max_ordenes_por_item, max_items)
+    )
 
     # Crear el subgrafo
-    H = G.subgraph(subgraph_nodes).copy()
+    H = G.subgraph(subgraph_nodes)
 
     # Calcular estadísticas de interconexión
     nodos_ordenes = sum(1 for n in H.nodes() if H.nodes[n]['type'] == 'orden')
@@ -104,15 +140,35 @@ def filter_subgraph_interconectado(G, top_items, min_ordenes, max_ordenes_por_it
     print(f"  - Nivel de interconexión: {ordenes_compartidas / nodos_ordenes * 100:.1f}%")
     print()
 
-    return H
+    return H.copy() if copiar else H
+
+
+def _seleccion_basica(G, candidatos, max_items):
+    """Nodos del subgrafo: los ítems elegidos entre los candidatos y todas sus órdenes."""
+    candidatos = sorted(candidatos, key=lambda x: x[1], reverse=True)[:max_items]
+    nodos_items = {node for node, _ in candidatos}
+
+
+    nodos_permitidos = set(nodos_items)
+
+    for item in nodos_items:
+        nodos_permitidos.update(G.neighbors(item))
 
+    return nodos_permitidos
 
-def filter_subgraph(G, min_ordenes, max_ordenes, max_items, top_items):
 
+def filter_subgraph(G, min_ordenes, max_ordenes, max_items, top_items, copiar=False):
+    """
+    Subgrafo con los ítems de top_items dentro del rango de órdenes y sus órdenes.
+    Devuelve una vista de solo lectura sobre G (copiar=True para un grafo
+    independiente); la selección se reutiliza si se pide otra vez con los mismos
+    parámetros y la misma versión de G.
+    """
     if not top_items:
         print("No hay ítems para filtrar. Regresando grafo completo.")
         return G
 
+    # Filtrar por rango de órdenes (fuera de la caché: el aviso sale en cada llamada)
     candidatos = [
         (node, degree) for node, degree in top_items
         if min_ordenes <= degree <= max_ordenes
@@ -122,21 +178,16 @@ def filter_subgraph(G, min_ordenes, max_ordenes, max_items, top_items):
         print("No se encontraron candidatos válidos. Usando todos los ítems.")
         candidatos = top_items
 
-    candidatos = sorted(candidatos, key=lambda x: x[1], reverse=True)[:max_items]
-    nodos_items = {node for node, _ in candidatos}
-
-
-    nodos_permitidos = set(nodos_items)
-
-    for item in nodos_items:
-        nodos_permitidos.update(G.neighbors(item))
-
+    clave = ("basico", min_ordenes, max_ordenes, max_items, _firma_items(G, top_items))
+    nodos_permitidos = _seleccion_en_cache(
+        G, clave, lambda: _seleccion_basica(G, candidatos, max_items)
+    )
 
-    H = G.subgraph(nodos_permitidos).copy()
+    H = G.subgraph(nodos_permitidos)
 
     print("✓ Subgrafo creado correctamente")
     print(f"  Items: {sum(1 for n in H.nodes if H.nodes[n]['type']=='item')}")
     print(f"  Órdenes: {sum(1 for n in H.nodes if H.nodes[n]['type']=='orden')}")
     print(f"  Aristas: {H.number_of_edges()}")
 
-    return H
\ No newline at end of file
+    return H.copy() if copiar else H
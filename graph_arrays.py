@@ -0,0 +1,178 @@
+import copy
+
+import networkx as nx
+import numpy as np
+
+# Componentes conexas con scipy si está disponible; si no, propagación de etiquetas en NumPy
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:
+    csr_matrix = None
+
+TIPO_ORDEN = 0
+TIPO_ITEM = 1
+TIPO_PROVEEDOR = 2
+TIPOS = {"orden": TIPO_ORDEN, "item": TIPO_ITEM, "proveedor": TIPO_PROVEEDOR}
+NOMBRES_TIPO = {v: k for k, v in TIPOS.items()}
+
+# Atributos de nodo que ya tienen su propia columna
+ATRIBUTOS_COLUMNA = ("type", "label", "label_original")
+
+
+class GrafoCompacto:
+    """
+    El grafo bipartito orden-ítem guardado en arreglos NumPy.
+
+    - nombres[i]: nombre del nodo i en el nx.Graph; indice: nombre -> i
+    - tipo[i]: TIPO_ORDEN, TIPO_ITEM o TIPO_PROVEEDOR
+    - indptr/vecinos/pesos: adyacencia CSR simétrica (sirve en ambos sentidos,
+      orden -> ítems e ítem -> órdenes), con los vecinos en el mismo orden que G
+    - origen/destino/peso_arista: una entrada por arista, en el orden de G.edges()
+    - proveedor[i]: código en proveedores para las órdenes, -1 para el resto
+    - atributos_nodo[i]: el resto de atributos del nodo (proveedores_set, fecha...),
+      solo para los nodos que tienen alguno
+    - atributos_arista[k]: atributos completos de la arista k si tiene alguno
+      además de 'weight' (montos_proveedor)
+    - atributos_grafo: G.graph
+
+    Con eso a_networkx() reconstruye el mismo grafo que recibió desde_networkx().
+    """
+
+    def __init__(self, nombres, tipo, indptr, vecinos, pesos, origen, destino, peso_arista,
+                 proveedor, proveedores, etiquetas=None, atributos_nodo=None, atributos_arista=None,
+                 atributos_grafo=None):
+        self.nombres = nombres
+        self.indice = {nombre: i for i, nombre in enumerate(nombres)}
+        self.tipo = tipo
+        self.indptr = indptr
+        self.vecinos = vecinos
+        self.pesos = pesos
+        self.origen = origen
+        self.destino = destino
+        self.peso_arista = peso_arista
+        self.proveedor = proveedor
+        self.proveedores = proveedores
+        # Atributos de texto (label, label_original...) que no se usan en los recorridos
+        self.etiquetas = etiquetas if etiquetas is not None else {}
+        self.atributos_nodo = atributos_nodo if atributos_nodo is not None else {}
+        self.atributos_arista = atributos_arista if atributos_arista is not None else {}
+        self.atributos_grafo = atributos_grafo if atributos_grafo is not None else {}
+
+    @classmethod
+    def desde_networkx(cls, G):
+        nombres = np.array(list(G.nodes()), dtype=object)
+        indice = {nombre: i for i, nombre in enumerate(nombres)}
+        n = len(nombres)
+
+        tipo = np.fromiter((TIPOS.get(t, TIPO_ITEM) for _, t in G.nodes(data="type")), dtype=np.int8, count=n)
+
+        # Proveedores codificados como enteros
+        codigos = {}
+        proveedor = np.full(n, -1, dtype=np.int32)
+        atributos_nodo = {}
+        for i, (nodo, datos) in enumerate(G.nodes(data=True)):
+            resto = {k: v for k, v in datos.items() if k not in ATRIBUTOS_COLUMNA}
+            if resto:
+                atributos_nodo[i] = resto
+            if datos.get("type") == "orden":
+                nombre = datos.get("proveedor") or datos.get("ORDEN_PROVEEDOR")
+                if nombre:
+                    proveedor[i] = codigos.setdefault(nombre, len(codigos))
+        proveedores = np.array(list(codigos), dtype=object)
+
+        # CSR en el orden de adyacencia de G
+        grados = np.fromiter((len(G.adj[nodo]) for nodo in nombres), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(grados, out=indptr[1:])
+        total = int(indptr[-1])
+        vecinos = np.fromiter((indice[v] for nodo in nombres for v in G.adj[nodo]), dtype=np.int32, count=total)
+        pesos = np.fromiter((d.get("weight", 1.0) for nodo in nombres for d in G.adj[nodo].values()),
+                            dtype=np.float64, count=total)
+
+        m = G.number_of_edges()
+        origen = np.empty(m, dtype=np.int32)
+        destino = np.empty(m, dtype=np.int32)
+        peso_arista = np.empty(m, dtype=np.float64)
+        atributos_arista = {}
+        for k, (u, v, datos) in enumerate(G.edges(data=True)):
+            origen[k] = indice[u]
+            destino[k] = indice[v]
+            peso_arista[k] = datos.get("weight", 1.0)
+            if len(datos) != 1 or "weight" not in datos:
+                atributos_arista[k] = dict(datos)
+
+        etiquetas = {
+            "label": [G.nodes[nodo].get("label") for nodo in nombres],
+            "label_original": [G.nodes[nodo].get("label_original") for nodo in nombres],
+        }
+
+        return cls(nombres, tipo, indptr, vecinos, pesos, origen, destino, peso_arista,
+                   proveedor, proveedores, etiquetas, atributos_nodo, atributos_arista, dict(G.graph))
+
+    def a_networkx(self):
+        """nx.Graph con los mismos nodos, aristas y atributos (copiados) que el grafo de origen."""
+        G = nx.Graph(**copy.deepcopy(self.atributos_grafo))
+        n = len(self.nombres)
+        labels = self.etiquetas.get("label", [None] * n)
+        originales = self.etiquetas.get("label_original", [None] * n)
+        for i, nombre in enumerate(self.nombres):
+            datos = {"type": NOMBRES_TIPO[int(self.tipo[i])]}
+            if labels[i] is not None:
+                datos["label"] = labels[i]
+            if originales[i] is not None:
+                datos["label_original"] = originales[i]
+            datos.update(copy.deepcopy(self.atributos_nodo.get(i, {})))
+            G.add_node(nombre, **datos)
+        G.add_edges_from(
+            (self.nombres[u], self.nombres[v],
+             copy.deepcopy(self.atributos_arista[k]) if k in self.atributos_arista else {"weight": float(w)})
+            for k, (u, v, w) in enumerate(zip(self.origen.tolist(), self.destino.tolist(), self.peso_arista.tolist()))
+        )
+        return G
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def numero_aristas(self):
+        return len(self.origen)
+
+    def grados(self):
+        return np.diff(self.indptr)
+
+    def vecinos_de(self, i):
+        return self.vecinos[self.indptr[i]:self.indptr[i + 1]]
+
+    def pesos_de(self, i):
+        return self.pesos[self.indptr[i]:self.indptr[i + 1]]
+
+    def nodos_de_tipo(self, tipo):
+        return np.flatnonzero(self.tipo == tipo)
+
+    def items_a_dos_saltos(self, i):
+        """Ítems distintos que comparten alguna orden con el ítem i (sin incluirlo)."""
+        ordenes = self.vecinos_de(i)
+        if len(ordenes) == 0:
+            return np.zeros(0, dtype=self.vecinos.dtype)
+        segmentos = [self.vecinos_de(o) for o in ordenes]
+        items = np.unique(np.concatenate(segmentos))
+        return items[(items != i) & (self.tipo[items] == TIPO_ITEM)]
+
+    def componentes(self):
+        """Etiqueta de componente conexa de cada nodo."""
+        n = len(self.nombres)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        if csr_matrix is not None:
+            matriz = csr_matrix((np.ones(len(self.vecinos), dtype=np.int8), self.vecinos, self.indptr), shape=(n, n))
+            return connected_components(matriz, directed=False)[1]
+
+        etiquetas = np.arange(n)
+        while True:
+            anteriores = etiquetas.copy()
+            minimos = np.minimum(etiquetas[self.origen], etiquetas[self.destino])
+            np.minimum.at(etiquetas, self.origen, minimos)
+            np.minimum.at(etiquetas, self.destino, minimos)
+            etiquetas = etiquetas[etiquetas]  # salto de punteros
+            if np.array_equal(etiquetas, anteriores):
+                return etiquetas
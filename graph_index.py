@@ -0,0 +1,378 @@
+import weakref
+
+from graph_arrays import GrafoCompacto
+
+# Estructuras derivadas de cada grafo (índice, versión compacta...), por objeto grafo.
+# No se guardan en G.graph: las vistas de subgrafo comparten ese dict y las copias lo duplican.
+#
+# CONTRATO: lo guardado aquí se considera vigente mientras no cambien G.graph["version"]
+# ni el número de nodos. Las funciones de graph_updates suben la versión; cualquier
+# otra modificación de G (G.add_edge, G.nodes[n][...] = ..., pesos...) debe llamar a
+# marcar_modificado(G), o los índices seguirán describiendo el grafo anterior. Agregar
+# o quitar nodos se detecta igual; cambios solo de aristas o atributos, no.
+_CACHE = weakref.WeakKeyDictionary()
+
+
+def version_grafo(G):
+    return G.graph.get("version", 0)
+
+
+def _huella(G):
+    # O(1) en un nx.Graph (len cuenta los nodos del dict interno)
+    return version_grafo(G), len(G)
+
+
+def marcar_modificado(G):
+    """
+    Invalida lo calculado sobre G. Toda modificación de nodos, aristas o atributos
+    debe terminar aquí (las de graph_updates lo hacen vía aplicar_cambios). Las
+    vistas de subgrafo comparten G.graph, así que también quedan invalidadas.
+    """
+    G.graph["version"] = version_grafo(G) + 1
+
+
+def cache_grafo(G, nombre, construir):
+    """
+    Devuelve construir(G) calculado una sola vez por versión del grafo.
+    La búsqueda es O(1): compara el contador de version_grafo y el número de
+    nodos. Las modificaciones hechas fuera de graph_updates deben llamar a
+    marcar_modificado(G) (ver el contrato al inicio del módulo).
+    """
+    huella = _huella(G)
+    entradas = _CACHE.setdefault(G, {})
+    entrada = entradas.get(nombre)
+    if entrada is None or entrada[0] != huella:
+        entrada = (huella, construir(G))
+        entradas[nombre] = entrada
+    return entrada[1]
+
+
+def sembrar_cache(G, nombre, valor):
+    """Registra un valor ya calculado para G (p. ej. el índice leído de un snapshot)."""
+    _CACHE.setdefault(G, {})[nombre] = (_huella(G), valor)
+
+
+def es_tripartito(G):
+    """True si G tiene nodos 'proveedor' (build_graph(..., con_proveedores=True))."""
+    return bool(G.graph.get("con_proveedores"))
+
+
+def vista_bipartita(G):
+    """Vista de G solo con órdenes e ítems, para los análisis que asumen el grafo bipartito."""
+    if not es_tripartito(G):
+        return G
+    return G.subgraph(n for n, tipo in G.nodes(data="type") if tipo != "proveedor")
+
+
+def indice_vigente(G):
+    """GraphIndex en caché si está al día con G, sin construirlo; None si no lo está."""
+    entrada = _CACHE.get(G, {}).get("indice")
+    if entrada is not None and entrada[0] == _huella(G):
+        return entrada[1]
+    return None
+
+
+def aplicar_cambios(G, indice, afectados, eliminados=()):
+    """
+    Cierra una modificación de G: sube la versión y, si había un índice vigente
+    antes del cambio (indice_vigente), lo actualiza solo en los nodos afectados.
+    Lo demás que estaba en caché se actualiza igual si tiene un método
+    actualizar(G, indice, afectados, eliminados) que devuelva True (proveedores,
+    rankings, búsqueda); si no (arreglos compactos, coocurrencia, tablas,
+    distribuciones, subgrafos), se descarta y se reconstruye cuando se pida.
+    """
+    version_anterior = version_grafo(G)
+    marcar_modificado(G)
+    entradas = _CACHE.pop(G, {})
+    if indice is None:
+        return
+
+    afectados = list(afectados)
+    indice.actualizar(G, afectados, eliminados)
+    sembrar_cache(G, "indice", indice)
+    for nombre, ((version, _), valor) in entradas.items():
+        if nombre == "indice" or version != version_anterior:
+            continue
+        actualizar = getattr(valor, "actualizar", None)
+        if actualizar is not None and actualizar(G, indice, afectados, eliminados):
+            sembrar_cache(G, nombre, valor)
+
+
+class GraphIndex:
+    """
+    Particiones y agregados por nodo, calculados en un solo recorrido de G.
+
+    - items / ordenes / proveedores: nodos de cada tipo, en el orden de G
+      (dicts usados como conjuntos ordenados, para poder quitar nodos en O(1))
+    - grado[n]
+    - monto_total / monto_promedio / monto_min / monto_max [n]: sobre las
+      aristas orden-ítem del nodo (las aristas a proveedores no cuentan)
+    - proveedor[orden]: proveedor de la orden (o None)
+    - proveedores_item[item]: conjunto de proveedores de sus órdenes
+
+    actualizar() recalcula solo los nodos tocados por una modificación.
+    """
+
+    def __init__(self, G):
+        self.items = {}
+        self.ordenes = {}
+        self.proveedores = {}
+        self.grado = {}
+        self.monto_total = {}
+        self.monto_promedio = {}
+        self.monto_min = {}
+        self.monto_max = {}
+        self.proveedor = {}
+        self.proveedores_item = {}
+
+        for nodo, datos in G.nodes(data=True):
+            self._clasificar(nodo, datos)
+
+        for nodo in G:
+            self._agregados(G, nodo)
+
+        for item in self.items:
+            self._proveedores_de(G, item)
+
+    def _clasificar(self, nodo, datos):
+        if datos['type'] == 'orden':
+            self.ordenes[nodo] = None
+            self.proveedor[nodo] = datos.get('proveedor') or datos.get('ORDEN_PROVEEDOR')
+        elif datos['type'] == 'proveedor':
+            self.proveedores[nodo] = None
+        else:
+            self.items[nodo] = None
+
+    def _agregados(self, G, nodo):
+        vecinos = G[nodo]
+        if es_tripartito(G) and nodo not in self.proveedores:
+            montos = [d['weight'] for v, d in vecinos.items() if v not in self.proveedores]
+        else:
+            montos = [d['weight'] for d in vecinos.values()]
+        self.grado[nodo] = len(montos)
+        # Misma suma (y mismo orden de suma) que recorrer G.neighbors(nodo)
+        total = sum(montos)
+        self.monto_total[nodo] = total
+        if montos:
+            self.monto_promedio[nodo] = total / len(montos)
+            self.monto_min[nodo] = min(montos)
+            self.monto_max[nodo] = max(montos)
+        else:
+            self.monto_promedio[nodo] = 0
+            self.monto_min[nodo] = 0
+            self.monto_max[nodo] = 0
+
+    def _proveedores_de(self, G, item):
+        proveedores = set()
+        tripartito = es_tripartito(G)
+        for orden, datos in G[item].items():
+            if tripartito:
+                # Todos los proveedores que facturaron el ítem en la orden
+                proveedores.update(datos.get('montos_proveedor', ()))
+                continue
+            proveedor = self.proveedor.get(orden)
+            if proveedor:
+                proveedores.add(proveedor)
+        self.proveedores_item[item] = proveedores
+
+    def actualizar(self, G, afectados, eliminados=()):
+        """Quita los nodos eliminados y recalcula los afectados (nuevos o modificados)."""
+        for nodo in eliminados:
+            for tabla in (self.items, self.ordenes, self.proveedores, self.grado, self.monto_total,
+                          self.monto_promedio, self.monto_min, self.monto_max, self.proveedor,
+                          self.proveedores_item):
+                tabla.pop(nodo, None)
+
+        afectados = [n for n in afectados if n in G]
+        for nodo in afectados:
+            self._clasificar(nodo, G.nodes[nodo])
+        for nodo in afectados:
+            self._agregados(G, nodo)
+        for nodo in afectados:
+            if nodo in self.items:
+                self._proveedores_de(G, nodo)
+
+
+class IndiceProveedores:
+    """
+    Índices centrados en proveedores, con montos por arista:
+
+    - proveedores: conjunto de proveedores con al menos una orden
+    - ordenes_proveedor[p]: órdenes del proveedor
+    - items_proveedor[p]: {ítem: monto facturado por p}
+    - monto_proveedor[p]: monto total de p
+    - proveedores_item[item]: {proveedor: monto}, en el orden en que aparecen
+    - monto_item[item] / ordenes_item[item]: monto y número de órdenes con proveedor
+    - proveedores_orden[orden]: proveedores de la orden
+
+    En el grafo tripartito el reparto sale de 'montos_proveedor' de cada arista
+    orden-ítem, así que las órdenes con varios proveedores cuentan para cada uno.
+    En el bipartito se usa el atributo 'proveedor' de la orden.
+
+    actualizar() recalcula solo los proveedores de las órdenes tocadas y los ítems afectados.
+    """
+
+    def __init__(self, G):
+        self.proveedores = set()
+        self.ordenes_proveedor = {}
+        self.items_proveedor = {}
+        self.monto_proveedor = {}
+        self.proveedores_item = {}
+        self.monto_item = {}
+        self.ordenes_item = {}
+        self.proveedores_orden = {}
+
+        tipos = dict(G.nodes(data="type"))
+
+        for orden, tipo in tipos.items():
+            if tipo != 'orden':
+                continue
+
+            proveedores_orden = self._proveedores_de(G, orden, tipos)
+            if not proveedores_orden:
+                continue
+            self.proveedores_orden[orden] = proveedores_orden
+
+            for proveedor in proveedores_orden:
+                self.proveedores.add(proveedor)
+                self.ordenes_proveedor.setdefault(proveedor, []).append(orden)
+                self.items_proveedor.setdefault(proveedor, {})
+                self.monto_proveedor.setdefault(proveedor, 0.0)
+
+            for item, reparto in self._repartos(G, orden, proveedores_orden, tipos):
+                por_proveedor = self.proveedores_item.setdefault(item, {})
+                if item not in self.monto_item:
+                    self.monto_item[item] = 0
+                    self.ordenes_item[item] = 0
+                self.ordenes_item[item] += 1
+
+                for proveedor, monto in reparto:
+                    por_proveedor[proveedor] = por_proveedor.get(proveedor, 0) + monto
+                    self.monto_item[item] += monto
+                    montos_items = self.items_proveedor[proveedor]
+                    montos_items[item] = montos_items.get(item, 0.0) + monto
+                    self.monto_proveedor[proveedor] += monto
+
+    @staticmethod
+    def _proveedores_de(G, orden, tipos):
+        if es_tripartito(G):
+            return [G.nodes[v]['label'] for v in G.neighbors(orden) if tipos[v] == 'proveedor']
+        proveedor = G.nodes[orden].get('proveedor') or G.nodes[orden].get('ORDEN_PROVEEDOR')
+        return [proveedor] if proveedor else []
+
+    @staticmethod
+    def _repartos(G, orden, proveedores_orden, tipos):
+        """(ítem, [(proveedor, monto)]) de cada arista orden-ítem de la orden."""
+        tripartito = es_tripartito(G)
+        for item, datos in G[orden].items():
+            if tipos[item] != 'item':
+                continue
+            if tripartito:
+                yield item, datos.get('montos_proveedor', {}).items()
+            else:
+                yield item, [(proveedores_orden[0], datos['weight'])]
+
+    def actualizar(self, G, indice, afectados, eliminados=()):
+        """
+        Aplica una modificación de G (ver aplicar_cambios): vuelve a leer los
+        proveedores de las órdenes tocadas, recalcula esos proveedores recorriendo
+        sus órdenes y los ítems afectados recorriendo las suyas.
+        """
+        tipos = _TiposNodos(G)
+        ordenes = [n for n in eliminados if n in self.proveedores_orden]
+        ordenes += [n for n in afectados if n in G and tipos[n] == 'orden']
+
+        tocados = {}
+        reordenar = set()
+        for orden in ordenes:
+            anteriores = self.proveedores_orden.pop(orden, [])
+            actuales = self._proveedores_de(G, orden, tipos) if orden in G else []
+            if actuales:
+                self.proveedores_orden[orden] = actuales
+            for proveedor in anteriores:
+                if proveedor not in actuales:
+                    self.ordenes_proveedor[proveedor].remove(orden)
+            for proveedor in actuales:
+                if proveedor not in anteriores:
+                    self.ordenes_proveedor.setdefault(proveedor, []).append(orden)
+                    # Las órdenes nuevas van al final de G; una que ya existía no
+                    if anteriores:
+                        reordenar.add(proveedor)
+            tocados.update(dict.fromkeys(anteriores + actuales))
+
+        # Órdenes de cada proveedor en el orden de G, como al construir el índice
+        # (de eso depende el orden de las sumas)
+        if reordenar:
+            posicion = {nodo: i for i, nodo in enumerate(G)}
+            for proveedor in reordenar:
+                self.ordenes_proveedor[proveedor].sort(key=posicion.__getitem__)
+
+        for proveedor in tocados:
+            if not self.ordenes_proveedor.get(proveedor):
+                self.proveedores.discard(proveedor)
+                for tabla in (self.ordenes_proveedor, self.items_proveedor, self.monto_proveedor):
+                    tabla.pop(proveedor, None)
+                continue
+            self.proveedores.add(proveedor)
+            montos_items, total = {}, 0.0
+            for orden in self.ordenes_proveedor[proveedor]:
+                for item, reparto in self._repartos(G, orden, self.proveedores_orden[orden], tipos):
+                    for p, monto in reparto:
+                        if p == proveedor:
+                            montos_items[item] = montos_items.get(item, 0.0) + monto
+                            total += monto
+            self.items_proveedor[proveedor] = montos_items
+            self.monto_proveedor[proveedor] = total
+
+        for item in eliminados:
+            for tabla in (self.proveedores_item, self.monto_item, self.ordenes_item):
+                tabla.pop(item, None)
+        for item in afectados:
+            if item not in G or tipos[item] != 'item':
+                continue
+            por_proveedor, monto_item, ordenes_item = {}, 0, 0
+            for orden in G[item]:
+                proveedores_orden = self.proveedores_orden.get(orden)
+                if proveedores_orden is None:
+                    continue
+                ordenes_item += 1
+                if es_tripartito(G):
+                    reparto = G[orden][item].get('montos_proveedor', {}).items()
+                else:
+                    reparto = [(proveedores_orden[0], G[orden][item]['weight'])]
+                for proveedor, monto in reparto:
+                    por_proveedor[proveedor] = por_proveedor.get(proveedor, 0) + monto
+                    monto_item += monto
+            if ordenes_item:
+                self.proveedores_item[item] = por_proveedor
+                self.monto_item[item] = monto_item
+                self.ordenes_item[item] = ordenes_item
+            else:
+                for tabla in (self.proveedores_item, self.monto_item, self.ordenes_item):
+                    tabla.pop(item, None)
+        return True
+
+
+class _TiposNodos:
+    """tipos[n] -> atributo 'type' de n, sin copiar todos los nodos en un dict."""
+
+    def __init__(self, G):
+        self._nodos = G.nodes
+
+    def __getitem__(self, nodo):
+        return self._nodos[nodo].get('type')
+
+
+def indice_grafo(G):
+    """GraphIndex de G, reconstruido solo si el grafo cambió."""
+    return cache_grafo(G, "indice", GraphIndex)
+
+
+def indice_proveedores(G):
+    """IndiceProveedores de G, reconstruido solo si el grafo cambió."""
+    return cache_grafo(G, "proveedores", IndiceProveedores)
+
+
+def grafo_compacto(G):
+    """GrafoCompacto de la parte orden-ítem de G, reconstruido solo si el grafo cambió."""
+    return cache_grafo(G, "compacto", lambda G: GrafoCompacto.desde_networkx(vista_bipartita(G)))
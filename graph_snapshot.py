@@ -0,0 +1,132 @@
+import hashlib
+import os
+import pickle
+
+from builder_graph import VERSION_GRAFO
+from dataset_cache import CACHE_DIR, clave_dataset, eliminar_obsoletos, _nombre_fuente, variante
+from graph_index import indice_grafo, sembrar_cache
+from summary_stats import vincular_resumen
+
+
+def clave_snapshot(file_path, filtro_tipo=None, compacto=False, con_proveedores=False, columnar=False):
+    """Clave del snapshot: la del dataset limpio (CSV + reglas de normalización) + versión del constructor."""
+    partes = [clave_dataset(file_path, filtro_tipo, compacto), str(VERSION_GRAFO), repr(con_proveedores),
+              repr(columnar)]
+    return hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:16]
+
+
+def _ruta_snapshot(file_path, clave, filtro_tipo=None, compacto=False, con_proveedores=False, columnar=False):
+    codigo = variante(filtro_tipo, compacto, con_proveedores, columnar)
+    nombre = f"grafo_{_nombre_fuente(file_path)}_{codigo}_{clave}.pkl"
+    return os.path.join(CACHE_DIR, nombre)
+
+
+def cargar_snapshot(file_path, filtro_tipo=None, compacto=False, con_proveedores=False, columnar=False):
+    """
+    Devuelve (df, G) desde el snapshot vigente, con el índice del grafo ya
+    registrado en la caché. (None, None) si no existe o no se pudo leer.
+    """
+    clave = clave_snapshot(file_path, filtro_tipo, compacto, con_proveedores, columnar)
+    ruta = _ruta_snapshot(file_path, clave, filtro_tipo, compacto, con_proveedores, columnar)
+    if not os.path.exists(ruta):
+        return None, None
+
+    try:
+        with open(ruta, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f" No se pudo leer el snapshot del grafo: {e}")
+        return None, None
+
+    G = snapshot["G"]
+    sembrar_cache(G, "indice", snapshot["indice"])
+    vincular_resumen(snapshot["df"])
+    print(f"✓ Grafo cargado desde snapshot: {ruta} "
+          f"({G.number_of_nodes():,} nodos, {G.number_of_edges():,} aristas)")
+    print()
+    return snapshot["df"], G
+
+
+def guardar_snapshot(file_path, df, G, filtro_tipo=None, compacto=False, con_proveedores=False, columnar=False):
+    """Guarda df, G y su índice; borra los snapshots anteriores del mismo origen y variante."""
+    clave = clave_snapshot(file_path, filtro_tipo, compacto, con_proveedores, columnar)
+    ruta = _ruta_snapshot(file_path, clave, filtro_tipo, compacto, con_proveedores, columnar)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            pickle.dump({"df": df, "G": G, "indice": indice_grafo(G)}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+        eliminar_obsoletos(ruta)
+    except Exception as e:
+        print(f" No se pudo guardar el snapshot del grafo: {e}")
+
+
+def _ruta_grafo_incremental(file_path, filtro_tipo, compacto, con_proveedores, columnar):
+    # Sin hash del contenido, como el estado de la ingesta incremental
+    return os.path.join(CACHE_DIR, f"grafo_incremental_{_nombre_fuente(file_path)}_"
+                                   f"{variante(filtro_tipo, compacto, con_proveedores, columnar)}.pkl")
+
+
+def cargar_grafo_incremental(file_path, registros, filtro_tipo=None, compacto=False, con_proveedores=False,
+                             columnar=False):
+    """
+    Grafo guardado por la ingesta incremental, si se construyó con la misma versión
+    del constructor y con `registros` filas limpias; si no, None.
+    """
+    ruta = _ruta_grafo_incremental(file_path, filtro_tipo, compacto, con_proveedores, columnar)
+    if not os.path.exists(ruta):
+        return None
+
+    try:
+        with open(ruta, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f" No se pudo leer el snapshot incremental del grafo: {e}")
+        return None
+
+    if snapshot["version"] != VERSION_GRAFO or snapshot["registros"] != registros:
+        return None
+    G = snapshot["G"]
+    sembrar_cache(G, "indice", snapshot["indice"])
+    vincular_resumen(snapshot["df"])
+    print(f"✓ Grafo cargado desde snapshot incremental: {ruta} "
+          f"({G.number_of_nodes():,} nodos, {G.number_of_edges():,} aristas)")
+    return G
+
+
+def guardar_grafo_incremental(file_path, G, registros, filtro_tipo=None, compacto=False, con_proveedores=False,
+                              columnar=False):
+    """Guarda G y su índice junto con el número de filas limpias que contiene."""
+    ruta = _ruta_grafo_incremental(file_path, filtro_tipo, compacto, con_proveedores, columnar)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            pickle.dump({"G": G, "indice": indice_grafo(G), "registros": registros, "version": VERSION_GRAFO},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except Exception as e:
+        print(f" No se pudo guardar el snapshot incremental del grafo: {e}")
+
+
+def _ruta_clave_visualizacion(ruta_html):
+    return ruta_html + ".clave"
+
+
+def visualizacion_vigente(ruta_html, clave):
+    """True si ruta_html existe y se generó con `clave` (guardada al lado con registrar_visualizacion)."""
+    ruta = _ruta_clave_visualizacion(ruta_html)
+    if not os.path.exists(ruta_html) or not os.path.exists(ruta):
+        return False
+    with open(ruta, encoding="utf-8") as f:
+        return f.read().strip() == clave
+
+
+def registrar_visualizacion(ruta_html, clave):
+    """Guarda junto a ruta_html la clave de los datos con que se generó."""
+    try:
+        with open(_ruta_clave_visualizacion(ruta_html), "w", encoding="utf-8") as f:
+            f.write(clave)
+    except OSError as e:
+        print(f" No se pudo guardar la clave de {ruta_html}: {e}")
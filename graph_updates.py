@@ -0,0 +1,110 @@
+from builder_graph import agrupar_ordenes, agregar_filas, asignar_fechas, asignar_proveedores
+from graph_index import aplicar_cambios, es_tripartito, indice_vigente
+
+
+def _nodo(prefijo, valor):
+    valor = str(valor)
+    return valor if valor.startswith(prefijo) else f"{prefijo}{valor}"
+
+
+def agregar_orden(G, df_filas):
+    """
+    Agrega al grafo las filas limpias de una o más órdenes (columnas de clean_data).
+    Si la orden ya existe, sus montos se suman a los actuales. Devuelve los
+    nodos de orden tocados.
+    """
+    indice = indice_vigente(G)
+
+    df_grouped = agrupar_ordenes(df_filas)
+    agregar_filas(G, df_grouped)
+    asignar_proveedores(G, df_filas)
+    asignar_fechas(G, df_filas)
+
+    # Afectados en el mismo orden en que agregar_filas insertó los nodos nuevos,
+    # para que el índice conserve el orden de G
+    afectados = {}
+    for numero, proveedor, norm in zip(df_grouped["ORDEN_NUMERO"], df_grouped["ORDEN_PROVEEDOR"],
+                                       df_grouped["ORDEN_DESCRIPCION_NORM"]):
+        afectados[f"Orden_{numero}"] = None
+        afectados[f"Item_{norm}"] = None
+        if es_tripartito(G):
+            afectados[f"Proveedor_{proveedor}"] = None
+    ordenes = [n for n in afectados if n.startswith("Orden_")]
+    for orden in ordenes:
+        afectados.update(dict.fromkeys(G.neighbors(orden)))
+
+    aplicar_cambios(G, indice, afectados)
+    return ordenes
+
+
+def corregir_monto(G, orden, item, monto, proveedor=None):
+    """
+    Reemplaza el monto de la línea (orden, ítem). orden es el número de orden
+    (o el nodo "Orden_..."), item la descripción normalizada (o el nodo "Item_...").
+    En el grafo tripartito se corrige la parte de `proveedor`; si se omite, la
+    línea debe tener un solo proveedor.
+    """
+    orden = _nodo("Orden_", orden)
+    item = _nodo("Item_", item)
+
+    if not G.has_edge(orden, item):
+        print(f" No existe la línea {orden} - {item}")
+        return False
+    if not monto > 0:
+        print(f" Monto inválido para {orden} - {item}: {monto} (para quitar la orden usar anular_orden)")
+        return False
+
+    indice = indice_vigente(G)
+    arista = G[orden][item]
+    afectados = {orden, item}
+
+    if es_tripartito(G):
+        montos = arista['montos_proveedor']
+        if proveedor is None:
+            if len(montos) != 1:
+                print(f" {orden} - {item} tiene {len(montos)} proveedores: indicar cuál corregir")
+                return False
+            proveedor = next(iter(montos))
+        if proveedor not in montos:
+            print(f" {proveedor} no factura {item} en {orden}")
+            return False
+
+        diferencia = monto - montos[proveedor]
+        montos[proveedor] = monto
+        arista['weight'] = sum(montos.values())
+
+        nodo_proveedor = f"Proveedor_{proveedor}"
+        G[orden][nodo_proveedor]['weight'] += diferencia
+        afectados.add(nodo_proveedor)
+    else:
+        arista['weight'] = monto
+
+    aplicar_cambios(G, indice, afectados)
+    return True
+
+
+def anular_orden(G, orden):
+    """
+    Retira una orden (p. ej. anulada). Los ítems y proveedores que se quedan sin
+    ninguna orden también se retiran.
+    """
+    orden = _nodo("Orden_", orden)
+    if orden not in G:
+        print(f" No existe la orden {orden}")
+        return False
+
+    indice = indice_vigente(G)
+    vecinos = list(G.neighbors(orden))
+    G.remove_node(orden)
+
+    eliminados = [orden]
+    afectados = []
+    for nodo in vecinos:
+        if G.degree(nodo) == 0:
+            G.remove_node(nodo)
+            eliminados.append(nodo)
+        else:
+            afectados.append(nodo)
+
+    aplicar_cambios(G, indice, afectados, eliminados)
+    return True
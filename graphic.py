@@ -1,5 +1,20 @@
+import os
+
 from pyvis.network import Network
 
+from distribution import distribucion_grafo
+from graph_index import indice_grafo
+
+# Colores de arista según rango de monto (ajustados a montos en soles)
+BORDES_COLOR_ARISTA = [float('-inf'), 1000, 5000, float('inf')]
+COLORES_ARISTA = [
+    '#95e1d3',  # Verde claro para montos < S/ 1,000
+    '#ffe66d',  # Amarillo para montos S/ 1,000 - S/ 5,000
+    '#ff6b6b',  # Rojo para montos > S/ 5,000
+]
+# Aristas sin monto (NaN): quedan fuera de todos los rangos
+COLOR_ARISTA_SIN_MONTO = '#888888'
+
 
 def create_network():
     """Crea el objeto de red configurado para visualización"""
@@ -55,20 +70,16 @@ def create_network():
 
 def add_nodes(net, H, node_type):
     """Añade los nodos al grafo con sus propiedades y tooltips"""
-    item_montos = {}
-
-    # Calcular el monto total de compras por ítem
-    for node in H.nodes():
-        if H.nodes[node]['type'] == 'item':
-            item_montos[node] = sum(H[node][neighbor]['weight'] for neighbor in H.neighbors(node))
+    # Grados y montos por nodo precalculados
+    indice = indice_grafo(H)
 
     for node in H.nodes():
         data = H.nodes[node]
-        degree = H.degree(node)
+        degree = indice.grado[node]
 
         if data['type'] == 'item':
-            total_monto = item_montos.get(node, 0)
-            avg_monto = total_monto / degree if degree > 0 else 0
+            total_monto = indice.monto_total[node]
+            avg_monto = indice.monto_promedio[node]
 
             # Usar label_original si existe, sino usar label
             display_label = data.get('label_original', data['label'])[:50]
@@ -90,7 +101,7 @@ def add_nodes(net, H, node_type):
                 borderWidth=2
             )
         else:  # Nodo tipo 'orden'
-            total_monto_orden = sum(H[node][neighbor]['weight'] for neighbor in H.neighbors(node))
+            total_monto_orden = indice.monto_total[node]
             tooltip = f"""
             <b>Orden N°:</b> {data['label']}<br>
             <b>Ítems en orden:</b> {degree}<br>
@@ -113,19 +124,20 @@ def add_edges(net, H):
     if not H.edges:
         return 
 
-    max_weight = max(d['weight'] for _, _, d in H.edges(data=True))
+    # Los montos NaN no entran en el máximo (max() con NaN depende del orden)
+    max_weight = max((d['weight'] for _, _, d in H.edges(data=True) if d['weight'] == d['weight']), default=0)
 
-    for u, v, data in H.edges(data=True):
-        weight = data['weight']
+    # Rango de monto de cada arista, en el orden de H.edges(); -1 si el monto es NaN
+    rangos = distribucion_grafo(H, "peso_aristas", BORDES_COLOR_ARISTA, cerrado="derecha").asignacion
 
-        # Colores según rango de monto (ajustados a montos en soles)
-        edge_color = (
-            '#ff6b6b' if weight > 5000 else  # Rojo para montos > S/ 5,000
-            '#ffe66d' if weight > 1000 else  # Amarillo para montos S/ 1,000 - S/ 5,000
-            '#95e1d3'  # Verde claro para montos < S/ 1,000
-        )
+    for (u, v, data), rango in zip(H.edges(data=True), rangos.tolist()):
+        weight = data['weight']
+        if rango < 0:
+            net.add_edge(u, v, title="<b>Monto de compra:</b> sin dato", color=COLOR_ARISTA_SIN_MONTO, width=1)
+            continue
+        edge_color = COLORES_ARISTA[rango]
 
-        width = 1 + (weight / max_weight) * 4
+        width = 1 + (weight / max_weight) * 4 if max_weight else 1
         tooltip = f"<b>Monto de compra:</b> S/ {weight:,.2f}"
 
         net.add_edge(u, v, title=tooltip, color=edge_color, width=width)
@@ -190,6 +202,7 @@ def save_html(net, legend_html, output_file):
 
     html_final = html.replace("</body>", f"{legend_html}</body>")
 
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(html_final)
 
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from graph_arrays import TIPO_ITEM
+from graph_index import cache_grafo, grafo_compacto, indice_grafo, indice_proveedores
+
+
+def clasificar_riesgo(num_proveedores, monto_total):
+    """Evaluación de la concentración de proveedores de un ítem."""
+    if num_proveedores == 1 and monto_total > 5000:
+        return "Riesgo de Monopolio (1 proveedor)"
+    if num_proveedores == 2 and monto_total > 10000:
+        return "Riesgo de Duopolio (2 proveedores)"
+    return f"Diversificación BAJA ({num_proveedores} proveedores)"
+
+
+def _fechas_nodos(G, nombres):
+    """datetime64[D] con la fecha de cada nodo (NaT si no tiene)."""
+    return np.array([G.nodes[n].get("fecha") or "NaT" for n in nombres], dtype="datetime64[D]")
+
+
+def _extremos(valores, offsets, con_datos, funcion, vacio):
+    """funcion.reduceat por segmento, con `vacio` en los segmentos sin datos."""
+    resultado = np.full(len(con_datos), vacio, dtype=valores.dtype)
+    if con_datos.any():
+        resultado[con_datos] = funcion.reduceat(valores, offsets[:-1][con_datos])
+    return resultado
+
+
+class TablaItems:
+    """
+    Estadísticas por ítem materializadas en columnas (una fila por ítem, en el orden de G),
+    calculadas en una pasada vectorizada sobre las aristas del GrafoCompacto:
+
+    - num_ordenes, monto_total, monto_promedio: los mismos valores del GraphIndex
+    - monto_mediana / monto_min / monto_max: sobre los montos de sus aristas orden-ítem
+    - primera_fecha / ultima_fecha: fechas extremas de sus órdenes (atributo 'fecha')
+    - proveedores[i]: [(proveedor, participación en el monto)], de mayor a menor
+    - riesgo: clasificar_riesgo()
+
+    fila(item) devuelve la fila de un ítem como dict.
+    """
+
+    def __init__(self, G):
+        C = grafo_compacto(G)
+        indice = indice_grafo(G)
+        reparto = indice_proveedores(G).proveedores_item
+
+        pos_items = C.nodos_de_tipo(TIPO_ITEM)
+        self.items = C.nombres[pos_items].tolist()
+        self.indice_item = {item: i for i, item in enumerate(self.items)}
+        n = len(self.items)
+
+        # Entradas del CSR que salen de ítems; quedan agrupadas por ítem
+        fila_item = np.full(len(C), -1, dtype=np.int64)
+        fila_item[pos_items] = np.arange(n)
+        nodo_entrada = np.repeat(np.arange(len(C)), C.grados())
+        de_item = C.tipo[nodo_entrada] == TIPO_ITEM
+        filas = fila_item[nodo_entrada[de_item]]
+        pesos = C.pesos[de_item]
+        ordenes = C.vecinos[de_item]
+
+        cuentas = np.bincount(filas, minlength=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(cuentas, out=offsets[1:])
+        con_datos = cuentas > 0
+
+        # Montos ordenados dentro de cada ítem: mínimo, máximo y mediana por posición
+        montos = pesos[np.lexsort((pesos, filas))]
+        self.num_ordenes = cuentas
+        self.monto_min = np.zeros(n)
+        self.monto_max = np.zeros(n)
+        self.monto_mediana = np.zeros(n)
+        inicio = offsets[:-1][con_datos]
+        c = cuentas[con_datos]
+        self.monto_min[con_datos] = montos[inicio]
+        self.monto_max[con_datos] = montos[inicio + c - 1]
+        self.monto_mediana[con_datos] = (montos[inicio + (c - 1) // 2] + montos[inicio + c // 2]) / 2
+
+        self.monto_total = np.array([indice.monto_total[item] for item in self.items], dtype=float)
+        self.monto_promedio = np.array([indice.monto_promedio[item] for item in self.items], dtype=float)
+
+        # Fechas como días enteros; NaT se reemplaza para que no gane en mínimo/máximo
+        dias = _fechas_nodos(G, C.nombres)[ordenes].astype(np.int64)
+        sin_fecha = dias == np.iinfo(np.int64).min
+        maximo, minimo = np.iinfo(np.int64).max, np.iinfo(np.int64).min
+        primeras = _extremos(np.where(sin_fecha, maximo, dias), offsets, con_datos, np.minimum, maximo)
+        ultimas = _extremos(np.where(sin_fecha, minimo, dias), offsets, con_datos, np.maximum, minimo)
+        self.primera_fecha = np.where(primeras == maximo, minimo, primeras).astype("datetime64[D]")
+        self.ultima_fecha = ultimas.astype("datetime64[D]")
+
+        # Participación de cada proveedor en el monto del ítem
+        self.proveedores = []
+        for item in self.items:
+            montos_item = reparto.get(item, {})
+            total = sum(montos_item.values())
+            lista = sorted(((p, m) for p, m in montos_item.items() if 'MÚLTIPLE' not in p),
+                           key=lambda x: x[1], reverse=True)
+            self.proveedores.append([(p, m / total if total else 0.0) for p, m in lista])
+
+        self.riesgo = [clasificar_riesgo(len(provs), total)
+                       for provs, total in zip(self.proveedores, self.monto_total.tolist())]
+        self.nombres = [G.nodes[item].get('label_original', G.nodes[item]['label']) for item in self.items]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.indice_item
+
+    @staticmethod
+    def _fecha(valor):
+        return None if np.isnat(valor) else str(valor)
+
+    def fila(self, item):
+        """Estadísticas de un ítem (nodo "Item_...") como dict; None si no existe."""
+        i = self.indice_item.get(item)
+        if i is None:
+            return None
+        return {
+            'item': item,
+            'nombre_original': self.nombres[i],
+            'num_ordenes': int(self.num_ordenes[i]),
+            'monto_total': float(self.monto_total[i]),
+            'monto_promedio': float(self.monto_promedio[i]),
+            'monto_mediana': float(self.monto_mediana[i]),
+            'monto_min': float(self.monto_min[i]),
+            'monto_max': float(self.monto_max[i]),
+            'num_proveedores': len(self.proveedores[i]),
+            'proveedores': self.proveedores[i],
+            'primera_fecha': self._fecha(self.primera_fecha[i]),
+            'ultima_fecha': self._fecha(self.ultima_fecha[i]),
+            'riesgo': self.riesgo[i],
+        }
+
+    def a_dataframe(self):
+        """La tabla completa como DataFrame indexado por nodo de ítem."""
+        return pd.DataFrame({
+            'nombre_original': self.nombres,
+            'num_ordenes': self.num_ordenes,
+            'monto_total': self.monto_total,
+            'monto_promedio': self.monto_promedio,
+            'monto_mediana': self.monto_mediana,
+            'monto_min': self.monto_min,
+            'monto_max': self.monto_max,
+            'num_proveedores': [len(p) for p in self.proveedores],
+            'primera_fecha': self.primera_fecha,
+            'ultima_fecha': self.ultima_fecha,
+            'riesgo': self.riesgo,
+        }, index=pd.Index(self.items, name='item'))
+
+
+def tabla_items(G):
+    """TablaItems de G, reconstruida solo si el grafo cambió."""
+    return cache_grafo(G, "tabla_items", TablaItems)
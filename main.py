@@ -1,3 +1,6 @@
+import hashlib
+import os
+
 from analyzer import (
     get_top_items_by_orders,
     get_top_items_by_monto,
@@ -5,17 +8,49 @@ from analyzer import (
     analizar_interconexiones
 )
 
-from data_loader import load_data, clean_data, print_statistics
-from builder_graph import build_graph
+from data_loader import load_data, clean_data, print_statistics, load_and_clean_streaming, listar_archivos
+from dataset_cache import load_clean_data_cached, load_clean_data_incremental
+from builder_graph import build_graph, actualizar_grafo, validate_graph_integrity
+from graph_snapshot import (
+    cargar_snapshot, guardar_snapshot, cargar_grafo_incremental, guardar_grafo_incremental,
+    clave_snapshot, registrar_visualizacion
+)
 from filter_graph import filter_subgraph
 from graphic import create_network, add_nodes, add_edges, generate_legend_html, save_html
 
-from analisis_avanzado import ejecutar_analisis_mejorado
+from analisis_avanzado import MST_OUTPUT_FILE, ejecutar_analisis_mejorado
 
 
+# Un CSV, un directorio con varias exportaciones o un patrón glob ("datos/*.csv")
 FILE_PATH = "ordenes_compra_servicio.csv"
 FILTRO_TIPO = None
 
+# Lectura por bloques: el DataFrame devuelto son las sumas agregadas por
+# (orden, proveedor, ítem), no los registros originales
+MODO_STREAMING = False
+TAMANO_BLOQUE = 50000
+
+# Textos repetidos como categóricas y sin ITEM_ID materializado (menos memoria)
+MODO_COMPACTO = False
+
+# Atributos de los nodos del grafo por columnas (node_store): en este dataset
+# ~32% menos memoria del grafo, pero cada lectura G.nodes[n][...] es ~2.4x más
+# lenta y los análisis de main ~40% más lentos. Solo para grafos que no caben en memoria.
+ATRIBUTOS_COLUMNARES = False
+
+# Procesos para limpiar y normalizar en paralelo (None = un solo proceso)
+N_PROCESOS = None
+
+# Proveedores como nodos propios del grafo (órdenes con varios proveedores se reparten entre ellos)
+MODO_PROVEEDORES = False
+
+# Guardar/leer el dataset limpio en .cache/ (se invalida si cambia el CSV o las reglas)
+USAR_CACHE_DATOS = True
+
+# Solo leer y limpiar las filas agregadas al CSV desde la última ejecución y
+# agregarlas al grafo guardado (ver ejecutar_actualizacion_incremental)
+MODO_INCREMENTAL = False
+
 NODO_TIPO = (
     "Producto/Servicio" if FILTRO_TIPO is None
     else "Producto" if FILTRO_TIPO == 1
@@ -31,48 +66,91 @@ UMBRAL_FRAUDE = 5000
 
 OUTPUT_FILE = "static/graphs/grafo_compras_interactivo.html"
 
-def ejecutar_flujo_completo(filepath=FILE_PATH):
-
-
-    print("SISTEMA DE ANÁLISIS DE ÓRDENES DE COMPRA - VERSIÓN FINAL".center(70))
-    print(f"Archivo: {filepath}")
-    print()
 
+# clave_visualizacion ya calculada: filepath -> (firma_archivos, clave)
+_CLAVES_VISUALIZACION = {}
+
+
+def firma_archivos(filepath=FILE_PATH):
+    """(ruta, mtime, tamaño) de cada CSV de filepath: cambia si se reescriben, sin leerlos."""
+    firma = []
+    for ruta in listar_archivos(filepath):
+        estado = os.stat(ruta)
+        firma.append((ruta, estado.st_mtime_ns, estado.st_size))
+    return tuple(firma)
+
+
+def clave_visualizacion(filepath=FILE_PATH):
+    """
+    Clave de las páginas generadas (OUTPUT_FILE, MST): la del snapshot de los
+    datos más los parámetros del filtro. Si cambia, hay que regenerarlas.
+    El contenido de los CSV solo se vuelve a leer si cambió su firma_archivos.
+    """
+    firma = firma_archivos(filepath)
+    guardada = _CLAVES_VISUALIZACION.get(filepath)
+    if guardada is not None and guardada[0] == firma:
+        return guardada[1]
+
+    partes = [clave_snapshot(filepath, filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO,
+                             con_proveedores=MODO_PROVEEDORES, columnar=ATRIBUTOS_COLUMNARES),
+              repr((MIN_ORDENES_ITEM, MAX_ORDENES_POR_ITEM, MAX_ITEMS_TOTAL))]
+    clave = hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:16]
+    _CLAVES_VISUALIZACION[filepath] = (firma, clave)
+    return clave
+
+
+def cargar_datos_y_grafo(filepath=FILE_PATH):
+    """
+    Datos limpios y grafo, sin análisis ni visualización. Con USAR_CACHE_DATOS
+    se leen del snapshot en .cache/ si el CSV, las reglas y el constructor no
+    cambiaron; si no, se construyen y se guarda el snapshot. Con MODO_INCREMENTAL
+    solo se procesan las filas nuevas del CSV.
+    """
+    if MODO_INCREMENTAL and not MODO_STREAMING:
+        return ejecutar_actualizacion_incremental(filepath=filepath)
+
+    G = None
     try:
-        df = load_data(filepath)
-        df = clean_data(df, filtro_tipo=FILTRO_TIPO)
-        print_statistics(df, NODO_TIPO)
+        if MODO_STREAMING:
+            df = load_and_clean_streaming(filepath, filtro_tipo=FILTRO_TIPO, tamano_bloque=TAMANO_BLOQUE)
+        elif USAR_CACHE_DATOS:
+            df, G = cargar_snapshot(filepath, filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO,
+                                    con_proveedores=MODO_PROVEEDORES, columnar=ATRIBUTOS_COLUMNARES)
+            if df is None:
+                df = load_clean_data_cached(filepath, filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO,
+                                            n_procesos=N_PROCESOS)
+            print_statistics(df, NODO_TIPO)
+        else:
+            df = load_data(filepath, n_procesos=N_PROCESOS)
+            df = clean_data(df, filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO, n_procesos=N_PROCESOS)
+            print_statistics(df, NODO_TIPO)
     except Exception as e:
         print(f"Error en carga de datos: {e}")
         return None, None
 
 
     try:
-        G = build_graph(df, NODO_TIPO)
-
-        # agregar proveedor a cada orden
-        for _, row in df.iterrows():
-            key = f"Orden_{row['ORDEN_NUMERO']}"
-            if G.has_node(key):
-                proveedor = row.get("ORDEN_PROVEEDOR", "DESCONOCIDO")
-                G.nodes[key]["proveedor"] = proveedor
-                G.nodes[key]["ORDEN_PROVEEDOR"] = proveedor
+        if G is None:
+            G = build_graph(df, NODO_TIPO, con_proveedores=MODO_PROVEEDORES,
+                            atributos_columnares=ATRIBUTOS_COLUMNARES)
+            validate_graph_integrity(G, df)
+            print()
+            if USAR_CACHE_DATOS and not MODO_STREAMING:
+                guardar_snapshot(filepath, df, G, filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO,
+                                 con_proveedores=MODO_PROVEEDORES, columnar=ATRIBUTOS_COLUMNARES)
 
     except Exception as e:
         print(f"Error en construcción del grafo: {e}")
         return None, None
 
-
-    try:
-        get_orders_or_item = get_orders_per_item_distribution(G)
-        inter = analizar_interconexiones(G, NODO_TIPO)
-        top_items = get_top_items_by_orders(G, NODO_TIPO)
-        total_montos = get_top_items_by_monto(G, NODO_TIPO)
-    except Exception as e:
-        print(f" Error en análisis básico: {e}")
-        top_items = []
+    return df, G
 
 
+def generar_visualizacion(G, top_items, clave=None):
+    """
+    Subgrafo filtrado exportado con PyVis a OUTPUT_FILE; con `clave`
+    (clave_visualizacion) se registra junto al archivo. True si se generó.
+    """
     try:
         H = filter_subgraph(
             G,
@@ -105,6 +183,36 @@ def ejecutar_flujo_completo(filepath=FILE_PATH):
 
     except Exception as e:
         print(f"Error en visualización PyVis: {e}")
+        return False
+
+    if clave is not None:
+        registrar_visualizacion(OUTPUT_FILE, clave)
+    return True
+
+
+def ejecutar_flujo_completo(filepath=FILE_PATH):
+
+
+    print("SISTEMA DE ANÁLISIS DE ÓRDENES DE COMPRA - VERSIÓN FINAL".center(70))
+    print(f"Archivo: {filepath}")
+    print()
+
+    df, G = cargar_datos_y_grafo(filepath)
+    if G is None:
+        return None, None
+
+
+    try:
+        get_orders_or_item = get_orders_per_item_distribution(G)
+        inter = analizar_interconexiones(G, NODO_TIPO)
+        top_items = get_top_items_by_orders(G, NODO_TIPO)
+        total_montos = get_top_items_by_monto(G, NODO_TIPO)
+    except Exception as e:
+        print(f" Error en análisis básico: {e}")
+        top_items = []
+
+
+    generar_visualizacion(G, top_items, clave=clave_visualizacion(filepath))
 
     # ANÁLISIS AVANZADO
 
@@ -117,6 +225,10 @@ def ejecutar_flujo_completo(filepath=FILE_PATH):
             umbral_fraude=UMBRAL_FRAUDE
         )
 
+        # El MST también es una página servida: se registra su clave como la del grafo
+        if resultados.get("mst") is not None:
+            registrar_visualizacion(MST_OUTPUT_FILE, clave_visualizacion(filepath))
+
         if resultados.get("monopolios"):
             print(f"  ✓ Monopolios detectados: {len(resultados['monopolios'])}")
 
@@ -129,5 +241,49 @@ def ejecutar_flujo_completo(filepath=FILE_PATH):
 
     return df, G
 
+def ejecutar_actualizacion_incremental(G=None, filepath=FILE_PATH):
+    """
+    Ingesta incremental: lee y limpia solo las filas agregadas al CSV desde la
+    última ingesta y las agrega al grafo (el recibido o el del snapshot incremental,
+    que se actualiza). Sin grafo previo vigente, lo construye con todos los datos.
+    """
+    print("ACTUALIZACIÓN INCREMENTAL".center(70))
+    print(f"Archivo: {filepath}")
+    print()
+
+    try:
+        df, df_nuevo = load_clean_data_incremental(filepath, filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO,
+                                                   n_procesos=N_PROCESOS)
+    except Exception as e:
+        print(f"Error en carga incremental: {e}")
+        return None, None
+
+    if df is None:
+        return None, None
+    print_statistics(df, NODO_TIPO)
+
+    try:
+        construido = False
+        if G is None:
+            G = cargar_grafo_incremental(filepath, len(df) - len(df_nuevo), filtro_tipo=FILTRO_TIPO,
+                                         compacto=MODO_COMPACTO, con_proveedores=MODO_PROVEEDORES,
+                                         columnar=ATRIBUTOS_COLUMNARES)
+        if G is None:
+            G = build_graph(df, NODO_TIPO, con_proveedores=MODO_PROVEEDORES,
+                            atributos_columnares=ATRIBUTOS_COLUMNARES)
+            construido = True
+        elif len(df_nuevo) > 0:
+            actualizar_grafo(G, df_nuevo)
+        validate_graph_integrity(G, df)
+        print()
+        if construido or len(df_nuevo) > 0:
+            guardar_grafo_incremental(filepath, G, len(df), filtro_tipo=FILTRO_TIPO, compacto=MODO_COMPACTO,
+                                      con_proveedores=MODO_PROVEEDORES, columnar=ATRIBUTOS_COLUMNARES)
+    except Exception as e:
+        print(f"Error en actualización del grafo: {e}")
+        return None, None
+
+    return df, G
+
 if __name__ == "__main__":
     ejecutar_flujo_completo()
@@ -0,0 +1,279 @@
+import sys
+from collections.abc import MutableMapping
+
+import numpy as np
+
+# Códigos de la columna de tipo
+TIPOS = ["orden", "item", "proveedor"]
+CODIGO_TIPO = {t: i for i, t in enumerate(TIPOS)}
+PREFIJOS = {"orden": "Orden_", "item": "Item_", "proveedor": "Proveedor_"}
+
+# Claves que viven en columnas; el resto va a un dict por nodo solo si aparece
+CLAVES_COLUMNARES = {"type", "label", "label_original", "proveedor", "ORDEN_PROVEEDOR",
+                     "proveedores_set", "proveedores_lista", "es_multiple", "fecha"}
+
+
+class AlmacenNodos:
+    """
+    Atributos de los nodos del grafo guardados por columnas:
+
+    - tipo: int8 (índice en TIPOS)
+    - label: no se guarda si es el nombre del nodo sin su prefijo ("Orden_", "Item_"...)
+    - label_original: cadenas internadas (None fuera de los ítems)
+    - proveedor: int32, código en `proveedores` (diccionario de nombres), -1 si no tiene
+    - proveedores_set: códigos de todas las órdenes en un solo arreglo, con offsets
+      por nodo (como CSR), en el orden en que se agregaron
+    - fecha: cadenas "AAAA-MM-DD" internadas (None si el nodo no tiene)
+    - extra[i]: dict con cualquier otra clave, o con valores que no siguen el patrón
+
+    Costo: en el dataset del repositorio el grafo ocupa ~32% menos memoria, pero
+    cada lectura G.nodes[n][clave] pasa por la vista AtributosNodo y es ~2.4x más
+    lenta que en un dict (~40% más para los análisis de main). Por eso no está
+    en el camino por defecto (main.ATRIBUTOS_COLUMNARES = False).
+    """
+
+    def __init__(self, nodos):
+        nodos = list(nodos)
+        n = len(nodos)
+        self.proveedores = []
+        self.codigo_proveedor = {}
+
+        self.tipo = np.empty(n, dtype=np.int8)
+        self.proveedor = np.full(n, -1, dtype=np.int32)
+        self.label_original = np.empty(n, dtype=object)
+        self.fecha = np.empty(n, dtype=object)
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        self.extra = {}
+
+        codigos_conjuntos = []
+        for i, (nodo, datos) in enumerate(nodos):
+            datos = dict(datos)
+            tipo = datos.pop("type")
+            self.tipo[i] = CODIGO_TIPO[tipo]
+
+            label = datos.pop("label", None)
+            if label != self._label_derivado(nodo, tipo):
+                self._extra(i)["label"] = label
+
+            original = datos.pop("label_original", None)
+            self.label_original[i] = sys.intern(original) if isinstance(original, str) else original
+
+            proveedor = datos.pop("proveedor", None)
+            orden_proveedor = datos.pop("ORDEN_PROVEEDOR", None)
+            if proveedor is not None:
+                self.proveedor[i] = self._codigo(proveedor)
+            if orden_proveedor != proveedor:
+                self._extra(i)["ORDEN_PROVEEDOR"] = orden_proveedor
+
+            conjunto = datos.pop("proveedores_set", None)
+            if conjunto is not None:
+                codigos = [self._codigo(p) for p in conjunto]
+                # El set se rearma desde los códigos; si su orden de iteración no
+                # coincidiera con el original, se guarda tal cual
+                if list(set(self.proveedores[c] for c in codigos)) == list(conjunto):
+                    codigos_conjuntos.extend(codigos)
+                else:
+                    self._extra(i)["proveedores_set"] = conjunto
+            self.offsets[i + 1] = len(codigos_conjuntos)
+
+            lista = datos.pop("proveedores_lista", None)
+            multiple = datos.pop("es_multiple", None)
+            if conjunto is not None and len(conjunto) > 1:
+                if lista != list(conjunto):
+                    self._extra(i)["proveedores_lista"] = lista
+                if multiple is not True:
+                    self._extra(i)["es_multiple"] = multiple
+            else:
+                if lista is not None:
+                    self._extra(i)["proveedores_lista"] = lista
+                if multiple is not None:
+                    self._extra(i)["es_multiple"] = multiple
+
+            fecha = datos.pop("fecha", None)
+            self.fecha[i] = sys.intern(fecha) if isinstance(fecha, str) else fecha
+
+            if datos:
+                self._extra(i).update(datos)
+
+        self.conjuntos = np.array(codigos_conjuntos, dtype=np.int32)
+        # Nodos sin proveedores_set (ítems, proveedores) frente a órdenes con conjunto vacío
+        self.sin_conjunto = np.array([d.get("proveedores_set") is None for _, d in nodos], dtype=bool)
+
+    @staticmethod
+    def _label_derivado(nodo, tipo):
+        prefijo = PREFIJOS.get(tipo)
+        if prefijo and isinstance(nodo, str) and nodo.startswith(prefijo):
+            return nodo[len(prefijo):]
+        return None
+
+    def _codigo(self, proveedor):
+        codigo = self.codigo_proveedor.get(proveedor)
+        if codigo is None:
+            codigo = len(self.proveedores)
+            self.proveedores.append(sys.intern(proveedor) if isinstance(proveedor, str) else proveedor)
+            self.codigo_proveedor[proveedor] = codigo
+        return codigo
+
+    def _extra(self, i):
+        return self.extra.setdefault(i, {})
+
+    def conjunto(self, i):
+        """proveedores_set del nodo i, reconstruido en el orden de inserción original."""
+        extra = self.extra.get(i)
+        if extra is not None and "proveedores_set" in extra:
+            return extra["proveedores_set"]
+        if self.sin_conjunto[i]:
+            return None
+        codigos = self.conjuntos[self.offsets[i]:self.offsets[i + 1]]
+        return set(self.proveedores[c] for c in codigos)
+
+    def memoria(self):
+        """Bytes aproximados de las columnas (sin contar las cadenas compartidas)."""
+        arreglos = [self.tipo, self.proveedor, self.label_original, self.fecha, self.offsets, self.conjuntos,
+                    self.sin_conjunto]
+        return sum(a.nbytes for a in arreglos)
+
+
+class AtributosNodo(MutableMapping):
+    """
+    Vista tipo dict de los atributos de un nodo guardados en un AlmacenNodos.
+    Se lee y se escribe igual que el dict que usa networkx.
+    """
+
+    __slots__ = ("_almacen", "_nodo", "_i")
+
+    def __init__(self, almacen, nodo, i):
+        self._almacen = almacen
+        self._nodo = nodo
+        self._i = i
+
+    def _claves(self):
+        a, i = self._almacen, self._i
+        extra = a.extra.get(i, {})
+        ocultas = extra.get("__ocultas__", ())
+        tipo = TIPOS[a.tipo[i]]
+        claves = ["label"]
+        if tipo == "item" or a.label_original[i] is not None:
+            claves.append("label_original")
+        claves.append("type")
+        if a.proveedor[i] >= 0 or "proveedor" in extra:
+            claves.append("proveedor")
+        if a.proveedor[i] >= 0 or "ORDEN_PROVEEDOR" in extra:
+            claves.append("ORDEN_PROVEEDOR")
+        conjunto = a.conjunto(i)
+        if conjunto is not None:
+            claves.append("proveedores_set")
+        multiple = conjunto is not None and len(conjunto) > 1
+        if multiple or "proveedores_lista" in extra:
+            claves.append("proveedores_lista")
+        if multiple or "es_multiple" in extra:
+            claves.append("es_multiple")
+        if a.fecha[i] is not None or "fecha" in extra:
+            claves.append("fecha")
+        claves += [c for c in extra if c not in CLAVES_COLUMNARES and c != "__ocultas__" and c not in claves]
+        return [c for c in claves if c not in ocultas]
+
+    def __getitem__(self, clave):
+        a, i = self._almacen, self._i
+        extra = a.extra.get(i)
+        if extra is not None:
+            if clave in extra.get("__ocultas__", ()):
+                raise KeyError(clave)
+            if clave in extra:
+                return extra[clave]
+
+        if clave == "type":
+            return TIPOS[a.tipo[i]]
+        if clave == "label":
+            return AlmacenNodos._label_derivado(self._nodo, TIPOS[a.tipo[i]])
+        if clave == "label_original":
+            valor = a.label_original[i]
+            if valor is None and TIPOS[a.tipo[i]] != "item":
+                raise KeyError(clave)
+            return valor
+        if clave in ("proveedor", "ORDEN_PROVEEDOR"):
+            codigo = a.proveedor[i]
+            if codigo < 0:
+                raise KeyError(clave)
+            return a.proveedores[codigo]
+        if clave == "fecha":
+            if a.fecha[i] is None:
+                raise KeyError(clave)
+            return a.fecha[i]
+
+        conjunto = a.conjunto(i)
+        if clave == "proveedores_set" and conjunto is not None:
+            return conjunto
+        if conjunto is not None and len(conjunto) > 1:
+            if clave == "proveedores_lista":
+                return list(conjunto)
+            if clave == "es_multiple":
+                return True
+        raise KeyError(clave)
+
+    def __setitem__(self, clave, valor):
+        a, i = self._almacen, self._i
+        extra = a.extra.get(i)
+        if extra is not None and clave in extra.get("__ocultas__", ()):
+            extra["__ocultas__"].discard(clave)
+
+        if clave == "proveedor" and valor is not None:
+            anterior = self.get("ORDEN_PROVEEDOR")
+            a.proveedor[i] = a._codigo(valor)
+            a._extra(i).pop("proveedor", None)
+            # ORDEN_PROVEEDOR comparte la columna: conservar su valor si era distinto
+            if anterior is not None and anterior != valor:
+                a._extra(i)["ORDEN_PROVEEDOR"] = anterior
+            return
+        if clave == "ORDEN_PROVEEDOR" and a.proveedor[i] >= 0 and valor == a.proveedores[a.proveedor[i]]:
+            if extra is not None:
+                extra.pop("ORDEN_PROVEEDOR", None)
+            return
+        if clave == "fecha":
+            # Solo las cadenas van a la columna; cualquier otro valor queda en extra
+            a.fecha[i] = sys.intern(valor) if isinstance(valor, str) else None
+            if isinstance(valor, str):
+                if extra is not None:
+                    extra.pop("fecha", None)
+                return
+        a._extra(i)[clave] = valor
+
+    def __delitem__(self, clave):
+        if clave not in self:
+            raise KeyError(clave)
+        extra = self._almacen._extra(self._i)
+        extra.pop(clave, None)
+        if clave in self:
+            extra.setdefault("__ocultas__", set()).add(clave)
+
+    def __iter__(self):
+        return iter(self._claves())
+
+    def __len__(self):
+        return len(self._claves())
+
+    def __contains__(self, clave):
+        try:
+            self[clave]
+        except KeyError:
+            return False
+        return True
+
+    def copy(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+def compactar_atributos(G):
+    """
+    Mueve los atributos de todos los nodos de G a un AlmacenNodos y deja en G
+    vistas AtributosNodo en su lugar. G conserva topología y pesos; los nodos
+    agregados después vuelven a tener dicts normales.
+    """
+    nodos = list(G.nodes(data=True))
+    almacen = AlmacenNodos(nodos)
+    for i, (nodo, _) in enumerate(nodos):
+        G._node[nodo] = AtributosNodo(almacen, nodo, i)
+    return almacen
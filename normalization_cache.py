@@ -0,0 +1,128 @@
+import glob
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from data_loader import normalize_products_batch, version_reglas_normalizacion
+
+CACHE_DIR = ".cache"
+MAX_ENTRADAS = 200000
+
+
+class CacheNormalizacion:
+    """
+    Memoización persistente de normalize_products.
+    Clave: descripción original. El archivo lleva la versión de las reglas en el
+    nombre, así que al cambiar PALABRAS_CORTE, SINONIMOS o las reglas categóricas
+    se empieza con una caché vacía y se borran los archivos de versiones anteriores.
+    Se desalojan las entradas menos usadas (LRU). El archivo solo se reescribe si
+    se agregaron o desalojaron entradas (el orden de uso de las consultas no se guarda).
+    """
+
+    def __init__(self, ruta=None, max_entradas=MAX_ENTRADAS, entradas=None):
+        """
+        Con `entradas` (dict original -> normalizada) la caché vive solo en memoria,
+        sin archivo: es la que reciben los procesos de la limpieza en paralelo.
+        """
+        self.version = version_reglas_normalizacion()
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()
+        self.modificada = False
+        if entradas is not None:
+            self.ruta = None
+            self.entradas.update(entradas)
+            return
+
+        self.ruta = ruta or os.path.join(CACHE_DIR, f"normalizacion_{self.version}.pkl")
+        self.cargar()
+        if ruta is None:
+            self._eliminar_versiones_anteriores()
+
+    def _eliminar_versiones_anteriores(self):
+        for anterior in glob.glob(os.path.join(CACHE_DIR, "normalizacion_*.pkl")):
+            if os.path.normpath(anterior) != os.path.normpath(self.ruta):
+                try:
+                    os.remove(anterior)
+                except OSError as e:
+                    print(f" No se pudo borrar la caché de normalización anterior {anterior}: {e}")
+
+    def cargar(self):
+        if not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, "rb") as f:
+                datos = pickle.load(f)
+        except Exception as e:
+            print(f" No se pudo leer la caché de normalización: {e}")
+            return
+        if datos.get("version") == self.version:
+            self.entradas = datos["entradas"]
+
+    def guardar(self):
+        if not self.modificada or self.ruta is None:
+            return
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            pickle.dump({"version": self.version, "entradas": self.entradas}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self.ruta)
+        self.modificada = False
+
+    def normalizar(self, serie, vectorizado=True, verbose=True):
+        """Normaliza una Serie calculando solo las descripciones únicas que no están en caché."""
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+        unicos = np.asarray(unicos, dtype=object)
+        normalizados = np.empty(len(unicos), dtype=object)
+
+        faltantes = []
+        for i, texto in enumerate(unicos):
+            if isinstance(texto, str) and texto in self.entradas:
+                self.entradas.move_to_end(texto)
+                normalizados[i] = self.entradas[texto]
+            else:
+                faltantes.append(i)
+
+        if faltantes:
+            nuevos = normalize_products_batch(pd.Series(unicos[faltantes]), vectorizado=vectorizado)
+            normalizados[faltantes] = nuevos.to_numpy(dtype=object)
+            for texto, norm in zip(unicos[faltantes], nuevos):
+                if isinstance(texto, str):
+                    self.entradas[texto] = norm
+
+        # Desalojo LRU
+        desalojadas = self._desalojar()
+
+        self.modificada = self.modificada or bool(faltantes) or desalojadas > 0
+        if verbose:
+            print(f"  Descripciones únicas: {len(unicos):,} | recalculadas: {len(faltantes):,}")
+
+        return pd.Series(normalizados[codigos], index=serie.index, dtype=object)
+
+    def conocidas(self, descripciones):
+        """Subconjunto de la caché para las descripciones dadas (sin tocar el orden LRU)."""
+        return {texto: self.entradas[texto] for texto in descripciones if texto in self.entradas}
+
+    def registrar(self, originales, normalizados):
+        """Agrega a la caché pares ya calculados (p. ej. por la limpieza en paralelo)."""
+        pares = pd.DataFrame({"original": originales, "norm": normalizados}).drop_duplicates("original")
+        nuevas = 0
+        for texto, norm in zip(pares["original"], pares["norm"]):
+            if isinstance(texto, str):
+                if texto not in self.entradas or self.entradas[texto] != norm:
+                    nuevas += 1
+                self.entradas[texto] = norm
+                self.entradas.move_to_end(texto)
+        desalojadas = self._desalojar()
+        self.modificada = self.modificada or nuevas > 0 or desalojadas > 0
+        return nuevas
+
+    def _desalojar(self):
+        desalojadas = 0
+        while len(self.entradas) > self.max_entradas:
+            self.entradas.popitem(last=False)
+            desalojadas += 1
+        return desalojadas
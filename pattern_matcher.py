@@ -0,0 +1,101 @@
+from collections import deque
+
+
+def es_caracter_palabra(c):
+    # Misma definición que \w en las expresiones regulares de Python (str)
+    return c.isalnum() or c == "_"
+
+
+class AutomataFrases:
+    """
+    Autómata Aho-Corasick sobre una lista de frases. Encuentra todas las
+    apariciones de todas las frases en una sola pasada por el texto; el id de
+    cada frase es su posición en la lista (sirve como prioridad).
+    """
+
+    def __init__(self, frases):
+        self.frases = list(frases)
+        self.longitudes = [len(f) for f in self.frases]
+
+        # Trie: transiciones, enlace de fallo y frases que terminan en cada estado
+        self.transiciones = [{}]
+        self.salidas = [[]]
+        for pid, frase in enumerate(self.frases):
+            estado = 0
+            for c in frase:
+                siguiente = self.transiciones[estado].get(c)
+                if siguiente is None:
+                    siguiente = len(self.transiciones)
+                    self.transiciones[estado][c] = siguiente
+                    self.transiciones.append({})
+                    self.salidas.append([])
+                estado = siguiente
+            self.salidas[estado].append(pid)
+
+        # Enlaces de fallo por BFS; las salidas heredan las del estado de fallo
+        self.fallos = [0] * len(self.transiciones)
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, siguiente in self.transiciones[estado].items():
+                fallo = self.fallos[estado]
+                while fallo and c not in self.transiciones[fallo]:
+                    fallo = self.fallos[fallo]
+                destino = self.transiciones[fallo].get(c, 0)
+                self.fallos[siguiente] = destino if destino != siguiente else 0
+                self.salidas[siguiente] = self.salidas[siguiente] + self.salidas[self.fallos[siguiente]]
+                cola.append(siguiente)
+
+    def coincidencias(self, text):
+        """Genera (inicio, id) de cada aparición, en orden de posición final."""
+        transiciones, fallos, salidas, longitudes = self.transiciones, self.fallos, self.salidas, self.longitudes
+        estado = 0
+        for i, c in enumerate(text):
+            while estado and c not in transiciones[estado]:
+                estado = fallos[estado]
+            estado = transiciones[estado].get(c, 0)
+            for pid in salidas[estado]:
+                yield i - longitudes[pid] + 1, pid
+
+    def primeras_apariciones(self, text):
+        """Posición de la primera aparición de cada frase encontrada: {id: inicio}."""
+        primeras = {}
+        for inicio, pid in self.coincidencias(text):
+            if pid not in primeras:
+                primeras[pid] = inicio
+        return primeras
+
+    def cortar_en_orden(self, text):
+        """
+        Equivale a recorrer las frases en orden y hacer text = text.split(frase)[0]
+        cada vez que la frase está en el texto (ya recortado).
+        """
+        primeras = self.primeras_apariciones(text)
+        limite = len(text)
+        for pid in sorted(primeras):
+            # Tras cada corte el texto es un prefijo: la frase solo sigue presente
+            # si su primera aparición cabe entera en él
+            if primeras[pid] + self.longitudes[pid] <= limite:
+                limite = primeras[pid]
+        return text[:limite]
+
+    def primera_palabra_completa(self, text):
+        """
+        Id de menor prioridad cuya frase aparece como palabra completa
+        (equivale a re.search(r"\\b" + re.escape(frase) + r"\\b")), o None.
+        """
+        mejor = None
+        n = len(text)
+        for inicio, pid in self.coincidencias(text):
+            if mejor is not None and pid >= mejor:
+                continue
+            fin = inicio + self.longitudes[pid]
+            antes = inicio > 0 and es_caracter_palabra(text[inicio - 1])
+            despues = fin < n and es_caracter_palabra(text[fin])
+            borde_inicio = antes != (inicio < n and es_caracter_palabra(text[inicio]))
+            borde_fin = (fin > 0 and es_caracter_palabra(text[fin - 1])) != despues
+            if borde_inicio and borde_fin:
+                mejor = pid
+                if mejor == 0:
+                    break
+        return mejor
@@ -0,0 +1,137 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from graph_index import cache_grafo, indice_grafo
+
+
+def _num_proveedores(indice, item):
+    return sum(1 for p in indice.proveedores_item[item] if 'MÚLTIPLE' not in p)
+
+
+# Métricas por ítem, calculadas desde el GraphIndex
+METRICAS = {
+    "grado": lambda indice, item: indice.grado[item],
+    "monto_total": lambda indice, item: indice.monto_total[item],
+    "monto_promedio": lambda indice, item: indice.monto_promedio[item],
+    "num_proveedores": _num_proveedores,
+}
+
+
+class Ranking(Sequence):
+    """
+    Ítems de mayor a menor según una métrica, como secuencia de (nodo, valor).
+    Los empates conservan el orden de G (igual que el quicksort que se usaba antes).
+
+    top(k) usa np.partition y solo ordena los k elegidos; el orden completo se
+    calcula la primera vez que alguien lo recorre entero y queda guardado.
+
+    Con `metrica` (ver METRICAS), actualizar() aplica una modificación del grafo
+    en los ítems afectados en lugar de recalcular el ranking.
+    """
+
+    def __init__(self, nodos, valores, metrica=None):
+        self.nodos = nodos
+        self.valores = valores
+        self.metrica = metrica
+        self._arreglo = np.asarray(valores) if valores else np.zeros(0)
+        self._orden = None
+        self._posicion = None
+
+    def _orden_completo(self):
+        if self._orden is None:
+            self._orden = np.argsort(-self._arreglo, kind="stable").tolist()
+        return self._orden
+
+    def _posiciones_top(self, k):
+        n = len(self.nodos)
+        if k <= 0:
+            return []
+        if self._orden is not None or k >= n:
+            return self._orden_completo()[:k]
+
+        v = self._arreglo
+        # k-ésimo mayor valor: entran todos los mayores y, de los empatados con él,
+        # los primeros según el orden de G
+        umbral = np.partition(v, n - k)[n - k]
+        mayores = np.flatnonzero(v > umbral)
+        iguales = np.flatnonzero(v == umbral)[:k - len(mayores)]
+        elegidos = np.concatenate([mayores, iguales])
+        return elegidos[np.lexsort((elegidos, -v[elegidos]))].tolist()
+
+    def _pares(self, posiciones):
+        return [(self.nodos[i], self.valores[i]) for i in posiciones]
+
+    def top(self, k=10):
+        """Los k primeros (nodo, valor)."""
+        return self._pares(self._posiciones_top(k))
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if inicio == 0 and paso == 1:
+                return self.top(fin)
+            return self._pares(self._orden_completo()[indice])
+        return self._pares([self._orden_completo()[indice]])[0]
+
+    def __iter__(self):
+        return iter(self._pares(self._orden_completo()))
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def __repr__(self):
+        return f"Ranking({len(self)} ítems)"
+
+    def actualizar(self, G, indice, afectados, eliminados=()):
+        """
+        Aplica una modificación de G ya reflejada en `indice` (ver
+        graph_index.aplicar_cambios): cambia el valor de los ítems afectados y
+        agrega al final los nuevos, en el mismo orden que indice.items. Si se
+        retiró algún ítem devuelve False y el ranking se reconstruye.
+        """
+        if self.metrica is None:
+            return False
+        if self._posicion is None:
+            self._posicion = {nodo: i for i, nodo in enumerate(self.nodos)}
+        if any(nodo in self._posicion for nodo in eliminados):
+            return False
+
+        valor = METRICAS[self.metrica]
+        nuevos = []
+        for nodo in afectados:
+            if nodo not in indice.items:
+                continue
+            i = self._posicion.get(nodo)
+            if i is None:
+                nuevos.append(nodo)
+            else:
+                self.valores[i] = self._arreglo[i] = valor(indice, nodo)
+
+        for nodo in nuevos:
+            self._posicion[nodo] = len(self.nodos)
+            self.nodos.append(nodo)
+            self.valores.append(valor(indice, nodo))
+        if nuevos:
+            self._arreglo = np.asarray(self.valores)
+        self._orden = None
+        return True
+
+
+def ranking_items(G, metrica="grado"):
+    """Ranking de los ítems de G por `metrica` (ver METRICAS), en caché por versión del grafo."""
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconocida: {metrica} (opciones: {', '.join(METRICAS)})")
+
+    def construir(G):
+        indice = indice_grafo(G)
+        valor = METRICAS[metrica]
+        nodos = list(indice.items)
+        return Ranking(nodos, [valor(indice, item) for item in nodos], metrica)
+
+    return cache_grafo(G, f"ranking_{metrica}", construir)
+
+
+def top_items(G, metrica="grado", k=10):
+    """Los k ítems con mayor `metrica`, como lista de (nodo, valor)."""
+    return ranking_items(G, metrica).top(k)
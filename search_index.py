@@ -0,0 +1,145 @@
+import heapq
+
+import numpy as np
+
+from data_loader import normalize_products, quitar_tildes
+from graph_index import cache_grafo, indice_grafo
+
+# Fracción mínima de trigramas de la consulta que debe tener un ítem para una coincidencia aproximada
+SIMILITUD_MINIMA = 0.6
+
+# Tipos de coincidencia, de mejor a peor
+EXACTA = "exacta"          # la descripción normalizada es igual a la consulta normalizada
+TEXTO = "texto"            # la consulta aparece dentro de la descripción original
+APROXIMADA = "aproximada"  # comparte la mayoría de trigramas con la consulta
+PRIORIDAD = {EXACTA: 0, TEXTO: 1, APROXIMADA: 2}
+
+
+def _texto(text):
+    return quitar_tildes(text.lower()) if isinstance(text, str) else ""
+
+
+def trigramas(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda de ítems, construido una vez por versión del grafo:
+
+    - items[i]: nodo del ítem, en el orden de G
+    - exacto: descripción normalizada (label) -> posición del primer ítem con ella
+    - textos[i]: descripción original en minúsculas y sin tildes
+    - trigramas: trigrama -> arreglo de posiciones de los ítems que lo contienen
+
+    actualizar() agrega los ítems nuevos y el grado de los afectados sin reconstruirlo.
+    """
+
+    def __init__(self, G):
+        indice = indice_grafo(G)
+        self.items = []
+        self.posicion = {}
+        self.grado = np.zeros(0, dtype=np.int64)
+        self.exacto = {}
+        self.textos = []
+        self.trigramas = {}
+        self._agregar(G, indice, list(indice.items))
+
+    def _agregar(self, G, indice, items):
+        listas = {}
+        for item in items:
+            i = len(self.items)
+            self.items.append(item)
+            self.posicion[item] = i
+            datos = G.nodes[item]
+            self.exacto.setdefault(datos['label'], i)
+            texto = _texto(datos.get('label_original', ''))
+            self.textos.append(texto)
+            for trigrama in trigramas(texto):
+                listas.setdefault(trigrama, []).append(i)
+
+        self.grado = np.concatenate([self.grado, np.array([indice.grado[n] for n in items], dtype=np.int64)])
+        for t, posiciones in listas.items():
+            nuevas = np.array(posiciones, dtype=np.int32)
+            self.trigramas[t] = np.concatenate([self.trigramas[t], nuevas]) if t in self.trigramas else nuevas
+
+    def actualizar(self, G, indice, afectados, eliminados=()):
+        """
+        Aplica una modificación de G ya reflejada en `indice` (ver
+        graph_index.aplicar_cambios). Si se retiró algún ítem devuelve False y
+        el índice se reconstruye.
+        """
+        if any(nodo in self.posicion for nodo in eliminados):
+            return False
+        nuevos = []
+        for nodo in afectados:
+            if nodo not in indice.items:
+                continue
+            i = self.posicion.get(nodo)
+            if i is None:
+                nuevos.append(nodo)
+            else:
+                self.grado[i] = indice.grado[nodo]
+        if nuevos:
+            self._agregar(G, indice, nuevos)
+        return True
+
+    def _coincidencias_texto(self, consulta):
+        """(posición, tipo, similitud) de los ítems que contienen la consulta o se le parecen."""
+        buscados = trigramas(consulta)
+        if not buscados:
+            # Consultas de menos de 3 caracteres: recorrido lineal
+            return [(i, TEXTO, 1.0) for i, texto in enumerate(self.textos) if consulta in texto]
+
+        listas = [self.trigramas[t] for t in buscados if t in self.trigramas]
+        if not listas:
+            return []
+        posiciones, cuentas = np.unique(np.concatenate(listas), return_counts=True)
+        similitud = cuentas / len(buscados)
+
+        resultado = []
+        for i, s in zip(posiciones[similitud >= SIMILITUD_MINIMA].tolist(),
+                        similitud[similitud >= SIMILITUD_MINIMA].tolist()):
+            # Contener todos los trigramas es necesario (no suficiente) para contener la consulta
+            if s == 1.0 and consulta in self.textos[i]:
+                resultado.append((i, TEXTO, 1.0))
+            else:
+                resultado.append((i, APROXIMADA, s))
+        return resultado
+
+    def buscar(self, consulta, limite=10):
+        """
+        Ítems que coinciden con la consulta, de mejor a peor, como lista de
+        (nodo, tipo, similitud). Orden: tipo de coincidencia, similitud, número
+        de órdenes del ítem y, en empate, orden de G. Las coincidencias
+        aproximadas solo aparecen cuando no hay ninguna exacta o de texto.
+        """
+        consulta_texto = _texto(consulta).strip()
+        if not consulta_texto:
+            return []
+
+        encontrados = {}
+        normalizada = normalize_products(consulta)
+        exacto = self.exacto.get(normalizada) if normalizada else None
+        if exacto is not None:
+            encontrados[exacto] = (EXACTA, 1.0)
+        coincidencias = self._coincidencias_texto(consulta_texto)
+        # Las aproximadas solo se ofrecen si no hay ninguna coincidencia de texto
+        if exacto is not None or any(tipo == TEXTO for _, tipo, _ in coincidencias):
+            coincidencias = [c for c in coincidencias if c[1] == TEXTO]
+        for i, tipo, similitud in coincidencias:
+            encontrados.setdefault(i, (tipo, similitud))
+
+        orden = heapq.nsmallest(limite, encontrados.items(),
+                                key=lambda x: (PRIORIDAD[x[1][0]], -x[1][1], -self.grado[x[0]], x[0]))
+        return [(self.items[i], tipo, similitud) for i, (tipo, similitud) in orden]
+
+
+def indice_busqueda(G):
+    """IndiceBusqueda de G, reconstruido solo si el grafo cambió."""
+    return cache_grafo(G, "busqueda", IndiceBusqueda)
+
+
+def buscar_items(G, consulta, limite=10):
+    """Ítems de G que coinciden con la consulta, ordenados (ver IndiceBusqueda.buscar)."""
+    return indice_busqueda(G).buscar(consulta, limite)
@@ -0,0 +1,154 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+CUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+NOMBRES_TIPO = {"1": "Productos", "2": "Servicios"}
+
+# Resumen ya calculado por DataFrame: id(df) -> (referencia débil a df, resumen)
+_RESUMENES = {}
+
+
+def _momentos(tabla):
+    """
+    Total, promedio, mínimo, máximo y desviación a partir de (n, media, M2) por
+    grupo, combinados con la fórmula de Chan: M2 = ΣM2ᵢ + Σnᵢ(mediaᵢ - media)².
+    Con montos de millones, suma_cuadrados/n - promedio² pierde toda la precisión.
+    """
+    n = int(tabla["n"].sum())
+    total = float(tabla["suma"].sum())
+    promedio = total / n if n else float("nan")
+    m2 = float("nan")
+    if n:
+        # Los grupos sin montos válidos (n = 0) tienen media y M2 NaN: no aportan
+        conteos = tabla["n"].to_numpy(dtype=float)
+        desvio_medias = tabla["media"].to_numpy(dtype=float) - promedio
+        m2 = float(np.nansum(tabla["m2"].to_numpy(dtype=float)) + np.nansum(conteos * desvio_medias ** 2))
+    return {
+        "registros": n,
+        "total": total,
+        "promedio": promedio,
+        "minimo": float(tabla["minimo"].min()) if n else float("nan"),
+        "maximo": float(tabla["maximo"].max()) if n else float("nan"),
+        "desviacion": float(np.sqrt(m2 / n)) if n else float("nan"),
+    }
+
+
+def calcular_resumen(df):
+    """
+    Resumen del dataset limpio en una sola agregación: un groupby por
+    (tipo, año, mes) con sumas parciales del monto, del que se derivan los
+    totales, el desglose por tipo y el desglose por periodo. Las claves son
+    texto para que el resultado se pueda guardar junto al dataset. Las filas
+    con tipo, año o mes vacío cuentan en los totales aunque no en los desgloses.
+    """
+    monto = df["ORDEN_MONTO"].to_numpy(dtype=float)
+    claves = [c for c in ["ORDEN_TIPO", "ORDEN_ANNO", "ORDEN_MES"] if c in df.columns]
+
+    base = pd.DataFrame({"monto": monto}, index=df.index)
+    for col in claves:
+        base[col] = df[col].to_numpy()
+    if claves:
+        grupos = base.groupby(claves, observed=True, sort=True, dropna=False)
+    else:
+        grupos = base.groupby(np.zeros(len(base), dtype=int))
+    n = grupos["monto"].count()
+    cubo = pd.DataFrame({
+        "n": n,
+        "suma": grupos["monto"].sum(),
+        "media": grupos["monto"].mean(),
+        # var de pandas es estable (Welford); M2 = varianza poblacional * n
+        "m2": grupos["monto"].var(ddof=0) * n,
+        "minimo": grupos["monto"].min(),
+        "maximo": grupos["monto"].max(),
+    }).reset_index()
+
+    resumen = {
+        "registros": len(df),
+        "ordenes": int(df["ORDEN_NUMERO"].nunique()),
+        "items": int(df["ORDEN_DESCRIPCION_NORM"].nunique()),
+        "proveedores": int(df["ORDEN_PROVEEDOR"].nunique()) if "ORDEN_PROVEEDOR" in df.columns else 0,
+        "monto": _momentos(cubo),
+        "cuantiles": {},
+        "por_tipo": {},
+        "por_periodo": {},
+    }
+
+    validos = monto[~np.isnan(monto)]
+    if len(validos):
+        valores = np.quantile(validos, CUANTILES)
+        resumen["cuantiles"] = {f"{q:g}": float(v) for q, v in zip(CUANTILES, valores)}
+
+    if "ORDEN_TIPO" in claves:
+        for tipo, tabla in cubo.groupby("ORDEN_TIPO", sort=True):
+            resumen["por_tipo"][str(tipo)] = _momentos(tabla)
+
+    if "ORDEN_ANNO" in claves and "ORDEN_MES" in claves:
+        for (anno, mes), tabla in cubo.groupby(["ORDEN_ANNO", "ORDEN_MES"], sort=True):
+            resumen["por_periodo"][f"{int(anno)}-{int(mes):02d}"] = _momentos(tabla)
+
+    return resumen
+
+
+def _registrar(df, resumen):
+    clave = id(df)
+
+    def olvidar(ref):
+        # Solo si la entrada sigue siendo la de este objeto (id reutilizado)
+        if _RESUMENES.get(clave, (None,))[0] is ref:
+            del _RESUMENES[clave]
+
+    _RESUMENES[clave] = (weakref.ref(df, olvidar), resumen)
+
+
+def obtener_resumen(df):
+    """
+    Resumen de df, calculado una sola vez por objeto: las consultas siguientes
+    sobre el mismo DataFrame no lo recorren. Los filtrados y copias son objetos
+    nuevos y se recalculan; los cambios en el lugar sobre df no se detectan.
+    El resumen también queda en df.attrs para guardarlo con la caché del dataset.
+    """
+    entrada = _RESUMENES.get(id(df))
+    if entrada is not None and entrada[0]() is df:
+        return entrada[1]
+    resumen = calcular_resumen(df)
+    df.attrs["resumen"] = resumen
+    _registrar(df, resumen)
+    return resumen
+
+
+def vincular_resumen(df):
+    """
+    Adopta el resumen guardado en df.attrs para un df recién leído de una caché
+    vigente (la clave del archivo ya cubre su contenido), sin recalcularlo.
+    Devuelve el resumen, o None si no venía uno que corresponda.
+    """
+    resumen = df.attrs.get("resumen")
+    if not isinstance(resumen, dict) or resumen.get("registros") != len(df):
+        return None
+    _registrar(df, resumen)
+    return resumen
+
+
+def imprimir_desgloses(resumen):
+    """Cuantiles y desgloses por tipo y periodo."""
+    if resumen["cuantiles"]:
+        print("Cuantiles del monto por ítem:")
+        for q, valor in resumen["cuantiles"].items():
+            print(f"  - P{float(q) * 100:g}: S/ {valor:,.2f}")
+        print()
+
+    if resumen["por_tipo"]:
+        print("Por tipo de orden:")
+        for tipo, m in resumen["por_tipo"].items():
+            nombre = NOMBRES_TIPO.get(tipo, f"Tipo {tipo}")
+            print(f"  - {nombre}: {m['registros']:,} registros | S/ {m['total']:,.2f} | promedio S/ {m['promedio']:,.2f}")
+        print()
+
+    if resumen["por_periodo"]:
+        print("Por periodo:")
+        for periodo, m in resumen["por_periodo"].items():
+            print(f"  - {periodo}: {m['registros']:,} registros | S/ {m['total']:,.2f}")
+        print()
@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Los módulos del proyecto están en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def df_ordenes():
+    """Órdenes limpias de ejemplo: una orden con dos proveedores, ítems repetidos y una sin fecha."""
+    return pd.DataFrame({
+        "ORDEN_TIPO": ["1", "1", "1", "2", "2", "1", "2"],
+        "ORDEN_NUMERO": [1, 1, 2, 3, 3, 4, 5],
+        "ORDEN_FECHA": ["05/01/2024", "05/01/2024", "10/02/2024", "", "11/03/2024", "12/03/2024", "01/04/2024"],
+        "ORDEN_PROVEEDOR": ["ACME S.A.C.", "BETA E.I.R.L.", "ACME S.A.C.", "GAMMA S.A.", "GAMMA S.A.",
+                            "BETA E.I.R.L.", "ACME S.A.C."],
+        "ORDEN_DESCRIPCION": ["Papel bond A4", "Lapicero azul", "Papel bond A4", "Servicio de limpieza",
+                              "Papel bond A4", "Lapicero azul", "Servicio de limpieza"],
+        "ORDEN_DESCRIPCION_NORM": ["papel bond a4", "lapicero azul", "papel bond a4", "servicio limpieza",
+                                   "papel bond a4", "lapicero azul", "servicio limpieza"],
+        "ORDEN_MONTO": [100.0, 25.5, 300.0, 1200.0, 80.0, 40.0, 1500.0],
+    })
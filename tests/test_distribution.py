@@ -0,0 +1,31 @@
+import numpy as np
+
+from distribution import Distribucion, bordes_cuantiles
+
+
+def test_bordes_cuantiles_valores_distintos():
+    valores = [1.0, 2.0, 3.0, 4.0, 5.0]
+    bordes = bordes_cuantiles(valores)
+    assert bordes.tolist() == [1.0, 2.0, 3.0, 4.0, np.inf]
+    distribucion = Distribucion(valores, bordes)
+    assert distribucion.cuentas.tolist() == [1, 1, 1, 2]
+
+
+def test_bordes_cuantiles_valores_iguales_un_solo_intervalo():
+    valores = [7.0] * 6
+    bordes = bordes_cuantiles(valores)
+    assert bordes.tolist() == [7.0, np.inf]
+
+    distribucion = Distribucion(valores, bordes)
+    assert len(distribucion) == 1
+    assert distribucion.cuentas.tolist() == [6]
+    assert distribucion.sumas.tolist() == [42.0]
+    assert distribucion.participacion.tolist() == [1.0]
+    assert distribucion.acumulada.tolist() == [1.0]
+    assert distribucion.grupos(list("abcdef")) == [list("abcdef")]
+
+
+def test_bordes_cuantiles_un_solo_valor_y_vacio():
+    assert bordes_cuantiles([3.5]).tolist() == [3.5, np.inf]
+    assert bordes_cuantiles([]).tolist() == [0.0, np.inf]
+    assert Distribucion([], bordes_cuantiles([])).cuentas.tolist() == [0]
@@ -0,0 +1,90 @@
+import random
+
+import networkx as nx
+import pytest
+
+from filter_graph import calcular_interconexiones, filter_subgraph, filter_subgraph_interconectado
+from ranking import ranking_items
+
+
+def _grafo_aleatorio(semilla, n_ordenes=40, n_items=15):
+    """Bipartito orden-ítem chico, con muchos ítems empatados en grado e interconexiones."""
+    azar = random.Random(semilla)
+    G = nx.Graph()
+    for o in range(n_ordenes):
+        orden = f"Orden_{o}"
+        G.add_node(orden, type="orden", label=o, proveedor=f"P{o % 3}")
+        for i in azar.sample(range(n_items), azar.randint(1, 3)):
+            item = f"Item_{i}"
+            if item not in G:
+                G.add_node(item, type="item", label=str(i), label_original=f"ITEM {i}")
+            G.add_edge(orden, item, weight=float(azar.choice([100, 250, 250, 1000])))
+    return G
+
+
+def _greedy_simple(G, top_items, min_ordenes, max_ordenes_por_item, max_items):
+    """La expansión original: recalcula el score de todos los candidatos en cada paso."""
+    candidatos = [node for node, degree in top_items if degree >= min_ordenes]
+    if not candidatos:
+        return set()
+    interconexiones = calcular_interconexiones(G, candidatos)
+    ordenados = sorted(candidatos, key=lambda x: (interconexiones.get(x, 0), G.degree(x)), reverse=True)
+
+    seleccionados = {ordenados[0]}
+    ordenes = set(list(G.neighbors(ordenados[0]))[:max_ordenes_por_item])
+    while len(seleccionados) < max_items and len(seleccionados) < len(ordenados):
+        mejor, mejor_score = None, -1
+        for candidato in ordenados:
+            if candidato in seleccionados:
+                continue
+            score = len(set(G.neighbors(candidato)) & ordenes) * 10 + interconexiones.get(candidato, 0)
+            if score > mejor_score:
+                mejor, mejor_score = candidato, score
+        seleccionados.add(mejor)
+        ordenes.update(list(G.neighbors(mejor))[:max_ordenes_por_item])
+    return seleccionados | ordenes
+
+
+@pytest.mark.parametrize("semilla", range(12))
+@pytest.mark.parametrize("min_ordenes, max_ordenes_por_item, max_items", [(1, 2, 5), (2, 1, 8), (1, 10, 15), (3, 3, 4)])
+def test_lazy_greedy_igual_al_greedy_simple(semilla, min_ordenes, max_ordenes_por_item, max_items):
+    G = _grafo_aleatorio(semilla)
+    top_items = ranking_items(G, "grado")
+
+    H = filter_subgraph_interconectado(G, top_items, min_ordenes, max_ordenes_por_item, max_items)
+
+    assert set(H.nodes) == _greedy_simple(G, top_items, min_ordenes, max_ordenes_por_item, max_items)
+
+
+def test_lazy_greedy_con_todos_los_items_empatados():
+    # Cada orden tiene un solo ítem y todos los ítems el mismo grado: decide el orden de top_items
+    G = nx.Graph()
+    for o in range(12):
+        G.add_node(f"Orden_{o}", type="orden", label=o)
+        G.add_node(f"Item_{o % 6}", type="item", label=str(o % 6), label_original=str(o % 6))
+        G.add_edge(f"Orden_{o}", f"Item_{o % 6}", weight=1.0)
+    top_items = [(f"Item_{i}", 2) for i in (3, 1, 5, 0, 2, 4)]
+
+    H = filter_subgraph_interconectado(G, top_items, 1, 2, 3)
+
+    assert set(H.nodes) == _greedy_simple(G, top_items, 1, 2, 3)
+    assert {n for n in H if n.startswith("Item_")} == {"Item_3", "Item_1", "Item_5"}
+
+
+def test_avisos_de_candidatos_tambien_con_la_seleccion_en_cache(capsys):
+    G = _grafo_aleatorio(0)
+    top_items = ranking_items(G, "grado")
+
+    salidas = []
+    for _ in range(2):
+        H = filter_subgraph_interconectado(G, top_items, 1, 2, 5)
+        salidas.append(capsys.readouterr().out)
+    assert "Ítems candidatos (mínimo 1 órdenes)" in salidas[0]
+    assert salidas[1] == salidas[0]
+
+    salidas = []
+    for _ in range(2):
+        filter_subgraph(G, 10**6, 10**6, 5, top_items)
+        salidas.append(capsys.readouterr().out)
+    assert "No se encontraron candidatos válidos" in salidas[0]
+    assert salidas[1] == salidas[0]
@@ -0,0 +1,35 @@
+import pytest
+
+from builder_graph import build_graph
+from graph_arrays import GrafoCompacto
+from node_store import compactar_atributos
+
+
+def _aristas(G):
+    return {frozenset((u, v)): d for u, v, d in G.edges(data=True)}
+
+
+@pytest.mark.parametrize("con_proveedores", [False, True])
+def test_ida_y_vuelta_networkx(df_ordenes, con_proveedores):
+    G = build_graph(df_ordenes, "Producto/Servicio", con_proveedores=con_proveedores)
+
+    H = GrafoCompacto.desde_networkx(G).a_networkx()
+
+    assert list(H.nodes) == list(G.nodes)
+    assert dict(H.nodes(data=True)) == dict(G.nodes(data=True))
+    assert _aristas(H) == _aristas(G)
+    assert H.graph == G.graph
+    # Los atributos son copias: modificar H no toca G
+    H.nodes["Orden_1"]["proveedores_set"].add("OTRO")
+    assert "OTRO" not in G.nodes["Orden_1"]["proveedores_set"]
+
+
+def test_ida_y_vuelta_con_atributos_columnares(df_ordenes):
+    G = build_graph(df_ordenes, "Producto/Servicio")
+    esperado = {n: dict(d) for n, d in G.nodes(data=True)}
+    compactar_atributos(G)
+
+    H = GrafoCompacto.desde_networkx(G).a_networkx()
+
+    assert dict(H.nodes(data=True)) == esperado
+    assert _aristas(H) == _aristas(G)
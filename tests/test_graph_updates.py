@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import graph_index
+from builder_graph import build_graph
+from graph_index import indice_grafo, indice_proveedores
+from graph_updates import agregar_orden, anular_orden, corregir_monto
+from ranking import METRICAS, ranking_items
+from search_index import indice_busqueda
+
+
+def _filas(*filas):
+    columnas = ["ORDEN_NUMERO", "ORDEN_FECHA", "ORDEN_PROVEEDOR", "ORDEN_DESCRIPCION", "ORDEN_DESCRIPCION_NORM",
+                "ORDEN_MONTO"]
+    return pd.DataFrame(filas, columns=columnas)
+
+
+def _derivados(G):
+    """Índices en caché de G (calculándolos si hace falta)."""
+    return {
+        "indice": indice_grafo(G),
+        "proveedores": indice_proveedores(G),
+        "rankings": {m: ranking_items(G, m) for m in METRICAS},
+        "busqueda": indice_busqueda(G),
+    }
+
+
+def _reconstruidos(G):
+    """Los mismos índices construidos desde cero sobre el G actual."""
+    anteriores = graph_index._CACHE.pop(G, {})
+    try:
+        return _derivados(G)
+    finally:
+        graph_index._CACHE[G] = anteriores
+
+
+def _comparar(G):
+    actual, nuevo = _derivados(G), _reconstruidos(G)
+
+    for a, b in [(actual["indice"], nuevo["indice"]), (actual["proveedores"], nuevo["proveedores"])]:
+        assert vars(a) == vars(b)
+    assert list(actual["indice"].items) == list(nuevo["indice"].items)
+    assert list(actual["indice"].ordenes) == list(nuevo["indice"].ordenes)
+
+    for metrica, ranking in actual["rankings"].items():
+        esperado = nuevo["rankings"][metrica]
+        assert ranking.nodos == esperado.nodos
+        assert ranking.valores == esperado.valores
+        assert list(ranking) == list(esperado)
+        assert ranking.top(2) == esperado.top(2)
+
+    a, b = actual["busqueda"], nuevo["busqueda"]
+    assert a.items == b.items and a.posicion == b.posicion
+    assert a.exacto == b.exacto and a.textos == b.textos
+    assert np.array_equal(a.grado, b.grado)
+    assert a.trigramas.keys() == b.trigramas.keys()
+    for trigrama, posiciones in a.trigramas.items():
+        assert np.array_equal(posiciones, b.trigramas[trigrama])
+    return actual
+
+
+@pytest.fixture(params=[False, True], ids=["bipartito", "tripartito"])
+def grafo(request, df_ordenes):
+    G = build_graph(df_ordenes, "Producto/Servicio", con_proveedores=request.param)
+    _derivados(G)
+    return G
+
+
+def test_agregar_orden_actualiza_en_el_lugar(grafo):
+    antes = _derivados(grafo)
+
+    agregar_orden(grafo, _filas(
+        (6, "02/04/2024", "DELTA S.R.L.", "Toner HP 85A", "toner", 350.0),
+        (6, "02/04/2024", "DELTA S.R.L.", "Papel bond A4", "papel bond a4", 90.0),
+        # Orden existente: suma monto y agrega un proveedor
+        (2, "10/02/2024", "GAMMA S.A.", "Lapicero azul", "lapicero azul", 15.0),
+    ))
+
+    despues = _comparar(grafo)
+    assert despues["indice"] is antes["indice"]
+    assert despues["proveedores"] is antes["proveedores"]
+    assert despues["busqueda"] is antes["busqueda"]
+    assert all(despues["rankings"][m] is antes["rankings"][m] for m in METRICAS)
+
+
+def test_corregir_monto_actualiza_en_el_lugar(grafo):
+    antes = _derivados(grafo)
+
+    assert corregir_monto(grafo, 2, "papel bond a4", 999.0)
+    assert corregir_monto(grafo, "Orden_5", "Item_servicio limpieza", 10.0)
+
+    despues = _comparar(grafo)
+    assert despues["indice"] is antes["indice"]
+    assert despues["rankings"]["monto_total"] is antes["rankings"]["monto_total"]
+
+
+def test_anular_orden(grafo):
+    # Una orden con un ítem que nadie más compra: al anularla se retira también el ítem
+    agregar_orden(grafo, _filas((7, "03/04/2024", "OMEGA S.A.", "Cemento portland", "cemento", 500.0)))
+    _comparar(grafo)
+
+    assert anular_orden(grafo, 4)
+    _comparar(grafo)
+    assert anular_orden(grafo, 7)
+    assert "Item_cemento" not in grafo
+    _comparar(grafo)
+
+
+def test_secuencia_de_cambios(grafo):
+    agregar_orden(grafo, _filas((8, "04/04/2024", "ACME S.A.C.", "Lapicero azul", "lapicero azul", 12.0)))
+    corregir_monto(grafo, 8, "lapicero azul", 20.0)
+    anular_orden(grafo, 1)
+    agregar_orden(grafo, _filas((1, "05/04/2024", "BETA E.I.R.L.", "Papel bond A4", "papel bond a4", 70.0)))
+    _comparar(grafo)
+
+
+def test_nodos_agregados_fuera_de_graph_updates_invalidan_la_cache(grafo):
+    indice = indice_grafo(grafo)
+
+    grafo.add_node("Item_nuevo", type="item", label="nuevo", label_original="NUEVO")
+    grafo.add_edge("Orden_1", "Item_nuevo", weight=5.0)
+
+    assert indice_grafo(grafo) is not indice
+    assert "Item_nuevo" in indice_grafo(grafo).items
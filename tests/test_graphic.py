@@ -0,0 +1,43 @@
+import math
+
+import networkx as nx
+
+from graphic import COLOR_ARISTA_SIN_MONTO, COLORES_ARISTA, add_edges, create_network
+
+
+def _red_con_aristas(G):
+    net = create_network()
+    for nodo in G.nodes:
+        net.add_node(nodo)
+    add_edges(net, G)
+    return {(e["from"], e["to"]): e for e in net.edges}
+
+
+def test_monto_nan_usa_color_neutro():
+    G = nx.Graph()
+    G.add_edge("Orden_1", "Item_a", weight=500.0)
+    G.add_edge("Orden_2", "Item_b", weight=float("nan"))
+    G.add_edge("Orden_3", "Item_c", weight=9000.0)
+
+    aristas = _red_con_aristas(G)
+
+    assert aristas[("Orden_1", "Item_a")]["color"] == COLORES_ARISTA[0]
+    assert aristas[("Orden_3", "Item_c")]["color"] == COLORES_ARISTA[-1]
+    sin_monto = aristas[("Orden_2", "Item_b")]
+    assert sin_monto["color"] == COLOR_ARISTA_SIN_MONTO
+    assert sin_monto["width"] == 1
+    # El NaN no afecta el grosor de las demás aristas
+    assert math.isclose(aristas[("Orden_3", "Item_c")]["width"], 5)
+
+
+def test_bordes_de_los_rangos():
+    G = nx.Graph()
+    G.add_edge("Orden_1", "Item_a", weight=1000.0)
+    G.add_edge("Orden_2", "Item_b", weight=5000.0)
+    G.add_edge("Orden_3", "Item_c", weight=5000.01)
+
+    aristas = _red_con_aristas(G)
+
+    assert aristas[("Orden_1", "Item_a")]["color"] == COLORES_ARISTA[0]
+    assert aristas[("Orden_2", "Item_b")]["color"] == COLORES_ARISTA[1]
+    assert aristas[("Orden_3", "Item_c")]["color"] == COLORES_ARISTA[2]
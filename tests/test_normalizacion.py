@@ -0,0 +1,104 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import (
+    PALABRAS_CORTE, SINONIMOS, normalize_products, normalize_products_batch, quitar_tildes
+)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def normalizar_referencia(text):
+    """normalize_products fila por fila tal como era antes del autómata y de la ruta vectorizada."""
+    if not isinstance(text, str):
+        return "desconocido"
+    text = quitar_tildes(text.lower().strip())
+    text = re.sub(r"^(adqui\w+|adq\.|adq|contrat\w+|compra|suministro)\s*(de)?\s*", "", text)
+    if text.startswith("servicio"):
+        text = re.sub(r"^(servicio)\s*(de)?\s*", "servicio ", text)
+    for corte in PALABRAS_CORTE:
+        if corte in text:
+            text = text.split(corte)[0]
+    text = re.sub(r"\bx\s*\d+.*", "", text)
+    text = re.sub(r"\b\d+(\.\d+)?\s*(gr|g|kg|ml|l|gal|hp|mm|cm|in|watts|w)\b", "", text)
+    text = re.sub(r"\btamaño\s*a\d", "", text)
+    text = re.sub(r"[^\w\s]", "", text)
+    if "utiles" in text and ("escritorio" in text or "oficina" in text):
+        return "utiles de escritorio"
+    if "limpieza" in text and ("material" in text or "insumo" in text or "utiles" in text or "aseo" in text):
+        return "materiales de limpieza"
+    if "proteccion" in text and ("personal" in text or "epp" in text or "seguridad" in text):
+        return "equipos de proteccion personal epp"
+    if "vestuario" in text or "indumentaria" in text or "uniforme" in text or "camisa" in text or "polo" in text:
+        return "vestuario institucional"
+    if "alquiler" in text and ("camioneta" in text or "vehiculo" in text or "minivan" in text):
+        return "alquiler de camioneta"
+    if "energia electrica" in text or "suministro de energia" in text:
+        return "servicio de energia electrica"
+    if "seguridad" in text and ("temporal" in text or "vigilancia" in text):
+        return "servicio de seguridad y vigilancia"
+    if "consultoria" in text:
+        return "servicio de consultoria"
+    for clave, valor_estandar in SINONIMOS.items():
+        if re.search(r"\b" + re.escape(clave) + r"\b", text):
+            if "camioneta" not in text and "alquiler" not in text:
+                return valor_estandar
+    return re.sub(r"\s+", " ", text).strip()
+
+
+CASOS = [
+    "", "   ", None, float("nan"), 123,
+    "ADQ. DE DIESEL B5 S50 PARA LA OBRA X",
+    "Adquisición de PETRÓLEO DIESEL B5",             # dos sinónimos: gana el primero de la tabla
+    "compra de agua mineral y agua de mesa x 20 litros",
+    "HOJAS BOND Y PAPEL BOND A4 80G",
+    "gasolina gasohol 90",
+    "tintas para impresora",                          # "tinta" no es palabra completa
+    "TONER: HP 85A",
+    "alquiler de camioneta diesel",                   # excepción de sinónimos
+    "camioneta con petroleo",
+    "SERVICIO DE LIMPIEZA DEL LOCAL - SEDE CENTRAL",
+    "servicio de consultoria para el proyecto: agua",
+    "utiles de oficina del area de la gerencia",
+    "materiales de la obra: cemento con la arena",    # " de la " antes que " con la " y ":"
+    "ladrillo del proyecto con la meta 1",
+    "cemento portland tipo i x 42.5kg",
+    "laptop i7 16gb segun especificaciones",
+    "boligrafo/lapicero azul",
+    "soat",
+    "papel bondx",
+    "  Suministro de energía eléctrica  ",
+    "uniforme para personal de seguridad",
+    ":solo dos puntos",
+    "adq",
+]
+
+
+@pytest.mark.parametrize("texto", CASOS)
+def test_normalizador_igual_a_la_referencia(texto):
+    assert normalize_products(texto) == normalizar_referencia(texto)
+
+
+def test_normalizador_por_lotes_igual_a_la_referencia():
+    serie = pd.Series(CASOS, index=np.arange(100, 100 + len(CASOS)), dtype=object)
+
+    resultado = normalize_products_batch(serie)
+
+    assert resultado.index.equals(serie.index)
+    assert resultado.tolist() == [normalizar_referencia(t) for t in CASOS]
+    assert normalize_products_batch(serie, vectorizado=False).tolist() == resultado.tolist()
+
+
+def test_normalizador_sobre_el_dataset():
+    df = pd.read_csv(os.path.join(RAIZ, "ordenes_compra_servicio.csv"), sep=";", encoding="utf-8",
+                     usecols=lambda c: "DESCRIPCION" in c.upper())
+    descripciones = pd.Series(pd.unique(df.iloc[:, 0].dropna()))
+
+    esperado = [normalizar_referencia(t) for t in descripciones]
+
+    assert normalize_products_batch(descripciones).tolist() == esperado
+    assert [normalize_products(t) for t in descripciones] == esperado
@@ -0,0 +1,48 @@
+import random
+import re
+
+import pytest
+
+from data_loader import PALABRAS_CORTE, SINONIMOS
+from pattern_matcher import AutomataFrases
+
+
+def _cortar_referencia(frases, text):
+    for frase in frases:
+        if frase in text:
+            text = text.split(frase)[0]
+    return text
+
+
+def _palabra_completa_referencia(frases, text):
+    for pid, frase in enumerate(frases):
+        if re.search(r"\b" + re.escape(frase) + r"\b", text):
+            return pid
+    return None
+
+
+FRASES_SOLAPADAS = ["he", "she", "hers", "his", "s h", "e", "ers", " h"]
+
+# Piezas con las que se arman los textos: fragmentos y frases completas que se solapan
+PIEZAS_SOLAPADAS = list("hersi :-_1")
+PIEZAS_CORTE = PALABRAS_CORTE + ["para", "la", "con", "obra", "x", " ", "-", ":"]
+PIEZAS_SINONIMOS = list(SINONIMOS) + ["agua", "de", "mesa", "bond", "s", "_", "1", " ", " ", " "]
+
+
+def _textos_aleatorios(piezas, cantidad=2000, semilla=7):
+    azar = random.Random(semilla)
+    return [""] + ["".join(azar.choice(piezas) for _ in range(azar.randint(1, 8))) for _ in range(cantidad)]
+
+
+@pytest.mark.parametrize("frases, piezas", [(FRASES_SOLAPADAS, PIEZAS_SOLAPADAS), (PALABRAS_CORTE, PIEZAS_CORTE)])
+def test_automata_corta_como_los_split_en_orden(frases, piezas):
+    automata = AutomataFrases(frases)
+    for text in _textos_aleatorios(piezas):
+        assert automata.cortar_en_orden(text) == _cortar_referencia(frases, text), text
+
+
+@pytest.mark.parametrize("frases, piezas", [(FRASES_SOLAPADAS, PIEZAS_SOLAPADAS), (list(SINONIMOS), PIEZAS_SINONIMOS)])
+def test_automata_palabra_completa_como_re_search(frases, piezas):
+    automata = AutomataFrases(frases)
+    for text in _textos_aleatorios(piezas):
+        assert automata.primera_palabra_completa(text) == _palabra_completa_referencia(frases, text), text